@@ -7,20 +7,13 @@ Create every combination of
 Output goes to ./instances/
 """
 
-import json, itertools, os, random, math
+import argparse, json, itertools, os, random, math
 from pathlib import Path
 
-# ------------------------------------------------------------------ #
-# Load course catalog (must exist)                                   #
-# ------------------------------------------------------------------ #
-if not Path("courses.json").exists():
-    raise SystemExit("Courses.json not found. Run build_course_catalog.py first.")
-
-with open("courses.json") as f:
-    catalog = json.load(f)
+import manifest
+from common import phase
+from profiling import add_profile_args, make_timings
 
-COURSES = catalog["I"]                # eight course codes
-TASKS   = catalog["J"]                # dict of task lists
 SHIFT_GAMMA = [
     0.8, 0.9, 1.0, 1.0, 1.0, 0.9, 0.8, 0.8,
     0.8, 0.9, 1.0, 1.0, 0.9, 0.8, 0.7, 0.7
@@ -48,11 +41,10 @@ CREDIT = {
     "MGT1002":  3,
 }
 
-course_cat = catalog["category"]      # course → STEM/SOC/HUM
 DAYS, SHIFTS = 115, 16
 
-def build_P_template(style):
-    """Return {course: {"*": coeff}}"""
+def build_P_template(style, course_cat):
+    """Return {course: {"*": coeff}}   (course_cat: course → STEM/SOC/HUM)"""
     fav = STYLE2CAT[style]
     P = {}
     for c, cat in course_cat.items():
@@ -69,13 +61,16 @@ def is_exam(taskname):
     low = taskname.lower()
     return "exam" in low or "quiz" in low
 
-def expand_P(template, tasks):
+def shift_gamma(t, shifts=SHIFTS):
+    """γ_t of SHIFT_GAMMA, stretched over a grid of `shifts` shifts."""
+    return SHIFT_GAMMA[(t - 1) * len(SHIFT_GAMMA) // shifts]
+
+def expand_P(template, tasks, due_dict, days=DAYS, shifts=SHIFTS):
     """
     P[c][task]['(k,t)'] = base · γ_t · exp(-λ·gap)
     λ = 0.20 for exams/quizzes, else 0.00   (FORGET dict)
     """
     full = {}
-    due_dict = catalog["d"]            # already loaded at top
     for c in tasks:
         base = template[c]["*"]        # 1.2 / 1.0 / 0.8
         full[c] = {}
@@ -83,61 +78,89 @@ def expand_P(template, tasks):
             lam   = 0.20 if is_exam(task) else 0.00
             dday  = due_dict[c][task][0]        # due day
             full[c][task] = {}
-            for k in range(1, DAYS + 1):
+            for k in range(1, days + 1):
                 decay = math.exp(-lam * max(dday - k, 0))
-                for t in range(1, SHIFTS + 1):
-                    gamma = SHIFT_GAMMA[t - 1]
+                for t in range(1, shifts + 1):
+                    gamma = shift_gamma(t, shifts)
                     coeff = round(base * gamma * decay, 3)
                     full[c][task][f"({k},{t})"] = coeff
     return full
 
 # ------------------------------------------------------------------ #
-# Helper to slice big dicts                                          #
+# One instance                                                       #
 # ------------------------------------------------------------------ #
-def sub(d):
-    return {c: d[c] for c in combo}
+def assemble_instance(catalog, combo, style, work, credit=CREDIT,
+                      days=DAYS, shifts=SHIFTS, pass_line=0.6):
+    """Instance dict for one course combination × style × work level."""
+    def sub(d):
+        return {c: d[c] for c in combo}
 
-# ------------------------------------------------------------------ #
-# Make output dir                                                    #
-# ------------------------------------------------------------------ #
-os.makedirs("instances", exist_ok=True)
-
-# ------------------------------------------------------------------ #
-# Generate all 70 × 9 instances                                      #
-# ------------------------------------------------------------------ #
-count = 0
-for combo in itertools.combinations(COURSES, 4):        # choose 4 courses
-    combo = list(combo)
-    task_subset = {c: TASKS[c] for c in combo}
-
-    # data fixed across work-style loops
-    base = dict(
-        K=list(range(1, DAYS+1)),
-        T=list(range(1, SHIFTS+1)),
-        I=combo,
+    task_subset = {c: catalog["J"][c] for c in combo}
+    inst = dict(
+        K=list(range(1, days+1)),
+        T=list(range(1, shifts+1)),
+        I=list(combo),
         J=task_subset,
         S=sub(catalog["S"]),
         E=sub(catalog["E"]),
         r=sub(catalog["r"]),
         d=sub(catalog["d"]),
         slot={c: catalog["slot"].get(c, {}) for c in combo},
-        w = {c: CREDIT[c] for c in combo},                # equal weights
-        B={c: 0.6 for c in combo},               # pass line
+        w = {c: credit[c] for c in combo},                # equal weights
+        B={c: pass_line for c in combo},          # pass line
     )
+    profP = build_P_template(style, catalog["category"])
+    inst["beta"] = WORK_LEVELS[work]["beta"]
+    inst["H*"]   = {str(k): WORK_LEVELS[work]["H"] for k in range(1, days+1)}
+    inst["P"]    = expand_P(profP, task_subset, catalog["d"], days, shifts)
+    return inst
+
+def main():
+    p = argparse.ArgumentParser(description="Assemble all 630 instances")
+    add_profile_args(p)
+    args = p.parse_args()
+    timings = make_timings(args, "assemble_instance_all")
+
+    # -------------------------------------------------------------- #
+    # Load course catalog (must exist)                               #
+    # -------------------------------------------------------------- #
+    if not Path("courses.json").exists():
+        raise SystemExit("Courses.json not found. Run build_course_catalog.py first.")
+
+    with open("courses.json") as f:
+        catalog = json.load(f)
+
+    COURSES = catalog["I"]                # eight course codes
+
+    # -------------------------------------------------------------- #
+    # Make output dir                                                #
+    # -------------------------------------------------------------- #
+    os.makedirs("instances", exist_ok=True)
+
+    # -------------------------------------------------------------- #
+    # Generate all 70 × 9 instances                                  #
+    # -------------------------------------------------------------- #
+    count = 0
+    for combo in itertools.combinations(COURSES, 4):        # choose 4 courses
+        combo = list(combo)
+        for style, work in itertools.product(STYLE2CAT, WORK_LEVELS):
+            with phase(timings, "assemble"):
+                inst = assemble_instance(catalog, combo, style, work)
+
+            fname = (
+                "instance_" + "_".join(combo) +
+                f"__{style}_{work}.json"
+            )
+            with phase(timings, "write"), open(Path("instances") / fname, "w") as f:
+                json.dump(inst, f, indent=2)
+            count += 1
+
+    print(f"{count} instances written to ./instances/")
+    with phase(timings, "manifest"):
+        manifest.build("instances")
+    if hasattr(timings, "report"):
+        timings.report()
+
 
-    for style, work in itertools.product(STYLE2CAT, WORK_LEVELS):
-        profP = build_P_template(style)
-        inst = base.copy()
-        inst["beta"] = WORK_LEVELS[work]["beta"]
-        inst["H*"]   = {str(k): WORK_LEVELS[work]["H"] for k in range(1, DAYS+1)}
-        inst["P"]    = expand_P(profP, task_subset)
-
-        fname = (
-            "instance_" + "_".join(combo) +
-            f"__{style}_{work}.json"
-        )
-        with open(Path("instances") / fname, "w") as f:
-            json.dump(inst, f, indent=2)
-        count += 1
-
-print(f"{count} instances written to ./instances/")
+if __name__ == "__main__":
+    main()
@@ -25,22 +25,13 @@ Output
 ./instances/Timmy/instance_Timmy.json
 """
 
-import json, math, os
+import argparse, json, math, os
 from pathlib import Path
 
-# ------------------------------------------------------------------ #
-# Locate and load the course catalog                                 #
-# ------------------------------------------------------------------ #
-CATALOG_FILE = Path("courses.json")
-if not CATALOG_FILE.exists():
-    raise SystemExit("courses.json not found – run build_course_catalog.py first.")
+from common import phase
+from profiling import add_profile_args, make_timings
 
-with CATALOG_FILE.open() as f:
-    catalog = json.load(f)
-
-COURSES   = catalog["I"]           # list of 8 course codes
-TASKS_ALL = catalog["J"]           # dict course → [task names]
-course_cat = catalog["category"]   # course → STEM/SOC/HUM
+CATALOG_FILE = Path("courses.json")
 
 # ------------------------------------------------------------------ #
 # Global constants                                                   #
@@ -87,71 +78,98 @@ def detect_category(task_name: str) -> str:
         return "Lecture"
     return "Homework"
 
-def shift_midpoint_hour(t: int) -> float:
+def shift_midpoint_hour(t: int, shifts: int = SHIFTS) -> float:
     """16 shifts, evenly covering 0‒24 h; return mid-point hour of shift t (1-based)."""
-    slot = 24 / SHIFTS              # 1.5 h
+    slot = 24 / shifts              # 1.5 h
     return (t - 0.5) * slot         # e.g. t=1 → 0.75h
 
-def build_H_star() -> dict[str,int]:
+def build_H_star(days: int = DAYS) -> dict[str,int]:
     """H_k: 6 on weekdays, 4 on weekends (day1 = Monday)."""
     H = {}
-    for k in range(1, DAYS + 1):
+    for k in range(1, days + 1):
         weekday = (k % 7) not in (6, 0)   # k%7==6 (Sat), 0 (Sun) → weekend
         H[str(k)] = 4 if weekday else 2
     return H
 
-def expand_P(tasks: dict[str,list]) -> dict:
+def expand_P(tasks: dict[str,list], theta: dict[str,float] = THETA,
+             days: int = DAYS, shifts: int = SHIFTS,
+             h_peak: float = H_PEAK) -> dict:
     """
     P[c][task]['(k,t)'] = η_cat · (1+θ_i) · [1 + cos(2π/24·(h_t-h_peak))]
     """
     P_out = {}
-    for c in COURSES:
-        theta      = THETA[c]
+    for c in tasks:
+        theta_c    = theta[c]
         P_out[c]   = {}
         for task in tasks[c]:
             cat     = detect_category(task)
             eta     = ETA[cat]
-            factor1 = eta * (1 + theta)   # constant over k,t
+            factor1 = eta * (1 + theta_c) # constant over k,t
             P_out[c][task] = {}
-            for k in range(1, DAYS + 1):
-                for t in range(1, SHIFTS + 1):
-                    h_t   = shift_midpoint_hour(t)
-                    circ  = 1 + math.cos(2 * math.pi / 24 * (h_t - H_PEAK))
+            for k in range(1, days + 1):
+                for t in range(1, shifts + 1):
+                    h_t   = shift_midpoint_hour(t, shifts)
+                    circ  = 1 + math.cos(2 * math.pi / 24 * (h_t - h_peak))
                     coeff = round(factor1 * circ, 3)
                     P_out[c][task][f"({k},{t})"] = coeff
     return P_out
 
-# ------------------------------------------------------------------ #
-# Assemble the single instance                                       #
-# ------------------------------------------------------------------ #
-STUDENT = "Timmy"
-tasks_subset = {c: TASKS_ALL[c] for c in COURSES}
-
-instance = dict(
-    K=list(range(1, DAYS + 1)),
-    T=list(range(1, SHIFTS + 1)),
-    I=COURSES,
-    J=tasks_subset,
-    S={c: catalog["S"][c] for c in COURSES},
-    E={c: catalog["E"][c] for c in COURSES},
-    r={c: catalog["r"][c] for c in COURSES},
-    d={c: catalog["d"][c] for c in COURSES},
-    slot={c: catalog["slot"].get(c, {}) for c in COURSES},
-    w={c: CREDIT[c] for c in COURSES},
-    B={c: 0.6 for c in COURSES},
-    beta=0.05,
-    **{"H*": build_H_star()},
-    P=expand_P(tasks_subset),
-)
-
-# ------------------------------------------------------------------ #
-# Write result                                                       #
-# ------------------------------------------------------------------ #
-out_dir  = Path("instances") / STUDENT
-out_dir.mkdir(parents=True, exist_ok=True)
-out_file = out_dir / "instance_Timmy.json"
-
-with out_file.open("w") as f:
-    json.dump(instance, f, indent=2)
-
-print(f"✓ Instance written to {out_file}")
+def main():
+    p = argparse.ArgumentParser(description="Assemble Timmy's circadian instance")
+    add_profile_args(p)
+    args = p.parse_args()
+    timings = make_timings(args, "assemble_timmy")
+
+    # -------------------------------------------------------------- #
+    # Locate and load the course catalog                             #
+    # -------------------------------------------------------------- #
+    if not CATALOG_FILE.exists():
+        raise SystemExit("courses.json not found – run build_course_catalog.py first.")
+
+    with CATALOG_FILE.open() as f:
+        catalog = json.load(f)
+
+    COURSES   = catalog["I"]           # list of 8 course codes
+    TASKS_ALL = catalog["J"]           # dict course → [task names]
+
+    # -------------------------------------------------------------- #
+    # Assemble the single instance                                   #
+    # -------------------------------------------------------------- #
+    STUDENT = "Timmy"
+    tasks_subset = {c: TASKS_ALL[c] for c in COURSES}
+
+    with phase(timings, "assemble"):
+        instance = dict(
+            K=list(range(1, DAYS + 1)),
+            T=list(range(1, SHIFTS + 1)),
+            I=COURSES,
+            J=tasks_subset,
+            S={c: catalog["S"][c] for c in COURSES},
+            E={c: catalog["E"][c] for c in COURSES},
+            r={c: catalog["r"][c] for c in COURSES},
+            d={c: catalog["d"][c] for c in COURSES},
+            slot={c: catalog["slot"].get(c, {}) for c in COURSES},
+            w={c: CREDIT[c] for c in COURSES},
+            B={c: 0.6 for c in COURSES},
+            beta=0.05,
+            **{"H*": build_H_star()},
+            P=expand_P(tasks_subset),
+        )
+
+    # -------------------------------------------------------------- #
+    # Write result                                                   #
+    # -------------------------------------------------------------- #
+    out_dir  = Path("instances") / STUDENT
+    out_dir.mkdir(parents=True, exist_ok=True)
+    out_file = out_dir / "instance_Timmy.json"
+
+    with phase(timings, "write"), out_file.open("w") as f:
+        json.dump(instance, f, indent=2)
+
+    print(f"✓ Instance written to {out_file}")
+    if hasattr(timings, "report"):
+        timings.report()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+bench_harness.py
+----------------
+In-process benchmark harness.
+
+Calls the solver functions directly (no sys.argv rewriting, no stdout
+scraping) and times every phase with perf_counter:
+
+    load     read the JSON file
+    parse    unpack sets / parameters, build the (k,t)-keyed P
+    build    model construction / candidate enumeration
+    solve    optimisation or greedy loop
+    extract  schedule and objective assembly
+
+Each (instance, method) pair is run `--warmup` times untimed and then
+`--repeats` times; the JSON output keeps every sample, the CSV output
+one row per (instance, method, phase) with median and spread.
+
+    python bench_harness.py instances/Timmy/*.json \\
+        --methods heuristic lazy --repeats 5 --warmup 1 \\
+        --json bench.json --csv bench.csv
+    python bench_harness.py --course MATH4008 --work hard --methods lazy
+"""
+import argparse
+import csv
+import importlib
+import json
+import platform
+import statistics
+import time
+from datetime import datetime
+from pathlib import Path
+
+from common import load_instance, parse_instance, phase
+from manifest import add_select_args, select_paths
+from result_cache import add_cache_args, make_cache
+
+# method name → module exposing solve(inst, ..., timings=None)
+SOLVERS = {
+    "optimal":   "run",
+    "heuristic": "heuristic",
+    "simple":    "simple_heuristic",
+    "lazy":      "lazy_greedy",
+    "multires":  "multires",
+}
+PHASES = ["load", "parse", "build", "solve", "extract", "total"]
+
+def run_method(method, inst, seed=None, time_limit=None, timings=None,
+               cache=None, instance=None):
+    """
+    Dispatch one parsed instance to a solver; returns its result dict.
+    With a result_cache.ResultCache, a stored result for the same
+    instance, method, options and solver code is returned instead
+    (marked cached=True); unseeded randomized runs are never cached.
+    """
+    solve = importlib.import_module(SOLVERS[method]).solve
+    kw = {}
+    if method == "optimal":
+        kw["output_flag"] = 0
+    if method in ("optimal", "heuristic", "multires") and time_limit is not None:
+        kw["time_limit"] = time_limit
+    if method == "simple":
+        kw["seed"] = seed
+    if cache is None or (method == "simple" and seed is None):
+        return solve(inst, timings=timings, **kw)
+    params = {k: v for k, v in kw.items() if k != "output_flag"}
+    return cache.solve(method, SOLVERS[method], inst, params,
+                       lambda: solve(inst, timings=timings, **kw), instance)
+
+def time_one(path, method, seed=None, time_limit=None, cache=None):
+    """
+    One timed run, load → extract.  Returns a flat record; on a cache
+    hit `timings` holds only what this run spent and `cached` the
+    phase times of the original solve.
+    """
+    timings = {}
+    t0 = time.perf_counter()
+    with phase(timings, "load"):
+        data = load_instance(path)
+    with phase(timings, "parse"):
+        inst = parse_instance(data)
+    res = run_method(method, inst, seed, time_limit, timings, cache, Path(path).name)
+    timings["total"] = time.perf_counter() - t0
+    return dict(
+        instance  = Path(path).name,
+        method    = method,
+        seed      = seed,
+        objective = res.get("objective"),
+        bound     = res.get("bound"),
+        gap       = res.get("gap"),
+        gpa_4     = res.get("gpa_4"),
+        overtime  = res.get("overtime"),
+        n_assign  = len(res.get("schedule", [])),
+        timings   = timings,
+        stats     = res.get("stats"),
+        cached    = res.get("timings") if res.get("cached") else None,
+    )
+
+def summarize(samples):
+    """Median and spread of a list of floats."""
+    q1, q3 = (statistics.quantiles(samples, n=4)[::2]
+              if len(samples) > 1 else (samples[0], samples[0]))
+    return dict(
+        n      = len(samples),
+        median = statistics.median(samples),
+        mean   = statistics.fmean(samples),
+        stdev  = statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        min    = min(samples),
+        max    = max(samples),
+        iqr    = q3 - q1,
+    )
+
+def bench(paths, methods, repeats=3, warmup=1, seed=0, time_limit=None,
+          cache=None, bound=False):
+    """
+    Returns (raw runs, summary rows).  With bound=True, runs without a
+    solver bound get the bounds.py upper bound of their instance and
+    the certified gap of their objective.
+    """
+    runs, summary = [], []
+    for path in paths:
+        ub = None
+        if bound:
+            from bounds import upper_bound
+            ub = upper_bound(parse_instance(load_instance(path)))["bound"]
+        for method in methods:
+            for _ in range(warmup):
+                time_one(path, method, seed, time_limit, cache)
+            batch = [time_one(path, method, seed, time_limit, cache)
+                     for _ in range(repeats)]
+            if ub is not None:
+                from bounds import certified_gap
+                for r in batch:
+                    if r["bound"] is None and r["objective"] is not None:
+                        r["bound"], r["gap"] = ub, certified_gap(ub, r["objective"])
+            runs += batch
+
+            for ph in PHASES:
+                samples = [r["timings"][ph] for r in batch if ph in r["timings"]]
+                if samples:
+                    summary.append(dict(instance=batch[0]["instance"],
+                                        method=method, phase=ph,
+                                        **summarize(samples)))
+            tot = summarize([r["timings"]["total"] for r in batch])
+            obj = batch[-1]["objective"]
+            print(f"✓ {batch[0]['instance']:40s} {method:10s} "
+                  f"total={tot['median']:.3f}s (±{tot['iqr']:.3f})  "
+                  f"obj={obj if obj is None else round(obj, 4)}"
+                  + (f"  gap≤{batch[-1]['gap']:.2%}" if batch[-1]["gap"] is not None else "")
+                  + ("  (cached)" if batch[-1]["cached"] else ""))
+    return runs, summary
+
+def main(argv=None):
+    p = argparse.ArgumentParser(
+        description="In-process solver benchmark with per-phase timings")
+    p.add_argument("instances", nargs="*", help="JSON instance files")
+    p.add_argument("--methods", nargs="+", choices=sorted(SOLVERS),
+                   default=["heuristic", "simple", "lazy"])
+    p.add_argument("--repeats", type=int, default=3)
+    p.add_argument("--warmup", type=int, default=1)
+    p.add_argument("--seed", type=int, default=0,
+                   help="seed for the randomized greedy")
+    p.add_argument("--time_limit", type=int, default=None)
+    p.add_argument("--json", default="bench.json")
+    p.add_argument("--csv", default="bench.csv")
+    p.add_argument("--db", default=None,
+                   help="also append the runs to this run_store.py database")
+    p.add_argument("--bound", action="store_true",
+                   help="certify heuristic objectives with the bounds.py upper bound")
+    add_cache_args(p)
+    add_select_args(p)
+    args = p.parse_args(argv)
+
+    args.instances += select_paths(args)
+    if not args.instances:
+        raise SystemExit("no instances (give paths and/or manifest filters)")
+    cache = make_cache(args)
+    runs, summary = bench(args.instances, args.methods, args.repeats,
+                          args.warmup, args.seed, args.time_limit, cache,
+                          args.bound)
+
+    meta = dict(date=datetime.now().isoformat(timespec="seconds"),
+                machine=platform.node(), python=platform.python_version(),
+                repeats=args.repeats, warmup=args.warmup, seed=args.seed,
+                time_limit=args.time_limit)
+    with open(args.json, "w") as f:
+        json.dump(dict(meta=meta, runs=runs, summary=summary), f, indent=2)
+
+    with open(args.csv, "w", newline="") as f:
+        fields = ["instance", "method", "phase",
+                  "n", "median", "mean", "stdev", "min", "max", "iqr"]
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(summary)
+
+    print(f"Results written to {args.json} and {args.csv}")
+    if args.db:
+        from run_store import RunStore
+        store = RunStore(args.db)
+        store.add_instances(args.instances)
+        for rec in runs:
+            rec["params"] = dict(seed=args.seed, time_limit=args.time_limit)
+        store.add_runs(runs, tag=f"bench {meta['date']}")
+        store.close()
+        print(f"{len(runs)} runs appended to {args.db}")
+    if cache is not None:
+        print(f"Result cache {cache.root}/: {cache.hits} hits, {cache.misses} misses")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+bench_report.py
+---------------
+Static benchmark report from any number of result files:
+
+    campaign.jsonl      campaign.py checkpoint (one record per job)
+    runs.sqlite         run_store.py database (classes from its metadata)
+    bench.json          bench_harness.py output (the "runs" list)
+    *.csv               long format: instance, method, objective, time
+                        [, seed, status]
+
+Runs are grouped by method and instance class (style × work level,
+parsed from the instance name) and summarised as
+
+  • shifted geometric mean time   exp(mean(log(t + s))) - s, failed
+                                  runs counted at --time_cap
+  • performance profiles          Dolan & Moré (2002): share of
+                                  instances with t / t_best ≤ τ
+  • time-to-target curves         share of runs that reached the target
+                                  (gap ≤ --target) within time t
+  • gap distributions             gap to the best objective any method
+                                  found on the instance
+
+The report goes to <out_dir>/report.md and report.html with PNG plots.
+
+    python bench_report.py campaign.jsonl bench.json --out_dir report
+"""
+import argparse
+import html
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from common import instance_class
+
+# ------------------------------------------------------------------ #
+# Loading                                                            #
+# ------------------------------------------------------------------ #
+def _record_row(rec):
+    timings = rec.get("timings") or {}
+    return dict(instance=rec.get("instance"), method=rec.get("method"),
+                seed=rec.get("seed"), status=rec.get("status", "ok"),
+                objective=rec.get("objective"),
+                time=timings.get("total", rec.get("wall")))
+
+def load_results(paths):
+    """One row per run: instance, method, seed, status, objective, time."""
+    rows = []
+    for path in map(Path, paths):
+        if path.suffix == ".jsonl":
+            with open(path) as f:
+                for line in f:
+                    try:
+                        rows.append(_record_row(json.loads(line)))
+                    except json.JSONDecodeError:
+                        continue                  # torn last line
+        elif path.suffix in (".sqlite", ".db"):
+            from run_store import RunStore
+            store = RunStore(path)
+            rows += [dict(instance=r["instance"], method=r["method"], seed=r["seed"],
+                          status=r["status"], objective=r["objective"],
+                          time=r["seconds"],
+                          **{"class": f"{r['style']}_{r['work']}" if r["style"] else None})
+                     for r in store.runs()]
+            store.close()
+        elif path.suffix == ".json":
+            with open(path) as f:
+                data = json.load(f)
+            rows += [_record_row(r) for r in data.get("runs", [])]
+        else:
+            df = pd.read_csv(path)
+            missing = {"instance", "method", "objective", "time"} - set(df.columns)
+            if missing:
+                raise SystemExit(f"{path}: missing column(s) {sorted(missing)}")
+            rows += df.to_dict("records")
+
+    df = pd.DataFrame(rows, columns=["instance", "method", "seed", "status",
+                                     "objective", "time", "class"])
+    df["status"] = df["status"].fillna("ok")
+    df["objective"] = pd.to_numeric(df["objective"], errors="coerce")
+    df["time"] = pd.to_numeric(df["time"], errors="coerce")
+    df["solved"] = (df["status"] == "ok") & df["objective"].notna()
+    df["class"] = df["class"].fillna(df["instance"].map(instance_class))
+    return df
+
+# ------------------------------------------------------------------ #
+# Metrics                                                            #
+# ------------------------------------------------------------------ #
+def add_gaps(df, target):
+    """Relative gap to the best objective on each instance (maximisation)."""
+    best = df[df["solved"]].groupby("instance")["objective"].max()
+    ref = df["instance"].map(best)
+    df["gap"] = (ref - df["objective"]) / ref.abs().clip(lower=1e-9)
+    df["on_target"] = df["solved"] & (df["gap"] <= target)
+    return df
+
+def shifted_geomean(times, shift):
+    t = np.asarray(times, dtype=float)
+    return float(np.exp(np.mean(np.log(t + shift))) - shift) if len(t) else np.nan
+
+def per_instance_times(df, time_cap):
+    """instance × method matrix of median time; unsolved → inf."""
+    ok = df["solved"] & (df["time"] <= time_cap)
+    t = df.assign(t=np.where(ok, df["time"], np.inf))
+    return t.groupby(["instance", "method"])["t"].median().unstack()
+
+def performance_profile(times, taus):
+    """{method: ρ(τ)} from an instance × method time matrix."""
+    best = times.min(axis=1).replace(0, 1e-9)
+    ratios = times.div(best, axis=0)
+    return {m: np.array([(ratios[m] <= tau).mean() for tau in taus])
+            for m in times.columns}
+
+def summary_table(df, shift, time_cap):
+    rows = []
+    for (cls, method), g in df.groupby(["class", "method"]):
+        t = np.where(g["solved"], g["time"].fillna(time_cap), time_cap)
+        rows.append(dict(
+            cls       = cls,
+            method    = method,
+            runs      = len(g),
+            failed    = int((~g["solved"]).sum()),
+            sgm_time  = shifted_geomean(np.minimum(t, time_cap), shift),
+            med_gap   = g.loc[g["solved"], "gap"].median(),
+            max_gap   = g.loc[g["solved"], "gap"].max(),
+            on_target = g["on_target"].mean(),
+        ))
+    return pd.DataFrame(rows).rename(columns={"cls": "class"})
+
+# ------------------------------------------------------------------ #
+# Plots                                                              #
+# ------------------------------------------------------------------ #
+def plot_profiles(times, out, title):
+    import matplotlib.pyplot as plt
+    finite = times.replace(np.inf, np.nan).div(times.min(axis=1), axis=0)
+    top = max(2.0, float(np.nanmax(finite.to_numpy())) if finite.notna().any().any() else 2.0)
+    taus = np.logspace(0, np.log10(top * 1.05), 200)
+    fig, ax = plt.subplots(figsize=(6, 4))
+    for method, rho in performance_profile(times, taus).items():
+        ax.step(taus, rho, where="post", label=method)
+    ax.set_xscale("log", base=2)
+    ax.set_ylim(0, 1.02)
+    ax.set_xlabel("τ (time / best time)")
+    ax.set_ylabel("share of instances")
+    ax.set_title(title)
+    ax.legend(loc="lower right")
+    fig.savefig(out, dpi=120, bbox_inches="tight")
+    plt.close(fig)
+
+def plot_ttt(df, out, target):
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=(6, 4))
+    for method, g in df.groupby("method"):
+        hit = np.sort(g.loc[g["on_target"], "time"].dropna().to_numpy())
+        if len(hit):
+            ax.step(hit, np.arange(1, len(hit) + 1) / len(g), where="post",
+                    label=method)
+    ax.set_xscale("log")
+    ax.set_ylim(0, 1.02)
+    ax.set_xlabel("time (s)")
+    ax.set_ylabel(f"share of runs with gap ≤ {100 * target:g}%")
+    ax.set_title("Time to target")
+    ax.legend(loc="lower right")
+    fig.savefig(out, dpi=120, bbox_inches="tight")
+    plt.close(fig)
+
+def plot_gaps(df, out):
+    import matplotlib.pyplot as plt
+    solved = df[df["solved"]]
+    classes = sorted(solved["class"].unique())
+    methods = sorted(solved["method"].unique())
+    fig, axes = plt.subplots(1, len(classes), sharey=True, squeeze=False,
+                             figsize=(max(6, 2.2 * len(classes)), 4))
+    for ax, cls in zip(axes[0], classes):
+        g = solved[solved["class"] == cls]
+        ax.boxplot([100 * g.loc[g["method"] == m, "gap"] for m in methods])
+        ax.set_xticks(range(1, len(methods) + 1), methods)
+        ax.set_title(cls, fontsize=9)
+        ax.tick_params(axis="x", rotation=45, labelsize=8)
+    axes[0][0].set_ylabel("gap to best (%)")
+    fig.savefig(out, dpi=120, bbox_inches="tight")
+    plt.close(fig)
+
+# ------------------------------------------------------------------ #
+# Report                                                             #
+# ------------------------------------------------------------------ #
+def _fmt(v):
+    if isinstance(v, float):
+        return "–" if np.isnan(v) else f"{v:.4g}"
+    return str(v)
+
+def markdown_table(df):
+    lines = ["| " + " | ".join(df.columns) + " |",
+             "|" + "---|" * len(df.columns)]
+    lines += ["| " + " | ".join(map(_fmt, row)) + " |"
+              for row in df.itertuples(index=False)]
+    return "\n".join(lines)
+
+def html_table(df):
+    head = "".join(f"<th>{html.escape(c)}</th>" for c in df.columns)
+    body = "".join("<tr>" + "".join(f"<td>{html.escape(_fmt(v))}</td>" for v in row)
+                   + "</tr>" for row in df.itertuples(index=False))
+    return f"<table><tr>{head}</tr>{body}</table>"
+
+def write_report(df, out_dir, shift, time_cap, target, sources):
+    import matplotlib
+    matplotlib.use("Agg")
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    overall = summary_table(df.assign(**{"class": "all"}), shift, time_cap)
+    by_class = summary_table(df, shift, time_cap)
+    times = per_instance_times(df, time_cap)
+
+    figures = [("Performance profile – all instances", "profile_all.png")]
+    plot_profiles(times, out_dir / "profile_all.png", "all instances")
+    for cls in sorted(df["class"].unique()):
+        sub = times.loc[times.index.map(instance_class) == cls]
+        if len(sub):
+            name = f"profile_{cls}.png"
+            plot_profiles(sub, out_dir / name, cls)
+            figures.append((f"Performance profile – {cls}", name))
+    plot_ttt(df, out_dir / "ttt.png", target)
+    figures.append(("Time to target", "ttt.png"))
+    plot_gaps(df, out_dir / "gaps.png")
+    figures.append(("Gap to best by class", "gaps.png"))
+
+    intro = (f"{len(df)} runs, {df['instance'].nunique()} instances, "
+             f"methods {', '.join(sorted(df['method'].unique()))}. "
+             f"Sources: {', '.join(map(str, sources))}. "
+             f"Shifted geometric mean with s = {shift:g} s, failures at "
+             f"{time_cap:g} s; target gap {100 * target:g}%.")
+    sections = [("Overall", overall), ("By class (style × work)", by_class)]
+
+    md = ["# Benchmark report", "", intro, ""]
+    for title, table in sections:
+        md += [f"## {title}", "", markdown_table(table), ""]
+    for title, name in figures:
+        md += [f"## {title}", "", f"![{title}]({name})", ""]
+    (out_dir / "report.md").write_text("\n".join(md))
+
+    body = [f"<h1>Benchmark report</h1><p>{html.escape(intro)}</p>"]
+    for title, table in sections:
+        body.append(f"<h2>{html.escape(title)}</h2>{html_table(table)}")
+    for title, name in figures:
+        body.append(f"<h2>{html.escape(title)}</h2><img src='{name}'>")
+    style = ("body{font-family:sans-serif;max-width:70em;margin:auto}"
+             "table{border-collapse:collapse}td,th{border:1px solid #ccc;"
+             "padding:2px 8px;text-align:right}")
+    (out_dir / "report.html").write_text(
+        f"<!doctype html><html><head><meta charset='utf-8'>"
+        f"<title>Benchmark report</title><style>{style}</style></head>"
+        f"<body>{''.join(body)}</body></html>")
+    return out_dir / "report.html"
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Benchmark report with performance profiles")
+    p.add_argument("results", nargs="+",
+                   help="campaign .jsonl, bench_harness .json, run_store .sqlite "
+                        "or long-format .csv")
+    p.add_argument("--out_dir", default="report")
+    p.add_argument("--shift", type=float, default=1.0,
+                   help="shift s of the geometric mean (s)")
+    p.add_argument("--time_cap", type=float, default=None,
+                   help="time charged to failed runs (default: slowest run)")
+    p.add_argument("--target", type=float, default=0.01,
+                   help="relative gap counted as 'on target'")
+    p.add_argument("--methods", nargs="+", default=None,
+                   help="only report these methods")
+    args = p.parse_args(argv)
+
+    missing = [x for x in args.results if not Path(x).exists()]
+    if missing:
+        raise SystemExit(f"{missing[0]} not found")
+
+    df = load_results(args.results)
+    if args.methods:
+        df = df[df["method"].isin(args.methods)]
+    if df.empty:
+        raise SystemExit("no runs found")
+    time_cap = args.time_cap or float(df["time"].max())
+    df = add_gaps(df, args.target)
+
+    out = write_report(df, args.out_dir, args.shift, time_cap, args.target,
+                       args.results)
+    print(f"Report written to {out} and {Path(args.out_dir) / 'report.md'}")
+
+
+if __name__ == "__main__":
+    main()
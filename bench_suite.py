@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+bench_suite.py
+--------------
+Scaling and regression benchmark for every solver.
+
+Each solver runs on a fixed, seeded ladder of synthetic instance sizes
+(courses × days × shifts, see generate_instances.py).  For every rung
+we record the parse / build / solve times (median of --repeats), the
+peak Python heap during one extra traced run (tracemalloc; memory held
+inside Gurobi is not visible to it), the objective and the gap — the
+MIP gap for `optimal`, the gap to `optimal` at the same rung for the
+heuristics when both ran.  A power law t ≈ c·n^b is then fitted per
+solver and phase, n being the number of candidate y variables.
+
+With --baseline the results are compared against a stored run; any
+time / memory ratio above 1 + tolerance (time: and more than
+--min_delta seconds) or objective drop is reported and the exit
+status is 1.  --save writes the current run as baseline.
+
+    python bench_suite.py --methods heuristic simple lazy \\
+        --baseline bench_baseline.json
+"""
+import argparse
+import json
+import math
+import platform
+import statistics
+import sys
+import tracemalloc
+from pathlib import Path
+
+from bench_harness import SOLVERS, run_method
+from common import parse_instance, phase
+from generate_instances import generate
+
+# (courses, days, shifts) – small enough for a laptop, wide enough to fit b
+LADDERS = {
+    "quick": [(2, 14, 8), (2, 28, 8), (3, 28, 16), (3, 56, 16)],
+    "full":  [(2, 14, 8), (2, 28, 16), (4, 28, 16), (4, 56, 16),
+              (4, 115, 16), (8, 115, 16), (8, 115, 24)],
+}
+TASKS_PER_COURSE = 6
+SEED = 2025
+PHASES = ["parse", "build", "solve"]
+
+def n_candidates(inst):
+    """Number of (k,t,i,j) inside the task windows = #y variables."""
+    return sum(1 for i in inst["I"] for j in inst["J"][i]
+               for key in inst["P"][i][j]
+               if inst["r"][i][j] <= key <= inst["d"][i][j])
+
+def run_rung(size, methods, repeats=3, time_limit=60):
+    """All methods on one ladder rung; returns {method: record}."""
+    courses, days, shifts = size
+    data = generate(courses, TASKS_PER_COURSE, days, shifts, seed=SEED)
+    out = {}
+    for method in methods:
+        samples = []
+        try:
+            for _ in range(repeats):
+                timings = {}
+                with phase(timings, "parse"):
+                    inst = parse_instance(data)
+                res = run_method(method, inst, SEED, time_limit, timings)
+                samples.append(timings)
+
+            tracemalloc.start()
+            try:
+                run_method(method, parse_instance(data), SEED, time_limit)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+        except Exception as e:
+            out[method] = dict(error=f"{type(e).__name__}: {e}")
+            continue
+
+        out[method] = dict(
+            n         = n_candidates(inst),
+            objective = res.get("objective"),
+            gap       = res.get("gap"),
+            peak_mb   = peak / 2**20,
+            **{ph: statistics.median(t[ph] for t in samples) for ph in PHASES},
+        )
+
+    opt = out.get("optimal", {}).get("objective")
+    for method, rec in out.items():
+        if method != "optimal" and opt and rec.get("objective") is not None:
+            rec["gap"] = (opt - rec["objective"]) / abs(opt)
+    return out
+
+def fit_exponent(points):
+    """Least-squares slope b of log t = log c + b·log n."""
+    pts = [(math.log(n), math.log(t)) for n, t in points if n > 0 and t > 0]
+    if len(pts) < 2:
+        return None
+    mx = statistics.fmean(x for x, _ in pts)
+    my = statistics.fmean(y for _, y in pts)
+    sxx = sum((x - mx) ** 2 for x, _ in pts)
+    if sxx == 0:
+        return None
+    return sum((x - mx) * (y - my) for x, y in pts) / sxx
+
+def compare(current, baseline, time_tol, mem_tol, obj_tol, min_delta=0.0):
+    """List of human-readable regressions against the baseline."""
+    issues = []
+    for key, methods in current["results"].items():
+        for method, rec in methods.items():
+            old = baseline["results"].get(key, {}).get(method)
+            if old is None or "error" in old:
+                continue
+            if "error" in rec:
+                issues.append(f"{method} {key}: {rec['error']}")
+                continue
+            for ph in PHASES:
+                if (old[ph] > 0 and rec[ph] / old[ph] > 1 + time_tol
+                        and rec[ph] - old[ph] > min_delta):
+                    issues.append(f"{method} {key} {ph}: "
+                                  f"{old[ph]:.4f}s → {rec[ph]:.4f}s")
+            if old["peak_mb"] > 0 and rec["peak_mb"] / old["peak_mb"] > 1 + mem_tol:
+                issues.append(f"{method} {key} peak: "
+                              f"{old['peak_mb']:.1f} → {rec['peak_mb']:.1f} MiB")
+            if (old["objective"] is not None and rec["objective"] is not None
+                    and rec["objective"] < old["objective"] - obj_tol):
+                issues.append(f"{method} {key} objective: "
+                              f"{old['objective']:.4f} → {rec['objective']:.4f}")
+    return issues
+
+def main(argv=None):
+    p = argparse.ArgumentParser(
+        description="Scaling ladder + regression check for every solver")
+    p.add_argument("--methods", nargs="+", choices=sorted(SOLVERS),
+                   default=["heuristic", "simple", "lazy"])
+    p.add_argument("--ladder", choices=sorted(LADDERS), default="quick")
+    p.add_argument("--repeats", type=int, default=3)
+    p.add_argument("--time_limit", type=int, default=60)
+    p.add_argument("--out", default="bench_suite.json")
+    p.add_argument("--baseline", default=None,
+                   help="stored run to compare against")
+    p.add_argument("--save", action="store_true",
+                   help="also write this run to --baseline")
+    p.add_argument("--time_tol", type=float, default=0.25,
+                   help="allowed relative slow-down per phase")
+    p.add_argument("--min_delta", type=float, default=0.005,
+                   help="ignore slow-downs below this many seconds")
+    p.add_argument("--mem_tol", type=float, default=0.25,
+                   help="allowed relative growth of peak memory")
+    p.add_argument("--obj_tol", type=float, default=1e-6,
+                   help="allowed absolute objective drop")
+    args = p.parse_args(argv)
+
+    results = {}
+    for size in LADDERS[args.ladder]:
+        key = "x".join(map(str, size))
+        results[key] = run_rung(size, args.methods, args.repeats,
+                                args.time_limit)
+        for method, rec in results[key].items():
+            if "error" in rec:
+                print(f"✗ {key:10s} {method:10s} {rec['error']}")
+                continue
+            gap = "" if rec["gap"] is None else f"gap={100 * rec['gap']:.2f}%"
+            print(f"✓ {key:10s} {method:10s} n={rec['n']:7d}  "
+                  f"build={rec['build']:.3f}s solve={rec['solve']:.3f}s  "
+                  f"peak={rec['peak_mb']:.1f}MiB  {gap}")
+
+    exponents = {
+        method: {ph: fit_exponent([(r[method]["n"], r[method][ph])
+                                   for r in results.values()
+                                   if "error" not in r[method]])
+                 for ph in PHASES}
+        for method in args.methods
+    }
+    print("\nScaling exponents b (t ≈ c·n^b):")
+    for method, exps in exponents.items():
+        print(f"  {method:10s} " + "  ".join(
+            f"{ph}={'n/a' if b is None else f'{b:.2f}'}" for ph, b in exps.items()))
+
+    current = dict(meta=dict(machine=platform.node(),
+                             python=platform.python_version(),
+                             ladder=args.ladder, repeats=args.repeats,
+                             seed=SEED, tasks_per_course=TASKS_PER_COURSE),
+                   results=results, exponents=exponents)
+    with open(args.out, "w") as f:
+        json.dump(current, f, indent=2)
+    print(f"Results written to {args.out}")
+
+    if args.baseline and args.save:
+        with open(args.baseline, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+    elif args.baseline:
+        if not Path(args.baseline).exists():
+            raise SystemExit(f"{args.baseline} not found (use --save to create it)")
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        issues = compare(current, baseline,
+                         args.time_tol, args.mem_tol, args.obj_tol,
+                         args.min_delta)
+        if issues:
+            print(f"\n✗ {len(issues)} regression(s) against {args.baseline}:")
+            for msg in issues:
+                print("  " + msg)
+            sys.exit(1)
+        print(f"\n✓ No regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
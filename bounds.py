@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+bounds.py
+---------
+Upper bound on the optimal objective without a MIP solver, so that a
+heuristic schedule gets a certified gap
+
+    gap = (UB − objective) / |objective|        (Gurobi's MIPGap)
+
+instead of a comparison with a full run.py solve.
+
+The couplings of the MIP in run.py are priced out (Lagrangian
+relaxation of its LP relaxation):
+
+    μ[k, t] ≥ 0      one task per shift       Σ_ij y[k,t,i,j] ≤ 1
+    θ[k] ∈ [0, 1]    overtime                 β·max(0, n_k − H*_k) ≥ β·θ_k (n_k − H*_k)
+    ν[i, j] ≥ 0      slots per task           Σ_kt y[k,t,i,j] ≤ ceil(E)
+
+With the prices fixed, every task is its own fractional knapsack.  It
+buys effort from the cells of its window in order of price per unit
+of effort (μ + βθ + ν) / P, as long as that price is below the task's
+value c = 4·w_i·S_ij / (W·E_ij), until E_ij is reached.  All tasks are
+solved together with one NumPy sort of the candidate cells by
+(task, price per effort).  L(μ, θ, ν) bounds the optimum from above
+for every price vector; the prices follow projected subgradient steps
+(Polyak step towards 5 % below the best bound, or the best known
+objective if that is higher), and the smallest L seen is returned.
+
+Mandatory seats are fixed, the grade minima G ≥ B are dropped, and the
+break rule is not part of the MIP, so the bound holds for the schedules
+of every solver in this repository.
+
+    python bounds.py instance.json
+    python bounds.py instance.json out/*.csv --solve lazy simple
+"""
+import argparse
+import glob
+import itertools
+import math
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+from common import evaluate, load_instance, parse_instance, phase, read_schedule
+
+SHIFTS_PER_HOUR = 1             # as in run.py (slots per task ≤ ceil(E / this))
+
+# ------------------------------------------------------------------ #
+# Relaxation data                                                    #
+# ------------------------------------------------------------------ #
+class Relaxation:
+    """Per-task values and the candidate (cell, task) pairs as arrays."""
+
+    def __init__(self, inst):
+        K, I, J = inst["K"], inst["I"], inst["J"]
+        S, E, w, P = inst["S"], inst["E"], inst["w"], inst["P"]
+        r, d, slot = inst["r"], inst["d"], inst["slot"]
+        done, prices = inst.get("done", {}), inst.get("prices", {})
+        used = inst.get("used", {})                 # slots spent before a re-plan
+        W = sum(w.values())
+        tasks = [(i, j) for i in I for j in J[i]]
+        day_ix = {k: n for n, k in enumerate(K)}
+
+        mandatory = {(k, t, i, j) for i, j in tasks
+                     for k, t in map(tuple, slot.get(i, {}).get(j, []))
+                     if r[i][j] <= (k, t) <= d[i][j]}
+        taken = {(k, t) for k, t, _, _ in mandatory}
+        m_effort, m_count = Counter(), Counter()
+        for k, t, i, j in mandatory:
+            m_effort[i, j] += P[i][j].get((k, t), 0.0)
+            m_count[i, j] += 1
+        self.m_day = np.zeros(len(K))
+        for k, _, _, _ in mandatory:
+            self.m_day[day_ix[k]] += 1
+
+        self.beta = inst["beta"]
+        self.H = np.array([inst["H_star"][k] for k in K], dtype=float)
+        self.c = np.array([4 * w[i] * S[i][j] / (W * E[i][j]) for i, j in tasks])
+        have = np.array([min(done.get(ij, 0.0) + m_effort[ij], E[ij[0]][ij[1]])
+                         for ij in tasks])
+        self.R = np.array([E[i][j] for i, j in tasks]) - have   # effort still useful
+        self.fixed = float((self.c * have).sum())
+        self.slots = np.array([max(0, math.ceil(E[i][j] / SHIFTS_PER_HOUR)
+                                   - used.get((i, j), 0) - m_count[i, j])
+                               for i, j in tasks], dtype=float)
+
+        # free cells of each task's window with P > 0
+        cells, tau, cell, day, p, cost = {}, [], [], [], [], []
+        for n, (i, j) in enumerate(tasks):
+            for (k, t), v in P[i][j].items():
+                if v <= 0 or (k, t) in taken or not r[i][j] <= (k, t) <= d[i][j]:
+                    continue
+                tau.append(n)
+                cell.append(cells.setdefault((k, t), len(cells)))
+                day.append(day_ix[k])
+                p.append(v)
+                cost.append(prices.get((k, t), 0.0))
+        self.n_cells, self.n_tasks = len(cells), len(tasks)
+        self.tau, self.cell, self.day = (np.array(x, dtype=int) for x in (tau, cell, day))
+        self.P, self.cost = np.array(p, dtype=float), np.array(cost, dtype=float)
+        self.task_P = np.bincount(self.tau, self.P, minlength=self.n_tasks)
+        self.offset = np.concatenate(([0.0], np.cumsum(self.task_P)[:-1]))
+
+    def dual(self, mu, theta, nu):
+        """L(μ, θ, ν) and its subgradients (dμ, dθ, dν)."""
+        tau, P = self.tau, self.P
+        price = mu[self.cell] + self.beta * theta[self.day] + nu[tau] + self.cost
+        ratio = price / P
+        order = np.lexsort((ratio, tau))                   # by task, cheapest first
+        ts, Ps = tau[order], P[order]
+        before = np.cumsum(Ps) - Ps - self.offset[ts]      # effort bought earlier
+        y = np.clip((self.R[ts] - before) / Ps, 0.0, 1.0)
+        y *= ratio[order] < self.c[ts]
+        value = (y * (self.c[ts] * Ps - price[order])).sum()
+        y_e = np.empty_like(y)
+        y_e[order] = y
+
+        L = (self.fixed + value + mu.sum() + (nu * self.slots).sum()
+             + self.beta * (theta * (self.H - self.m_day)).sum())
+        n_day = np.bincount(self.day, y_e, minlength=len(self.H))
+        return L, (1.0 - np.bincount(self.cell, y_e, minlength=self.n_cells),
+                   self.beta * (self.H - self.m_day - n_day),
+                   self.slots - np.bincount(tau, y_e, minlength=self.n_tasks))
+
+# ------------------------------------------------------------------ #
+# Subgradient                                                        #
+# ------------------------------------------------------------------ #
+def upper_bound(inst, lower=None, iterations=300, tol=1e-4, time_limit=None,
+                timings=None):
+    """
+    Lagrangian upper bound on the optimum of `inst`.  `lower` (the
+    objective of a known schedule) only steers the step size.  Stops
+    after `iterations`, `time_limit` seconds, or when the step factor
+    has been halved below `tol`.  Returns a dict with bound,
+    iterations and seconds.
+    """
+    timings = {} if timings is None else timings
+    t0 = time.perf_counter()
+    with phase(timings, "build"):
+        rel = Relaxation(inst)
+    mu, theta, nu = np.zeros(rel.n_cells), np.zeros(len(rel.H)), np.zeros(rel.n_tasks)
+    best, lam, stall, n = math.inf, 2.0, 0, 0
+    with phase(timings, "solve"):
+        while n < iterations and lam >= tol:
+            n += 1
+            L, (g_mu, g_theta, g_nu) = rel.dual(mu, theta, nu)
+            if L < best - 1e-9:
+                best, stall = L, 0
+            else:
+                stall += 1
+                if stall >= 10:
+                    lam, stall = lam / 2, 0
+            norm = (g_mu ** 2).sum() + (g_theta ** 2).sum() + (g_nu ** 2).sum()
+            if norm < 1e-12:
+                break                                  # all couplings tight
+            target = best - 0.05 * abs(best)
+            if lower is not None:
+                target = max(target, lower)
+            step = lam * max(L - target, 1e-6) / norm
+            mu = np.maximum(0.0, mu - step * g_mu)
+            theta = np.clip(theta - step * g_theta, 0.0, 1.0)
+            nu = np.maximum(0.0, nu - step * g_nu)
+            if time_limit is not None and time.perf_counter() - t0 > time_limit:
+                break
+    return dict(bound=float(best), iterations=n, timings=timings,
+                seconds=time.perf_counter() - t0)
+
+def certified_gap(bound, objective):
+    """(UB − objective) / |objective|, the gap Gurobi would report."""
+    if objective is None:
+        return None
+    return (bound - objective) / max(abs(objective), 1e-9)
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Solver-free upper bound and certified gaps")
+    p.add_argument("instance")
+    p.add_argument("schedules", nargs="*", help="schedule CSVs or glob patterns")
+    p.add_argument("--solve", nargs="+", default=[],
+                   choices=["optimal", "heuristic", "simple", "lazy", "multires"],
+                   help="also solve the instance with these methods")
+    p.add_argument("--iterations", type=int, default=300)
+    p.add_argument("--time_limit", type=float, default=None,
+                   help="seconds for the bound (default: --iterations only)")
+    args = p.parse_args(argv)
+
+    inst = parse_instance(load_instance(args.instance))
+    results = {}
+    for path in sorted(itertools.chain.from_iterable(
+            glob.glob(pat) or [pat] for pat in args.schedules)):
+        name = Path(path).stem
+        results[path if name in results else name] = \
+            evaluate(inst, read_schedule(path))["objective"]
+    if args.solve:
+        from bench_harness import run_method
+        for method in args.solve:
+            try:
+                results[f"solve:{method}"] = run_method(method, inst, 0)["objective"]
+            except Exception as e:
+                print(f"✗ {method}: {type(e).__name__}: {e}")
+
+    lower = max((v for v in results.values() if v is not None), default=None)
+    res = upper_bound(inst, lower, args.iterations, time_limit=args.time_limit)
+    print(f"Upper bound {res['bound']:.4f}  ({res['iterations']} iterations, "
+          f"{1000 * res['seconds']:.1f} ms)")
+    for name, obj in sorted(results.items(), key=lambda kv: -(kv[1] or -math.inf)):
+        gap = certified_gap(res["bound"], obj)
+        print(f"  {name:20s} {'–' if obj is None else f'{obj:.4f}':>8s}  "
+              f"certified gap {'–' if gap is None else f'{gap:.2%}':>8s}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,10 +11,22 @@ NEW in this version
   count toward the effort budget.
 • Keeps the EFFORT_FACTOR scaling and every other feature
   from the previous script.
+• Course definitions can come from a data file (--tasks, CSV or
+  JSON, see load_tasks) instead of the literals in build_tasks();
+  --export writes the built-in list in that format.
+• Seat-times are indexed by (day, shift); every conflict is
+  reported in one SeatConflictError instead of stopping at the first.
 """
 
+import argparse
+import csv
 import json
+import sys
 from collections import defaultdict
+from pathlib import Path
+
+from common import phase
+from profiling import add_profile_args, make_timings
 
 # ------------------------------------------------------------------ #
 # Global parameters                                                  #
@@ -51,7 +63,32 @@ def add_exam(course, name, w_pct, due, effort,
         fixed = [(due, DEFAULT_EXAM_SHIFT)]
     add(course, name, w_pct, rel, due, effort, fixed, cat, tlist)
 
-def add_weekly_lectures(tlist):
+class SeatConflictError(ValueError):
+    """Several tasks claim the same mandatory (day, shift)."""
+
+    def __init__(self, conflicts):
+        self.conflicts = conflicts                # (day, shift) → [(course, task)]
+        lines = [f"  {seat}: " + ", ".join(f"{c}:{t}" for c, t in owners)
+                 for seat, owners in sorted(conflicts.items())]
+        super().__init__(f"{len(conflicts)} duplicate seat-time(s)\n"
+                         + "\n".join(lines))
+
+def index_tasks(tasks):
+    """One pass: (task rows by course, [(course, task)] by fixed (day, shift))."""
+    by_course, by_seat = defaultdict(list), defaultdict(list)
+    for row in tasks:
+        course, name, *_, fixed, _ = row
+        by_course[course].append(row)
+        for day, sh in fixed or ():
+            by_seat[day, sh].append((course, name))
+    return by_course, by_seat
+
+def find_conflicts(tasks):
+    """{(day, shift): [(course, task), …]} for seats claimed more than once."""
+    _, by_seat = index_tasks(tasks)
+    return {seat: owners for seat, owners in by_seat.items() if len(owners) > 1}
+
+def add_weekly_lectures(tlist, weeks=WEEKS):
     """
     Inject a zero-weight ‘Lecture Wk n’ task for every course *unless* that
     course already has weekly graded attendance/participation entries
@@ -62,22 +99,21 @@ def add_weekly_lectures(tlist):
       • effort  = LECTURE_HOURS_PER_WEEK / WEEKS   (≈ 0.2 h, later × EFFORT_FACTOR)
       • fixed   = None               (optimizer may place freely)
     """
-    per_course = {c for c, *_ in tlist}
-    weekly_eff = round(LECTURE_HOURS_PER_WEEK / WEEKS, 3)
+    by_course, _ = index_tasks(tlist)
+    weekly_eff = round(LECTURE_HOURS_PER_WEEK / weeks, 3)
 
-    for course in per_course:
+    for course, rows in by_course.items():
         # Does this course already have weekly graded participation tasks?
         has_weekly_graded = any(
-            c == course and w_pct > 0 and (
-                "Participation" in name or "Class Part" in name)
-            for c, name, w_pct, *_ in tlist
+            w_pct > 0 and ("Participation" in name or "Class Part" in name)
+            for _, name, w_pct, *_ in rows
         )
         if has_weekly_graded:
             continue   # skip lecture placeholders for this course
 
         # Otherwise, add lecture placeholders for every week
-        cat = next(cat for c, _, _, _, _, _, _, cat in tlist if c == course)
-        for w in range(1, WEEKS + 1):
+        cat = rows[0][-1]
+        for w in range(1, weeks + 1):
             day = 1 + 7 * (w - 1)          # Monday of week w
             name = f"Lecture Wk {w}"
             add(course, name, 0.0, day, day, weekly_eff,
@@ -86,161 +122,284 @@ def add_weekly_lectures(tlist):
 # ------------------------------------------------------------------ #
 # TASK LIST  (unchanged original data)                               #
 # ------------------------------------------------------------------ #
-TASKS = []
-
-# === 1. IM2010 Operations Research (SOC) ===========================
-IM, im_cat = "IM2010", "SOC"
-for row in [
-    ("HW0",0, 1, 7,2), ("Homework 1",5,22,26,4),
-    ("Homework 2",5,29,33,4), ("Homework 3",5,78,82,4),
-    ("FPP",0,36,40,3), ("Midterm Project",20,64,82,12),
-    ("FP Video",0,85,96,8), ("FP Report",25,85,96,10),
-    ("Survey/Admin",5,1,106,1),
-]:
-    add(IM, *row, None, im_cat, TASKS)
-
-add_exam(IM, "Midterm Exam", 12, 50, 6+3,
-         fixed=[(50,2),(50,3),(50,4)], cat=im_cat, tlist=TASKS)
-add_exam(IM, "Final Exam",   18,106, 6+3,
-         fixed=[(106,2),(106,3),(106,4)], cat=im_cat, tlist=TASKS)
-
-for w,d in enumerate([44,51,58,65,72], start=1):
-    add(IM, f"Pre-lecture W{w}", 1, d, d, 1,
-        None,           
-        im_cat,
-        TASKS)
-
-# === 2. MATH4008 Calculus III (STEM) ===============================
-M8, cat8 = "MATH4008","STEM"
-for nm,w,rel,due,e in [
-    ("Worksheet 1",7, 8,22,2), ("Worksheet 2",7,22,36,2),
-    ("Worksheet 3",7,36,50,2), ("WeBWorK", 10,1,56,4)
-]:
-    add(M8, nm, w, rel, due, e, None, cat8, TASKS)
-add_exam(M8,"Quiz 1",10,18,3+1,fixed=[(18,11)],cat=cat8,tlist=TASKS)
-add_exam(M8,"Quiz 2",10,39,3+1,fixed=[(39,11)],cat=cat8,tlist=TASKS)
-add_exam(M8,"Final Exam",50,57,8+3,
-         fixed=[(57,7),(57,8),(57,9)],cat=cat8,tlist=TASKS)
-
-# === 3. MATH4010 Calculus IV (STEM) ================================
-M10, cat10 = "MATH4010","STEM"
-for nm,w,rel,due,e in [
-    ("HW1",5,68,82,2), ("HW2",5,82,96,2),
-    ("HW3",5,96,109,2), ("WebWork",5,57,109,4)
-]:
-    add(M10,nm,w,rel,due,e,None,cat10,TASKS)
-add_exam(M10,"Quiz 1",15,82,3+1,fixed=[(82,11)],cat=cat10,tlist=TASKS)
-add_exam(M10,"Quiz 2",15,96,3+1,fixed=[(96,11)],cat=cat10,tlist=TASKS)
-add_exam(M10,"Final Exam",50,111,8+3,
-         fixed=[(111,7),(111,8),(111,9)],cat=cat10,tlist=TASKS)
-
-# === 4. CSIE1212 Data Structures (STEM) ============================
-CS, ccat = "CSIE1212","STEM"
-for i,(rel,due,e) in enumerate([(1,64,6),(22,36,8),(36,64,8),
-                                (57,78,8),(78,92,8)]):
-    add(CS,f"Homework {i}",4,rel,due,e,None,ccat,TASKS)
-for lbl,rel,due in zip("ABCDEF",[8,15,22,29,36,43],[64]*6):
-    add(CS,f"Mini HW {lbl}",10/12,rel,due,1.5,None,ccat,TASKS)
-for lbl,rel,due in zip("GHIJKL",[43,57,71,85,99,92],[115]*6):
-    add(CS,f"Mini HW {lbl}",10/12,rel,due,1.5,None,ccat,TASKS)
-for nm,w,rel,due,e in [("Earth Game",4,57,64,3),
-                       ("Software Dev Game",3,78,85,3),
-                       ("Kahoot Review",3,92,99,1)]:
-    add(CS,nm,w,rel,due,e,None,ccat,TASKS)
-add_exam(CS,"With-Video Quizzes",0,115,6,cat=ccat,tlist=TASKS)
-add_exam(CS,"Midterm Exam",25, 50,6+1,fixed=[(50,8)], cat=ccat,tlist=TASKS)
-add_exam(CS,"Final Exam", 25,106,6+1,fixed=[(106,8)], cat=ccat,tlist=TASKS)
-
-# === 5. ECON1023 Macroeconomics (SOC) ==============================
-EC, ecat = "ECON1023","SOC"
-for q,(rel,due,day) in enumerate(
-        [(14,26,26),(23,33,33),(30,40,40),
-         (42,54,54),(54,68,68),(61,75,75)], start=1):
-    add_exam(EC,f"Quiz {q}",4,due,2,fixed=[(day,4)],cat=ecat,tlist=TASKS)
-add_exam(EC,"Midterm Exam",40, 56,6+3,
-         fixed=[(56,3),(56,4),(56,5)],cat=ecat,tlist=TASKS)
-add_exam(EC,"Final Exam", 40,110,6+3,fixed=[(110,4)],cat=ecat,tlist=TASKS)
-
-# === 6. JPNL2018 Basic Japanese (HUM) ==============================
-JP, jcat = "JPNL2018","HUM"
-for w,d in enumerate(range(45,109,7),start=1):
-    add(JP,f"Class Part W{w}",1,d,d,0.5,
-        fixed=None, cat=jcat,tlist=TASKS)
-for w,(rel,due) in enumerate(zip(range(45,108,7),range(52,116,7)),start=1):
-    add(JP,f"Post-HW W{w}",1,rel,due,1,None,jcat,TASKS)
-for w,d in enumerate(range(45,109,7),start=1):
-    add(JP,f"Reading W{w}",1,d,d,0.5,None,jcat,TASKS)
-for w,d in enumerate(range(45,109,7),start=1):
-    add_exam(JP,f"In-class Quiz W{w}",1,d,0.5+1,
-             fixed=[(d,5)],cat=jcat,tlist=TASKS)
-add_exam(JP,"Midterm Exam",30,50,4+3,
-         fixed=[(50,5),(50,6)],cat=jcat,tlist=TASKS)
-add_exam(JP,"Final Exam",30,113,4+3,
-         fixed=[(113,2),(113,3),(113,4)],cat=jcat,tlist=TASKS)
-
-# === 7. IM3004 Organizational Behaviour (SOC) =====================
-OB, obcat = "IM3004","SOC"
-add(OB,"Case Study Presentation",25,1,92,8+1,None,obcat,TASKS)
-add_exam(OB,"Midterm Exam",30,50,6+1,fixed=[(50,7)],cat=obcat,tlist=TASKS)
-add_exam(OB,"Final Exam", 30,106,6+1,fixed=[(106,7)],cat=obcat,tlist=TASKS)
-for w,d in enumerate(range(42,113,5),start=1):
-    sh = 6 if d == 57 else 7
-    add(OB,f"Participation W{w}",1,d,d,0.5,
-        fixed=None,cat=obcat,tlist=TASKS)
-
-# === 8. MGT1002 Accounting Principles (2) (SOC) ===================
-AC, acat = "MGT1002","SOC"
-add(AC,"Quiz",   4,15,22,1+1,fixed=[(22,10)],cat=acat,tlist=TASKS)
-add(AC,"Project",6,99,103,5+1,fixed=[(103,10)],cat=acat,tlist=TASKS)
-add_exam(AC,"Exam 1",27,31,6+1,fixed=[(31,10)],cat=acat,tlist=TASKS)
-add_exam(AC,"Exam 2",27,66,6+1,fixed=[(66,10)],cat=acat,tlist=TASKS)
-add_exam(AC,"Exam 3",26,109,6+1,fixed=[(109,10)],cat=acat,tlist=TASKS)
-for w,d in enumerate(range(45,109,7),start=1):
-    sh = 11 if d == 66 else 10
-    add(AC,f"TA Session W{w}",1,d,d,0.5,
-        fixed=None,cat=acat,tlist=TASKS)
+def build_tasks():
+    """Return the hand-entered TASKS list (weekly lectures not yet added)."""
+    TASKS = []
+
+    # === 1. IM2010 Operations Research (SOC) ===========================
+    IM, im_cat = "IM2010", "SOC"
+    for row in [
+        ("HW0",0, 1, 7,2), ("Homework 1",5,22,26,4),
+        ("Homework 2",5,29,33,4), ("Homework 3",5,78,82,4),
+        ("FPP",0,36,40,3), ("Midterm Project",20,64,82,12),
+        ("FP Video",0,85,96,8), ("FP Report",25,85,96,10),
+        ("Survey/Admin",5,1,106,1),
+    ]:
+        add(IM, *row, None, im_cat, TASKS)
+
+    add_exam(IM, "Midterm Exam", 12, 50, 6+3,
+             fixed=[(50,2),(50,3),(50,4)], cat=im_cat, tlist=TASKS)
+    add_exam(IM, "Final Exam",   18,106, 6+3,
+             fixed=[(106,2),(106,3),(106,4)], cat=im_cat, tlist=TASKS)
+
+    for w,d in enumerate([44,51,58,65,72], start=1):
+        add(IM, f"Pre-lecture W{w}", 1, d, d, 1,
+            None,           
+            im_cat,
+            TASKS)
+
+    # === 2. MATH4008 Calculus III (STEM) ===============================
+    M8, cat8 = "MATH4008","STEM"
+    for nm,w,rel,due,e in [
+        ("Worksheet 1",7, 8,22,2), ("Worksheet 2",7,22,36,2),
+        ("Worksheet 3",7,36,50,2), ("WeBWorK", 10,1,56,4)
+    ]:
+        add(M8, nm, w, rel, due, e, None, cat8, TASKS)
+    add_exam(M8,"Quiz 1",10,18,3+1,fixed=[(18,11)],cat=cat8,tlist=TASKS)
+    add_exam(M8,"Quiz 2",10,39,3+1,fixed=[(39,11)],cat=cat8,tlist=TASKS)
+    add_exam(M8,"Final Exam",50,57,8+3,
+             fixed=[(57,7),(57,8),(57,9)],cat=cat8,tlist=TASKS)
+
+    # === 3. MATH4010 Calculus IV (STEM) ================================
+    M10, cat10 = "MATH4010","STEM"
+    for nm,w,rel,due,e in [
+        ("HW1",5,68,82,2), ("HW2",5,82,96,2),
+        ("HW3",5,96,109,2), ("WebWork",5,57,109,4)
+    ]:
+        add(M10,nm,w,rel,due,e,None,cat10,TASKS)
+    add_exam(M10,"Quiz 1",15,82,3+1,fixed=[(82,11)],cat=cat10,tlist=TASKS)
+    add_exam(M10,"Quiz 2",15,96,3+1,fixed=[(96,11)],cat=cat10,tlist=TASKS)
+    add_exam(M10,"Final Exam",50,111,8+3,
+             fixed=[(111,7),(111,8),(111,9)],cat=cat10,tlist=TASKS)
+
+    # === 4. CSIE1212 Data Structures (STEM) ============================
+    CS, ccat = "CSIE1212","STEM"
+    for i,(rel,due,e) in enumerate([(1,64,6),(22,36,8),(36,64,8),
+                                    (57,78,8),(78,92,8)]):
+        add(CS,f"Homework {i}",4,rel,due,e,None,ccat,TASKS)
+    for lbl,rel,due in zip("ABCDEF",[8,15,22,29,36,43],[64]*6):
+        add(CS,f"Mini HW {lbl}",10/12,rel,due,1.5,None,ccat,TASKS)
+    for lbl,rel,due in zip("GHIJKL",[43,57,71,85,99,92],[115]*6):
+        add(CS,f"Mini HW {lbl}",10/12,rel,due,1.5,None,ccat,TASKS)
+    for nm,w,rel,due,e in [("Earth Game",4,57,64,3),
+                           ("Software Dev Game",3,78,85,3),
+                           ("Kahoot Review",3,92,99,1)]:
+        add(CS,nm,w,rel,due,e,None,ccat,TASKS)
+    add_exam(CS,"With-Video Quizzes",0,115,6,cat=ccat,tlist=TASKS)
+    add_exam(CS,"Midterm Exam",25, 50,6+1,fixed=[(50,8)], cat=ccat,tlist=TASKS)
+    add_exam(CS,"Final Exam", 25,106,6+1,fixed=[(106,8)], cat=ccat,tlist=TASKS)
+
+    # === 5. ECON1023 Macroeconomics (SOC) ==============================
+    EC, ecat = "ECON1023","SOC"
+    for q,(rel,due,day) in enumerate(
+            [(14,26,26),(23,33,33),(30,40,40),
+             (42,54,54),(54,68,68),(61,75,75)], start=1):
+        add_exam(EC,f"Quiz {q}",4,due,2,fixed=[(day,4)],cat=ecat,tlist=TASKS)
+    add_exam(EC,"Midterm Exam",40, 56,6+3,
+             fixed=[(56,3),(56,4),(56,5)],cat=ecat,tlist=TASKS)
+    add_exam(EC,"Final Exam", 40,110,6+3,fixed=[(110,4)],cat=ecat,tlist=TASKS)
+
+    # === 6. JPNL2018 Basic Japanese (HUM) ==============================
+    JP, jcat = "JPNL2018","HUM"
+    for w,d in enumerate(range(45,109,7),start=1):
+        add(JP,f"Class Part W{w}",1,d,d,0.5,
+            fixed=None, cat=jcat,tlist=TASKS)
+    for w,(rel,due) in enumerate(zip(range(45,108,7),range(52,116,7)),start=1):
+        add(JP,f"Post-HW W{w}",1,rel,due,1,None,jcat,TASKS)
+    for w,d in enumerate(range(45,109,7),start=1):
+        add(JP,f"Reading W{w}",1,d,d,0.5,None,jcat,TASKS)
+    for w,d in enumerate(range(45,109,7),start=1):
+        add_exam(JP,f"In-class Quiz W{w}",1,d,0.5+1,
+                 fixed=[(d,5)],cat=jcat,tlist=TASKS)
+    add_exam(JP,"Midterm Exam",30,50,4+3,
+             fixed=[(50,5),(50,6)],cat=jcat,tlist=TASKS)
+    add_exam(JP,"Final Exam",30,113,4+3,
+             fixed=[(113,2),(113,3),(113,4)],cat=jcat,tlist=TASKS)
+
+    # === 7. IM3004 Organizational Behaviour (SOC) =====================
+    OB, obcat = "IM3004","SOC"
+    add(OB,"Case Study Presentation",25,1,92,8+1,None,obcat,TASKS)
+    add_exam(OB,"Midterm Exam",30,50,6+1,fixed=[(50,7)],cat=obcat,tlist=TASKS)
+    add_exam(OB,"Final Exam", 30,106,6+1,fixed=[(106,7)],cat=obcat,tlist=TASKS)
+    for w,d in enumerate(range(42,113,5),start=1):
+        sh = 6 if d == 57 else 7
+        add(OB,f"Participation W{w}",1,d,d,0.5,
+            fixed=None,cat=obcat,tlist=TASKS)
+
+    # === 8. MGT1002 Accounting Principles (2) (SOC) ===================
+    AC, acat = "MGT1002","SOC"
+    add(AC,"Quiz",   4,15,22,1+1,fixed=[(22,10)],cat=acat,tlist=TASKS)
+    add(AC,"Project",6,99,103,5+1,fixed=[(103,10)],cat=acat,tlist=TASKS)
+    add_exam(AC,"Exam 1",27,31,6+1,fixed=[(31,10)],cat=acat,tlist=TASKS)
+    add_exam(AC,"Exam 2",27,66,6+1,fixed=[(66,10)],cat=acat,tlist=TASKS)
+    add_exam(AC,"Exam 3",26,109,6+1,fixed=[(109,10)],cat=acat,tlist=TASKS)
+    for w,d in enumerate(range(45,109,7),start=1):
+        sh = 11 if d == 66 else 10
+        add(AC,f"TA Session W{w}",1,d,d,0.5,
+            fixed=None,cat=acat,tlist=TASKS)
+    return TASKS
 
 # ------------------------------------------------------------------ #
-# >>>  inject weekly lecture tasks  <<<                              #
+# Data files                                                         #
 # ------------------------------------------------------------------ #
-add_weekly_lectures(TASKS)
+FIELDS = ["course", "name", "weight", "release", "due", "effort",
+          "fixed", "category", "kind", "window"]
+
+def _parse_fixed(text):
+    """'50:2 50:3' → [(50, 2), (50, 3)]; '' → None."""
+    pairs = [tuple(map(int, p.split(":"))) for p in str(text or "").split()]
+    return pairs or None
+
+def load_tasks(path):
+    """
+    Task list from a data file.  CSV columns / JSON object keys:
+
+      course, name, weight (%), release, due, effort (un-scaled),
+      fixed ('day:shift day:shift' in CSV, [[day, shift], …] in JSON),
+      category, kind ('task' | 'exam'), window (exam prep days)
+
+    Exams without a release day get one from add_exam() (due - window)
+    and, without fixed seats, the default exam shift.  A JSON file is
+    either a list of tasks or {"tasks": [...], "effort_factor": {...}};
+    returns (tasks, effort_factor or {}).
+    """
+    path = Path(path)
+    factors = {}
+    if path.suffix == ".json":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data, factors = data["tasks"], data.get("effort_factor", {})
+        rows = [dict(row, fixed=" ".join(f"{d}:{s}" for d, s in row.get("fixed") or []))
+                for row in data]
+    else:
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+
+    tasks = []
+    for n, row in enumerate(rows, start=1):
+        try:
+            course, name = row["course"], row["name"]
+            weight, due = float(row["weight"]), int(row["due"])
+            effort, fixed = float(row["effort"]), _parse_fixed(row.get("fixed"))
+            cat = row.get("category") or "STEM"
+            release = row.get("release")
+            if (row.get("kind") or "task") == "exam" and release in (None, ""):
+                add_exam(course, name, weight, due, effort, fixed, cat, tasks,
+                         window=int(row.get("window") or 21))
+            else:
+                add(course, name, weight, int(release), due, effort, fixed, cat, tasks)
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"{path}: task {n}: {type(e).__name__}: {e}") from None
+    return tasks, factors
+
+def export_tasks(tasks, path):
+    """Write a task list in the load_tasks() CSV format."""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(FIELDS)
+        for course, name, w_pct, rel, due, eff, fixed, cat in tasks:
+            w.writerow([course, name, w_pct, rel, due, eff,
+                        " ".join(f"{d}:{s}" for d, s in fixed or []),
+                        cat, "task", ""])
 
 # ------------------------------------------------------------------ #
 # JSON assembly + duplicate-slot check                               #
 # ------------------------------------------------------------------ #
-J,S,E,r,d,slot,category = defaultdict(list),defaultdict(dict),defaultdict(dict),\
-                          defaultdict(dict),defaultdict(dict),defaultdict(dict),{}
-used = set()
-
-def register(course, task, pairs):
-    for day, sh in pairs:
-        if (day, sh) in used:
-            raise ValueError(f"Duplicate seat-time {(day,sh)} while adding {course}:{task}")
-        used.add((day, sh))
-    slot[course][task] = [list(p) for p in pairs]
-
-for course, name, w_pct, rel, due, eff, fixed, cat in TASKS:
-    J[course].append(name)
-    S[course][name] = round(w_pct / 100, 8)
-    E[course][name] = eff * EFFORT_FACTOR[course]
-    r[course][name] = [rel, 1]
-    if fixed:
-        register(course, name, fixed)
-        d[course][name] = [due, max(s for _, s in fixed)]
-    else:
-        d[course][name] = [due, LAST_SHIFT]
-    category[course] = cat
-
-# Re-normalise weights per course
-for course, comp in S.items():
-    tot = sum(comp.values())
-    if not 0.999 < tot < 1.001:
-        for t in comp:
-            comp[t] = round(comp[t] / tot, 8)
-
-catalog = dict(I=list(J.keys()), J=J, S=S, E=E, r=r, d=d,
-               slot=slot, category=category)
-with open("courses.json", "w", encoding="utf-8") as f:
-    json.dump(catalog, f, indent=2, ensure_ascii=False)
-
-print("courses.json written with", len(catalog["I"]), "courses and", len(TASKS), "tasks")
+def assemble_catalog(tasks, effort_factor=EFFORT_FACTOR, last_shift=LAST_SHIFT,
+                     default_factor=None, strict=True):
+    """
+    Turn a task list into the courses.json dict (I, J, S, E, r, d, slot,
+    category).  With `strict`, raises SeatConflictError listing every
+    seat-time claimed by more than one task.  Courses missing from
+    `effort_factor` use `default_factor` (None: KeyError).
+    """
+    J,S,E,r,d,slot,category = defaultdict(list),defaultdict(dict),defaultdict(dict),\
+                              defaultdict(dict),defaultdict(dict),defaultdict(dict),{}
+    if strict:
+        conflicts = find_conflicts(tasks)
+        if conflicts:
+            raise SeatConflictError(conflicts)
+
+    for course, name, w_pct, rel, due, eff, fixed, cat in tasks:
+        factor = effort_factor.get(course, default_factor)
+        if factor is None:
+            raise KeyError(f"no effort factor for course {course}")
+        J[course].append(name)
+        S[course][name] = round(w_pct / 100, 8)
+        E[course][name] = eff * factor
+        r[course][name] = [rel, 1]
+        if fixed:
+            slot[course][name] = [list(p) for p in fixed]
+            d[course][name] = [due, max(s for _, s in fixed)]
+        else:
+            d[course][name] = [due, last_shift]
+        category[course] = cat
+
+    # Re-normalise weights per course
+    for course, comp in S.items():
+        tot = sum(comp.values())
+        if not 0.999 < tot < 1.001:
+            for t in comp:
+                comp[t] = round(comp[t] / tot, 8)
+
+    return dict(I=list(J.keys()), J=J, S=S, E=E, r=r, d=d,
+                slot=slot, category=category)
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Build courses.json")
+    p.add_argument("--tasks", default=None,
+                   help="CSV / JSON task file instead of the built-in list")
+    p.add_argument("--default_factor", type=float, default=1.0,
+                   help="effort factor of courses not in EFFORT_FACTOR (--tasks)")
+    p.add_argument("--export", default=None,
+                   help="only write the built-in task list to this CSV")
+    p.add_argument("--out", default="courses.json")
+    p.add_argument("--compact", action="store_true",
+                   help="no indentation (C JSON encoder, much faster for big catalogs)")
+    p.add_argument("--allow_conflicts", action="store_true",
+                   help="report seat-time conflicts but still write the catalog "
+                        "(they matter only within one student's courses)")
+    add_profile_args(p)
+    args = p.parse_args(argv)
+    timings = make_timings(args, "build_course_catalog")
+
+    if args.export:
+        export_tasks(build_tasks(), args.export)
+        print(f"Built-in task list written to {args.export}")
+        return
+
+    factors, default = EFFORT_FACTOR, None
+    with phase(timings, "tasks"):
+        if args.tasks:
+            TASKS, extra = load_tasks(args.tasks)
+            factors, default = {**EFFORT_FACTOR, **extra}, args.default_factor
+        else:
+            TASKS = build_tasks()
+
+        # >>>  inject weekly lecture tasks  <<<
+        add_weekly_lectures(TASKS)
+
+    with phase(timings, "assemble"):
+        try:
+            catalog = assemble_catalog(TASKS, factors, default_factor=default,
+                                       strict=not args.allow_conflicts)
+        except SeatConflictError as e:
+            raise SystemExit(str(e))
+        if args.allow_conflicts:
+            conflicts = find_conflicts(TASKS)
+            if conflicts:
+                print(f"warning: {len(conflicts)} seat-time(s) claimed by "
+                      f"more than one task", file=sys.stderr)
+    with phase(timings, "write"), open(args.out, "w", encoding="utf-8") as f:
+        # dumps + one write: json.dump always takes the pure-Python encoder
+        f.write(json.dumps(catalog, indent=None if args.compact else 2,
+                           ensure_ascii=False))
+
+    print(f"{args.out} written with", len(catalog["I"]), "courses and", len(TASKS), "tasks")
+    if hasattr(timings, "report"):
+        timings.report()
+
+
+if __name__ == "__main__":
+    main()
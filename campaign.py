@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+campaign.py
+-----------
+Parallel, resumable benchmark campaign.
+
+Every (instance × method × seed) job runs in its own worker process
+(at most --workers at a time) under a hard wall-clock limit (--timeout)
+and address-space limit (--mem_mb).  Each finished job — ok, error,
+timeout or crash — is appended to the --out JSONL checkpoint and
+fsync'ed immediately; on restart, jobs already in the checkpoint are
+skipped (--retry_failed re-runs the ones that did not finish ok).
+
+    python campaign.py "instances/*.json" --methods heuristic lazy \\
+        --seeds 0 1 2 --workers 4 --timeout 600 --mem_mb 4096
+"""
+import argparse
+import glob
+import itertools
+import json
+import multiprocessing as mp
+import os
+import time
+import traceback
+from multiprocessing.connection import wait
+from pathlib import Path
+
+from bench_harness import SOLVERS, time_one
+from manifest import add_select_args, select_paths
+from result_cache import add_cache_args, make_cache
+
+try:
+    import resource                 # POSIX only
+except ImportError:
+    resource = None
+
+def job_id(instance, method, seed):
+    return f"{Path(instance).name}|{method}|{seed}"
+
+def _worker(conn, path, method, seed, time_limit, mem_mb, cache=None):
+    """Child process: apply the memory cap, run one job, send the record."""
+    try:
+        if mem_mb and resource is not None:
+            cap = mem_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (cap, cap))
+        rec = time_one(path, method, seed, time_limit, cache)
+        rec["status"] = "ok"
+    except MemoryError:
+        rec = dict(status="memory", error="MemoryError")
+    except Exception as e:
+        rec = dict(status="error", error=f"{type(e).__name__}: {e}",
+                   traceback=traceback.format_exc())
+    conn.send(rec)
+    conn.close()
+
+def load_done(out, retry_failed=False):
+    """Job ids already recorded in the checkpoint file."""
+    done = set()
+    if not Path(out).exists():
+        return done
+    with open(out) as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError:
+                continue                          # torn last line after a crash
+            if rec.get("status") == "ok" or not retry_failed:
+                done.add(rec["id"])
+    return done
+
+def run_campaign(jobs, out, workers=1, timeout=None, mem_mb=None,
+                 time_limit=None, cache=None, store=None):
+    """
+    Run pending jobs; returns the number of records written.  Records
+    also go to `store` (a run_store.RunStore) when given.
+    """
+    ctx = mp.get_context("spawn")                 # fresh interpreter per job
+    pending = list(jobs)
+    active = {}                                   # sentinel → job state
+    written = 0
+
+    with open(out, "a") as f:
+        def record(job, rec, started):
+            nonlocal written
+            path, method, seed = job
+            rec.update(id=job_id(path, method, seed),
+                       instance=Path(path).name, method=method, seed=seed,
+                       wall=round(time.perf_counter() - started, 4))
+            f.write(json.dumps(rec) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+            if store is not None:
+                store.add_run(dict(rec, params=dict(time_limit=time_limit)),
+                              tag=Path(out).stem, path=path)
+            written += 1
+            print(f"[{rec['status']:>7}] {rec['id']}  ({rec['wall']:.2f}s)"
+                  + ("  cached" if rec.get("cached") else ""))
+
+        try:
+            while pending or active:
+                while pending and len(active) < workers:
+                    job = pending.pop(0)
+                    parent, child = ctx.Pipe(duplex=False)
+                    proc = ctx.Process(target=_worker,
+                                       args=(child, *job, time_limit, mem_mb,
+                                             cache),
+                                       daemon=True)
+                    proc.start()
+                    child.close()
+                    active[proc.sentinel] = [job, proc, parent,
+                                             time.perf_counter(), None]
+
+                now = time.perf_counter()
+                wait_for = None
+                if timeout:
+                    wait_for = max(0.0, min(st[3] + timeout - now
+                                            for st in active.values()))
+                # read results as soon as they arrive: a result larger than
+                # the pipe buffer blocks the worker in send() until then
+                conns = [st[2] for st in active.values()
+                         if st[4] is None and st[2] is not None]
+                ready = wait(list(active) + conns, timeout=wait_for)
+
+                now = time.perf_counter()
+                for sentinel in list(active):
+                    state = active[sentinel]
+                    job, proc, conn, started, rec = state
+                    if rec is None and conn is not None and (
+                            conn in ready or (sentinel in ready and conn.poll())):
+                        try:
+                            rec = state[4] = conn.recv()
+                        except EOFError:                   # closed without a result
+                            conn.close()
+                            state[2] = None
+                    if sentinel in ready:
+                        rec = rec or dict(status="crashed",
+                                          error=f"exit code {proc.exitcode}")
+                    elif timeout and now - started >= timeout:
+                        proc.kill()
+                        rec = rec or dict(status="timeout",
+                                          error=f"killed after {timeout}s")
+                    else:
+                        continue
+                    proc.join()
+                    if state[2] is not None:
+                        state[2].close()
+                    del active[sentinel]
+                    record(job, rec, started)
+        finally:
+            for job, proc, *_ in active.values():
+                proc.kill()
+                proc.join()
+    return written
+
+def main(argv=None):
+    p = argparse.ArgumentParser(
+        description="Parallel, resumable (instance × method × seed) campaign")
+    p.add_argument("instances", nargs="*",
+                   help="JSON instance files or glob patterns")
+    p.add_argument("--methods", nargs="+", choices=sorted(SOLVERS),
+                   default=["heuristic", "simple", "lazy"])
+    p.add_argument("--seeds", nargs="+", type=int, default=[0])
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    p.add_argument("--timeout", type=float, default=None,
+                   help="hard wall-clock limit per job (s)")
+    p.add_argument("--mem_mb", type=int, default=None,
+                   help="address-space limit per job (MiB)")
+    p.add_argument("--time_limit", type=int, default=None,
+                   help="solver time limit passed to optimal / heuristic")
+    p.add_argument("--out", default="campaign.jsonl")
+    p.add_argument("--retry_failed", action="store_true")
+    p.add_argument("--db", default=None,
+                   help="also append every record to this run_store.py database")
+    add_cache_args(p)
+    add_select_args(p)
+    args = p.parse_args(argv)
+
+    paths = sorted(set(itertools.chain.from_iterable(
+        glob.glob(pat) or [pat] for pat in args.instances)) | set(select_paths(args)))
+    if not paths:
+        raise SystemExit("no instances (give paths and/or manifest filters)")
+    missing = [x for x in paths if not Path(x).exists()]
+    if missing:
+        raise SystemExit(f"{missing[0]} not found")
+
+    done = load_done(args.out, args.retry_failed)
+    jobs = [(path, method, seed)
+            for path in paths for method in args.methods for seed in args.seeds
+            if job_id(path, method, seed) not in done]
+    print(f"{len(jobs)} jobs to run, {len(done)} already in {args.out}")
+
+    store = None
+    if args.db:
+        from run_store import RunStore
+        store = RunStore(args.db)
+        store.add_instances(paths)
+    n = run_campaign(jobs, args.out, args.workers, args.timeout,
+                     args.mem_mb, args.time_limit, make_cache(args), store)
+    print(f"✅ Campaign complete: {n} results appended to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+cli.py
+------
+One entry point for every tool.  Only the module behind the chosen
+subcommand is imported, so gurobipy, pandas and matplotlib are loaded
+only by the subcommands that need them.
+
+    python cli.py solve     instance.json --time_limit 60      (run.py)
+    python cli.py heuristic instance.json                      (heuristic.py)
+    python cli.py greedy    instance.json                      (lazy_greedy.py)
+    python cli.py simple    instance.json --seed 3             (simple_heuristic.py)
+    python cli.py multires  instance.json --block_shifts 4     (multires.py)
+    python cli.py generate  --courses 8 --days 200             (generate_instances.py)
+    python cli.py bench     instances/Timmy/*.json             (bench_harness.py)
+    python cli.py render    "out/*.csv" --out_dir plots        (show_schedule.py)
+    python cli.py analyze   campaign.jsonl --out_dir report    (bench_report.py)
+    python cli.py cohort    "students/*.json" --capacity 3     (cohort.py)
+    python cli.py robust    instance.json out/*.csv            (robustness.py)
+    python cli.py validate  instance.json "out/*.csv"          (validate_schedule.py)
+    python cli.py cache     stats --cache .solver_cache        (result_cache.py)
+    python cli.py runs      summary --db runs.sqlite           (run_store.py)
+    python cli.py manifest  query --course MATH4008 --paths    (manifest.py)
+    python cli.py bound     instance.json out/*.csv            (bounds.py)
+    python cli.py <command> --help
+
+`python cli.py coldstart` measures the cold-start time of every
+subcommand (fresh interpreter, `<command> --help`, median of
+--repeats) against a bare `python -c pass`.
+"""
+import sys
+
+# subcommand → (module, one-line description)
+COMMANDS = {
+    "solve":     ("run",                "exact MIP with Gurobi"),
+    "heuristic": ("heuristic",          "LP relaxation + greedy rounding"),
+    "greedy":    ("lazy_greedy",        "lazy greedy on marginal gain"),
+    "simple":    ("simple_heuristic",   "randomized greedy baseline"),
+    "multires":  ("multires",           "coarse-to-fine MIP over calendar blocks"),
+    "generate":  ("generate_instances", "seeded synthetic instances"),
+    "bench":     ("bench_harness",      "in-process benchmark with phase timings"),
+    "render":    ("show_schedule",      "timetable images from schedule CSVs"),
+    "analyze":   ("bench_report",       "benchmark report with performance profiles"),
+    "cohort":    ("cohort",             "cohort with shared shift capacities"),
+    "robust":    ("robustness",         "Monte Carlo robustness of schedules"),
+    "validate":  ("validate_schedule",  "check schedules and recompute objectives"),
+    "cache":     ("result_cache",       "inspect, prune and evict cached results"),
+    "runs":      ("run_store",          "SQLite store of benchmark runs"),
+    "manifest":  ("manifest",           "corpus metadata index and instance queries"),
+    "bound":     ("bounds",             "solver-free upper bound and certified gaps"),
+}
+
+def usage():
+    lines = ["usage: cli.py <command> [args …]", "", "commands:"]
+    lines += [f"  {cmd:10s} {desc}" for cmd, (_, desc) in COMMANDS.items()]
+    lines += [f"  {'coldstart':10s} measure the start-up time of every command"]
+    return "\n".join(lines)
+
+def coldstart(argv):
+    import argparse
+    import statistics
+    import subprocess
+    import time
+
+    p = argparse.ArgumentParser(prog="cli.py coldstart",
+                                description="Cold-start time per subcommand")
+    p.add_argument("--repeats", type=int, default=5)
+    p.add_argument("commands", nargs="*", default=list(COMMANDS))
+    args = p.parse_args(argv)
+
+    def measure(cmd):
+        samples = []
+        for _ in range(args.repeats):
+            t0 = time.perf_counter()
+            subprocess.run(cmd, stdout=subprocess.DEVNULL,
+                           stderr=subprocess.DEVNULL, check=False)
+            samples.append(time.perf_counter() - t0)
+        return statistics.median(samples)
+
+    base = measure([sys.executable, "-c", "pass"])
+    print(f"{'interpreter':12s} {1000 * base:7.1f} ms")
+    for name in args.commands:
+        t = measure([sys.executable, __file__, name, "--help"])
+        print(f"{name:12s} {1000 * t:7.1f} ms  (+{1000 * (t - base):.1f} ms imports)")
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return
+    cmd, rest = argv[0], argv[1:]
+    if cmd == "coldstart":
+        return coldstart(rest)
+    if cmd not in COMMANDS:
+        raise SystemExit(f"unknown command {cmd!r}\n\n{usage()}")
+
+    import importlib
+    module = importlib.import_module(COMMANDS[cmd][0])
+    sys.argv[0] = f"cli.py {cmd}"               # argparse usage lines
+    return module.main(rest)
+
+
+if __name__ == "__main__":
+    main()
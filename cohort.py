@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+cohort.py
+---------
+Schedule a whole cohort of students who share capacitated resources
+(TA-session seats, study rooms, lab machines) in particular shifts.
+
+Every student is an ordinary instance (as written by
+assemble_instance_all.py) on the same day / shift calendar; cap[k, t]
+is the number of students that may study in shift (k, t).  Mandatory
+seat-times (lectures, exams) do not use the shared resource.
+
+The coupled problem
+
+    max Σ_s f_s(y_s)   s.t.  Σ_s u_s,kt(y_s) ≤ cap[k, t]
+
+is never built as one model.  The capacity rows are priced out
+(Lagrangian relaxation) and each student solves their own problem
+with λ[k, t] charged per seat used:
+
+    L(λ) = Σ_s max_y [f_s(y) − Σ λ·u_s(y)] + Σ λ·cap
+
+The students are solved in a process pool (each worker parses an
+instance once and keeps it) and the prices follow the projected
+subgradient λ ← max(0, λ + α_n (usage − cap)) with α_n = step/√n.
+The best capacity-feasible cohort seen is kept; if there is none, the
+students in overfull shifts of the last one are re-solved in turn
+around the shifts that are already full.  With --method optimal and
+exact subproblems, min L(λ) is an upper bound on the cohort optimum.
+
+    python cohort.py "instances/*stem_normal.json" --capacity 3 \\
+        --workers 8 --iterations 30 --out_dir cohort_out
+    python cohort.py students/*.json --capacities rooms.json
+
+--capacities is a JSON object {"(k,t)": seats}; shifts not listed get
+--capacity (no limit when that is not given either).
+"""
+import argparse
+import glob
+import itertools
+import json
+import math
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from common import evaluate, load_instance, parse_instance, parse_key, phase
+from profiling import add_profile_args, make_timings
+
+# ------------------------------------------------------------------ #
+# Student subproblems (worker processes)                             #
+# ------------------------------------------------------------------ #
+_STUDENTS = {}                  # per process: path → parsed instance
+
+def load_student(path):
+    inst = _STUDENTS.get(path)
+    if inst is None:
+        inst = _STUDENTS[path] = parse_instance(load_instance(path))
+    return inst
+
+def mandatory_keys(inst):
+    """Seat-times fixed by `slot`; they never use the shared resource."""
+    r, d = inst["r"], inst["d"]
+    return {(day, sh, i, j)
+            for i in inst["I"] for j in inst["J"][i]
+            for day, sh in inst["slot"].get(i, {}).get(j, [])
+            if r[i][j] <= (day, sh) <= d[i][j]}
+
+def usage(schedule, mandatory, caps):
+    """Shared seats a schedule takes: Counter {(k, t): 1}."""
+    return Counter((k, t) for k, t, i, j in schedule
+                   if (k, t) in caps and (k, t, i, j) not in mandatory)
+
+def without_shifts(inst, blocked):
+    """
+    Copy of `inst` that may not study in `blocked` shifts (mandatory
+    seats excepted); run.build_model and lazy_greedy honour inst["blocked"].
+    """
+    return dict(inst, blocked=set(blocked))
+
+def solve_student(job):
+    """
+    Worker: one student at prices λ, optionally kept out of `blocked`
+    shifts.  Returns the schedule, its own (unpriced) objective and,
+    for exact solves, an upper bound on the priced subproblem.
+    """
+    path, prices, method, time_limit, blocked = job
+    inst = load_student(path)
+    if blocked:
+        inst = without_shifts(inst, blocked)
+    res = _solve_priced(inst, prices, method, time_limit)
+    if prices and not res["grades_ok"]:
+        # grade minima are hard: retry without prices before giving up
+        plain = _solve_priced(inst, {}, method, time_limit)
+        if plain["grades_ok"]:
+            res = dict(plain, bound=res["bound"])
+    return res
+
+def _solve_priced(inst, prices, method, time_limit):
+    inst = dict(inst, prices=prices)
+    if method == "optimal":
+        import run
+        res = run.solve(inst, time_limit, output_flag=0)
+        bound = res.get("bound")
+    else:
+        import lazy_greedy
+        res = lazy_greedy.solve(inst)
+        bound = None
+    schedule = [tuple(key) for key in res["schedule"]]
+    if res.get("objective") is None:
+        return dict(schedule=[], objective=None, grades_ok=False, bound=None)
+    ev = evaluate(inst, schedule)
+    return dict(schedule=schedule, objective=ev["objective"],
+                grades_ok=ev["grades_ok"], bound=bound)
+
+# ------------------------------------------------------------------ #
+# Coordination                                                       #
+# ------------------------------------------------------------------ #
+def load_capacities(path, students, default=None):
+    """{(k, t): seats} for every shift on the students' calendars."""
+    caps = {}
+    if default is not None:
+        caps = {(k, t): default for inst in students
+                for k in inst["K"] for t in inst["T"]}
+    if path:
+        with open(path) as f:
+            caps.update({parse_key(kt): int(n) for kt, n in json.load(f).items()})
+    return caps
+
+def repair(paths, students, results, caps, lam, method, time_limit):
+    """
+    Make a cohort capacity-feasible.  Students without a seat in an
+    overfull shift keep their schedules; the others are re-solved one
+    after another at prices λ with the shifts already full blocked.
+    Returns the new results and the number of students re-solved.
+    """
+    used = Counter()
+    for (inst, mand), res in zip(students, results):
+        used.update(usage(res["schedule"], mand, caps))
+    over = {kt for kt, n in used.items() if n > caps[kt]}
+    redo = [s for s, ((inst, mand), res) in enumerate(zip(students, results))
+            if any(kt in over for kt in usage(res["schedule"], mand, caps))]
+
+    results = list(results)
+    for s in redo:
+        used.subtract(usage(results[s]["schedule"], students[s][1], caps))
+    prices = {kt: v for kt, v in lam.items() if v > 0}
+    for s in redo:
+        full = {kt for kt in caps if used[kt] >= caps[kt]}
+        results[s] = solve_student((paths[s], prices, method, time_limit, full))
+        used.update(usage(results[s]["schedule"], students[s][1], caps))
+    return results, len(redo)
+
+def coordinate(paths, caps, method="lazy", iterations=30, step=0.05,
+               time_limit=30, workers=None, timings=None, log=print):
+    """
+    Price-coordinated decomposition.  Returns a dict with the cohort
+    schedules, per-student objectives, the prices and the iteration log.
+    """
+    timings = {} if timings is None else timings
+    with phase(timings, "load"):
+        students = [load_student(p) for p in paths]
+        students = [(inst, mandatory_keys(inst)) for inst in students]
+
+    lam = {kt: 0.0 for kt in caps}
+    best, history, dual = None, [], math.inf
+    with ProcessPoolExecutor(workers) as pool:
+        for n in range(1, iterations + 1):
+            prices = {kt: v for kt, v in lam.items() if v > 0}
+            jobs = [(p, prices, method, time_limit, None) for p in paths]
+            with phase(timings, "subproblems"):
+                results = list(pool.map(solve_student, jobs))
+
+            with phase(timings, "prices"):
+                used = Counter()
+                for (inst, mand), res in zip(students, results):
+                    used.update(usage(res["schedule"], mand, caps))
+                excess = {kt: used[kt] - cap for kt, cap in caps.items()}
+                over = sum(max(0, e) for e in excess.values())
+                primal = sum(res["objective"] or 0.0 for res in results)
+                if all(res["bound"] is not None for res in results):
+                    dual = min(dual, sum(res["bound"] for res in results)
+                               + sum(lam[kt] * caps[kt] for kt in caps))
+                slack = sum(lam[kt] * -excess[kt] for kt in caps)
+
+                if over == 0 and (best is None or primal > best["primal"]):
+                    best = dict(primal=primal, iteration=n,
+                                results=[dict(r) for r in results])
+                history.append(dict(iteration=n, primal=primal,
+                                    over=over, slack=slack,
+                                    priced=len(prices),
+                                    dual=dual if dual < math.inf else None))
+                log(f"[{n:3d}] cohort {primal:9.4f}  over capacity {over:4d}  "
+                    f"priced shifts {len(prices):4d}"
+                    + (f"  bound {dual:9.4f}" if dual < math.inf else ""))
+                if over == 0 and slack < 1e-6:
+                    break                     # feasible and complementary
+                alpha = step / math.sqrt(n)
+                lam = {kt: max(0.0, lam[kt] + alpha * excess[kt]) for kt in caps}
+
+    with phase(timings, "repair"):
+        resolved = 0
+        if best is None:
+            results, resolved = repair(paths, students, results, caps, lam,
+                                      method, time_limit)
+            best = dict(primal=sum(r["objective"] or 0.0 for r in results),
+                        iteration=len(history), results=results)
+
+    return dict(
+        objective = best["primal"],
+        iteration = best["iteration"],
+        repaired  = resolved,
+        bound     = dual if dual < math.inf else None,
+        students  = [dict(instance=str(p), objective=r["objective"],
+                          grades_ok=r["grades_ok"], schedule=r["schedule"])
+                     for p, r in zip(paths, best["results"])],
+        prices    = {f"({k},{t})": round(v, 6) for (k, t), v in lam.items() if v > 0},
+        history   = history,
+        timings   = timings,
+    )
+
+def write_cohort(res, out_dir):
+    """One schedule CSV per student plus summary.json."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for st in res["students"]:
+        with open(out_dir / f"{Path(st['instance']).stem}.csv", "w") as f:
+            f.write("day,shift,course,task\n")
+            f.writelines(f"{k},{t},{i},{j}\n" for k, t, i, j in st["schedule"])
+    summary = dict(res, students=[{k: v for k, v in st.items() if k != "schedule"}
+                                  for st in res["students"]])
+    with open(out_dir / "summary.json", "w") as f:
+        json.dump(summary, f, indent=2)
+    return out_dir
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Cohort scheduling with shared shift capacities")
+    p.add_argument("instances", nargs="+", help="student instance files or glob patterns")
+    p.add_argument("--capacities", default=None,
+                   help='JSON {"(k,t)": seats} for individual shifts')
+    p.add_argument("--capacity", type=int, default=None,
+                   help="seats in every other shift (default: unlimited)")
+    p.add_argument("--method", choices=["lazy", "optimal"], default="lazy",
+                   help="student subproblem solver (optimal gives a bound)")
+    p.add_argument("--iterations", type=int, default=30)
+    p.add_argument("--step", type=float, default=0.05,
+                   help="initial subgradient step α (objective units per seat)")
+    p.add_argument("--time_limit", type=int, default=30,
+                   help="seconds per student MIP (--method optimal)")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    p.add_argument("--out_dir", default="cohort_out")
+    add_profile_args(p)
+    args = p.parse_args(argv)
+
+    paths = sorted(itertools.chain.from_iterable(
+        glob.glob(pat) or [pat] for pat in args.instances))
+    missing = [x for x in paths if not Path(x).exists()]
+    if missing:
+        raise SystemExit(f"{missing[0]} not found")
+    if args.capacities is None and args.capacity is None:
+        raise SystemExit("give --capacity and/or --capacities")
+
+    timings = make_timings(args, "cohort")
+    caps = load_capacities(args.capacities, [load_student(x) for x in paths],
+                           args.capacity)
+    res = coordinate(paths, caps, args.method, args.iterations, args.step,
+                     args.time_limit, args.workers, timings)
+    with phase(timings, "write"):
+        out = write_cohort(res, args.out_dir)
+
+    ok = sum(st["grades_ok"] for st in res["students"])
+    print(f"\nCohort of {len(paths)}: objective {res['objective']:.4f} "
+          f"(iteration {res['iteration']}, {res['repaired']} students re-solved), "
+          f"grade minima met by {ok}/{len(paths)}")
+    if res["bound"] is not None:
+        print(f"Lagrangian bound {res['bound']:.4f}")
+    print(f"Schedules and summary.json written to {out}/")
+    if hasattr(timings, "report"):
+        timings.report()
+
+
+if __name__ == "__main__":
+    main()
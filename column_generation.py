@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+# column_generation.py  – Dantzig–Wolfe decomposition over day patterns
+# ---------------------------------------------------------------------
+# Each column is a *day pattern*: the set of shifts worked on day k and
+# the task each of them goes to.  The restricted master links the task
+# totals a[i,j], the per-task slot caps and the grade minima across
+# days; the pricing problem is a tiny DP over the 16 shifts of one day
+# that enforces the break rule (≤ 4 worked shifts in any 6-shift window)
+# exactly.  Integer schedules come from a column-generation dive that
+# branches on the original assignments y[k,t,i,j] (force the most used
+# one, re-price, repeat) followed by price-and-branch: the restricted
+# master re-solved as a MIP over every generated column, warm-started
+# from the dive.
+# ---------------------------------------------------------------------
+import time
+import argparse, textwrap
+import gurobipy as gp
+from gurobipy import GRB
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import math
+
+from run import load_instance, to_pair, _grid, _to_csv
+
+SHIFTS_PER_HOUR = 1
+BREAK_WINDOW    = 6        # sliding window length (shifts)
+BREAK_MAX       = 4        # max worked shifts inside one window
+SHORTFALL_COST  = 1e3      # phase-1 penalty on unmet grade minima
+RC_TOL          = 1e-6
+
+# ------------------------------------------------------------------ #
+# Pricing                                                            #
+# ------------------------------------------------------------------ #
+def price_day(job):
+    """
+    Best day pattern for one day under the current duals.
+
+    job = (k, H_k, beta, shifts, cand, mand, force, ban, pi, mu, sigma_k)
+      cand[t]  : [(i, j, P_ijkt), ...] tasks whose window contains (k,t)
+      mand[t]  : (i, j) mandatory seat-time at shift t, if any
+      force[t] : (i, j) assignment the pattern must contain (⊇ mand)
+      ban      : {(t, i, j), ...} assignments the pattern may not contain
+      pi, mu   : duals of the effort / slot-cap rows, keyed by (i, j)
+
+    Returns (k, reduced_cost, pattern) with pattern = ((t, i, j), ...).
+    State = (bitmask of the previous BREAK_WINDOW-1 shifts, #worked).
+    A window may exceed BREAK_MAX only by mandatory seat-times, which
+    are never blocked.
+    """
+    k, H_k, beta, shifts, cand, mand, force, ban, pi, mu, sigma_k = job
+    hist = BREAK_WINDOW - 1
+    full = (1 << hist) - 1
+
+    # best task (and its value) for every shift of the day
+    best = {}
+    for t in shifts:
+        top = None
+        for i, j, p in cand.get(t, []):
+            if (t, i, j) in ban or (t in force and force[t] != (i, j)):
+                continue
+            v = -(pi[i, j] * p + mu[i, j])
+            if top is None or v > top[0]:
+                top = (v, i, j)
+        if top is not None:
+            best[t] = top
+
+    # window limit ending at t: mandatory shifts may exceed BREAK_MAX
+    limit = {t: max(BREAK_MAX, sum(1 for s in mand if t - hist <= s <= t))
+             for t in shifts}
+
+    # forward DP: states[(mask, n)] = (value, back-pointer)
+    states = {(0, 0): (0.0, None)}
+    for t in shifts:
+        nxt = {}
+        for (mask, n), (val, bp) in states.items():
+            options = []
+            if t not in force:
+                options.append(((mask << 1) & full, n, val, False))
+            if t in best and bin(mask).count("1") + 1 <= limit[t]:
+                options.append((((mask << 1) | 1) & full, n + 1,
+                                val + best[t][0], True))
+            for m2, n2, v2, worked in options:
+                key = (m2, n2)
+                if key not in nxt or v2 > nxt[key][0]:
+                    nxt[key] = (v2, (t, worked, bp))
+        states = nxt
+
+    if not states:                                 # forced seats clash
+        return k, -math.inf, ()
+
+    top_val, top_bp = -math.inf, None
+    for (mask, n), (val, bp) in states.items():
+        v = val - beta * max(0, n - H_k)
+        if v > top_val:
+            top_val, top_bp = v, bp
+
+    pattern = []
+    bp = top_bp
+    while bp is not None:
+        t, worked, bp = bp
+        if worked:
+            pattern.append((t, best[t][1], best[t][2]))
+    pattern.sort()
+    return k, top_val - sigma_k, tuple(pattern)
+
+# ------------------------------------------------------------------ #
+# Main                                                               #
+# ------------------------------------------------------------------ #
+def main():
+    t_total_start = time.perf_counter()
+
+    p = argparse.ArgumentParser(
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        description=textwrap.dedent("""
+        Column generation over feasible day patterns (price-and-branch).
+
+        The LP master is solved to optimality by pricing day patterns,
+        a dive fixes one day at a time until the master is integral, and
+        the restricted master is finally re-solved as a MIP over every
+        generated column.
+        """)
+    )
+    p.add_argument("instance", help="Path to JSON instance file")
+    p.add_argument("--time_limit", type=int, default=300,
+                   help="time limit of the final restricted-master MIP")
+    p.add_argument("--max_iters", type=int, default=200)
+    p.add_argument("--workers", type=int, default=1,
+                   help="processes used to price the days in parallel")
+    p.add_argument("--pretty", choices=["grid", "csv", "list"],
+                   default="list")
+    p.add_argument("--csv_path", default="schedule.csv")
+    args = p.parse_args()
+
+    if not Path(args.instance).exists():
+        raise SystemExit(f"{args.instance} not found")
+
+    data = load_instance(args.instance)
+
+    # ----------------- unpack sets ------------------------------------------
+    K = list(map(int, data["K"]))
+    T = list(map(int, data["T"]));           SHIFTS = max(T)
+    I = data["I"];                           J = {i: data["J"][i] for i in I}
+
+    S = data["S"];   E = data["E"];   w = data["w"];   B = data["B"]
+    H_star = {int(k): v for k, v in data["H*"].items()}
+    beta   = data["beta"]
+    slot   = data.get("slot", {})
+
+    r = {i: {j: to_pair(data["r"][i][j], 1)        for j in J[i]} for i in I}
+    d = {i: {j: to_pair(data["d"][i][j], SHIFTS)   for j in J[i]} for i in I}
+
+    P = {}
+    for i in I:
+        P[i] = {}
+        for j in J[i]:
+            P[i][j] = {tuple(map(int, k.strip("()").split(","))): v
+                       for k, v in data["P"][i][j].items()}
+
+    # candidate tasks per (k,t) and mandatory seat-times per day ------------
+    cand = {k: defaultdict(list) for k in K}
+    for i in I:
+        for j in J[i]:
+            for k in K:
+                for t in T:
+                    if r[i][j] <= (k, t) <= d[i][j]:
+                        cand[k][t].append((i, j, P[i][j].get((k, t), 0)))
+
+    mand = {k: {} for k in K}
+    for i in I:
+        for j in J[i]:
+            for day, sh in slot.get(i, {}).get(j, []):
+                if r[i][j] <= (day, sh) <= d[i][j]:
+                    mand[day][sh] = (i, j)
+
+    tasks = [(i, j) for i in I for j in J[i]]
+
+    # ----------------- restricted master ------------------------------------
+    m = gp.Model("DayPatternMaster")
+    m.Params.OutputFlag = 0
+
+    x = m.addVars(tasks, lb=0, ub=1)
+    G = m.addVars(I, lb=0, ub=1)
+    short = m.addVars(I, lb=0, obj=-SHORTFALL_COST)
+
+    conv   = {k: m.addConstr(gp.LinExpr() == 1) for k in K}
+    effort = {(i, j): m.addConstr(-E[i][j] * x[i, j] >= 0) for i, j in tasks}
+    cap    = {(i, j): m.addConstr(gp.LinExpr() <= math.ceil(E[i][j] / SHIFTS_PER_HOUR))
+              for i, j in tasks}
+    for i in I:
+        m.addConstr(G[i] == gp.quicksum(S[i][j] * x[i, j] for j in J[i]))
+        m.addConstr(G[i] + short[i] >= B[i])
+
+    W = sum(w.values())
+    for i in I:
+        G[i].Obj = 4 * w[i] / W
+    m.ModelSense = GRB.MAXIMIZE
+
+    columns = {}                                   # (k, pattern) -> var
+
+    def add_column(k, pattern):
+        if (k, pattern) in columns:
+            return False
+        coeffs, constrs = [1.0], [conv[k]]
+        for t, i, j in pattern:
+            coeffs += [P[i][j].get((k, t), 0), 1.0]
+            constrs += [effort[i, j], cap[i, j]]
+        cost = -beta * max(0, len(pattern) - H_star[k])
+        columns[k, pattern] = m.addVar(lb=0, obj=cost,
+                                       column=gp.Column(coeffs, constrs))
+        return True
+
+    # seed: the mandatory-only pattern of every day
+    for k in K:
+        add_column(k, tuple(sorted((t, i, j) for t, (i, j) in mand[k].items())))
+
+    # ----------------- column generation ------------------------------------
+    pool = ProcessPoolExecutor(args.workers) if args.workers > 1 else None
+    force = {k: dict(mand[k]) for k in K}          # dive branching state
+    ban   = {k: set() for k in K}
+    iters = 0
+
+    def generate():
+        """Price columns until the LP master has no improving pattern."""
+        nonlocal iters
+        for _ in range(args.max_iters):
+            iters += 1
+            m.optimize()
+            if m.Status != GRB.OPTIMAL:
+                return False
+
+            pi = {key: c.Pi for key, c in effort.items()}
+            mu = {key: c.Pi for key, c in cap.items()}
+            jobs = [(k, H_star[k], beta, T, dict(cand[k]), mand[k],
+                     force[k], ban[k], pi, mu, conv[k].Pi) for k in K]
+            priced = (pool.map(price_day, jobs, chunksize=8) if pool
+                      else map(price_day, jobs))
+
+            added = 0
+            for k, rc, pattern in priced:
+                if rc > RC_TOL and add_column(k, pattern):
+                    added += 1
+            if not added:
+                return True
+        m.optimize()
+        return m.Status == GRB.OPTIMAL
+
+    def restrict(k):
+        """
+        Disable the columns of day k that contradict the dive state and
+        seed the cheapest compatible pattern so the master stays feasible.
+        Returns False when no pattern of day k can satisfy the state.
+        """
+        for (kk, pattern), var in columns.items():
+            if kk != k:
+                continue
+            ok = (all((t, *force[k][t]) in pattern for t in force[k])
+                  and not ban[k].intersection(pattern))
+            var.UB = 1 if ok else 0
+        zero = defaultdict(float)
+        _, rc, pattern = price_day((k, H_star[k], beta, T, dict(cand[k]),
+                                    mand[k], force[k], ban[k], zero, zero, 0.0))
+        if rc == -math.inf:
+            return False
+        add_column(k, pattern)
+        return True
+
+    t_cg_start = time.perf_counter()
+    try:
+        if not generate():
+            raise SystemExit(f"Master LP finished with status {m.Status}")
+        lp_bound = m.ObjVal
+        if any(short[i].X > 1e-6 for i in I):
+            print("Grade minima cannot be met with day patterns that respect the break rule")
+            return
+        cg_sec = time.perf_counter() - t_cg_start
+
+        # ------------- dive on y[k,t,i,j]: force the most used one ----------
+        # A forced assignment that breaks the slot caps or the grade
+        # minima is banned instead, so every step shrinks the search.
+        t_dive_start = time.perf_counter()
+        while True:
+            y_lp = defaultdict(float)
+            for (k, pattern), var in columns.items():
+                if var.X > 1e-9:
+                    for t, i, j in pattern:
+                        y_lp[k, t, i, j] += var.X
+            frac = [(v, key) for key, v in y_lp.items() if v < 1 - 1e-6]
+            if not frac:
+                break
+            _, (k, t, i, j) = max(frac)
+            force[k][t] = (i, j)
+            if (restrict(k) and generate()
+                    and all(short[ii].X <= 1e-6 for ii in I)):
+                continue
+            del force[k][t]
+            ban[k].add((t, i, j))
+            restrict(k)
+            if not generate():
+                raise SystemExit(f"Master LP finished with status {m.Status}")
+        dive_sec = time.perf_counter() - t_dive_start
+    finally:
+        if pool:
+            pool.shutdown()
+    dive = {k: var.X for k, var in columns.items()}
+
+    # ----------------- price-and-branch -------------------------------------
+    for var in columns.values():
+        var.UB = 1
+        var.VType = GRB.BINARY
+    for key, var in columns.items():
+        var.Start = 1 if dive[key] > 0.5 else 0
+    m.Params.TimeLimit  = args.time_limit
+    m.Params.OutputFlag = 1
+    t_mip_start = time.perf_counter()
+    m.optimize()
+    mip_sec = time.perf_counter() - t_mip_start
+
+    if m.Status not in (GRB.OPTIMAL, GRB.TIME_LIMIT) or m.SolCount == 0:
+        print(f"Restricted master MIP finished with status {m.Status}")
+        return
+    if any(short[i].X > 1e-6 for i in I):
+        print("No integer combination of the generated columns meets the grade minima")
+        return
+
+    # ----------------- results ----------------------------------------------
+    schedule = sorted((k, t, i, j)
+                      for (k, pattern), var in columns.items() if var.X > 0.5
+                      for t, i, j in pattern)
+    mandatory = {(k, t, i, j) for k in K for t, (i, j) in mand[k].items()}
+
+    gpa_part = sum(w[i] * G[i].X for i in I)
+    per_day  = defaultdict(int)
+    for k, *_ in schedule:
+        per_day[k] += 1
+    ot_hours = sum(max(0, per_day[k] - H_star[k]) for k in K)
+    gap = (lp_bound - m.ObjVal) / abs(m.ObjVal) * 100 if m.ObjVal else 0.0
+
+    print(textwrap.dedent(f"""
+        ══════════════════════════════════════════════════════════
+        Instance       : {Path(args.instance).name}
+        Courses chosen : {', '.join(I)}
+        β (overtime wt): {beta:.3f}
+        CG iterations  : {iters}   columns: {len(columns)}
+        ----------------------------------------------------------
+        Credit-weighted GPA   : {gpa_part:7.4f}
+        Overtime hours : {ot_hours:7.2f}
+        Penalty β·∑z   : {beta * ot_hours:7.4f}
+        ----------------------------------------------------------
+        LP bound       : {lp_bound:7.4f}
+        Total utility  : {m.ObjVal:7.4f}
+        Gap to LP (%)  : {gap:7.2f}
+        CG time (s)    : {cg_sec:7.2f}
+        Dive time (s)  : {dive_sec:7.2f}
+        MIP time (s)   : {mip_sec:7.2f}
+        Total time (s) : {time.perf_counter() - t_total_start:7.2f}
+        ══════════════════════════════════════════════════════════
+    """).strip())
+
+    if args.pretty == "grid":
+        _grid(schedule, T, mandatory)
+    elif args.pretty == "csv":
+        _to_csv(schedule, args.csv_path)
+    else:
+        for k, t, i, j in schedule:
+            flag = "*" if (k, t, i, j) in mandatory else " "
+            print(f"{flag} ({k:3d}, {t:2d})  {i:<8}  {j}")
+
+
+if __name__ == "__main__":
+    main()
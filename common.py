@@ -0,0 +1,157 @@
+"""
+common.py
+---------
+Helpers shared by the solvers: instance and schedule loading / parsing,
+instance classes (style × work level) from file names, per-phase
+wall-clock timing, schedule evaluation and greedy-loop counters.
+
+Solver API: every solver module (run, heuristic, simple_heuristic,
+lazy_greedy) exposes solve(inst, <options>, timings=None), where `inst`
+is the dict from parse_instance().  solve() reads nothing but its
+arguments and returns a fresh dict with at least objective, schedule
+[(k, t, i, j), …] and timings, plus the objective components from
+evaluate() when a schedule was found – so solves on different
+instances can run side by side on threads.
+"""
+import csv
+import json
+import math
+import re
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+def load_instance(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def read_schedule(path):
+    """schedule.csv → sorted list of (day, shift, course, task)."""
+    with open(path, newline="") as f:
+        return sorted((int(row["day"]), int(row["shift"]), row["course"], row["task"])
+                      for row in csv.DictReader(f))
+
+def to_pair(x, default):
+    """Return (day, shift) for either bare int or [d,s] list."""
+    return (x, default) if isinstance(x, int) else tuple(x)
+
+def parse_key(key):
+    """'(k,t)' → (k, t)"""
+    return tuple(map(int, key.strip("()").split(",")))
+
+STYLES = ["stem", "soc", "hum"]
+WORKS = ["lazy", "normal", "hard"]
+
+def instance_class(name):
+    """'…__soc_lazy.json' / '…__stem_normal_seed3.json' → 'soc_lazy'."""
+    m = re.search(r"__([a-z]+)_([a-z]+)(?:_seed\d+)?(?:\.json)?$", str(name))
+    if m and m.group(1) in STYLES and m.group(2) in WORKS:
+        return f"{m.group(1)}_{m.group(2)}"
+    return "unknown"
+
+def parse_instance(data):
+    """
+    Unpack a raw JSON instance into the sets / parameters every solver
+    uses.  Windows r, d become (day, shift) tuples and the sparse
+    productivity P[i][j] is keyed by (k, t) tuples.
+    """
+    K = list(map(int, data["K"]))
+    T = list(map(int, data["T"]))
+    I = data["I"]
+    J = {i: data["J"][i] for i in I}
+    return dict(
+        K=K, T=T, I=I, J=J,
+        S={i: {j: data["S"][i][j] for j in J[i]} for i in I},
+        E={i: {j: data["E"][i][j] for j in J[i]} for i in I},
+        w=data["w"],
+        B=data["B"],
+        beta=data["beta"],
+        H_star={int(k): v for k, v in data["H*"].items()},
+        slot=data.get("slot", {}),
+        r={i: {j: to_pair(data["r"][i][j], 1)      for j in J[i]} for i in I},
+        d={i: {j: to_pair(data["d"][i][j], max(T)) for j in J[i]} for i in I},
+        P={i: {j: {parse_key(k): v for k, v in data["P"][i][j].items()}
+               for j in J[i]}
+           for i in I},
+    )
+
+def evaluate(inst, schedule):
+    """Objective components of a schedule [(k, t, i, j), …]."""
+    I, J, S, E = inst["I"], inst["J"], inst["S"], inst["E"]
+    w, B, P = inst["w"], inst["B"], inst["P"]
+    a = defaultdict(float)
+    per_day = Counter()
+    for k, t, i, j in schedule:
+        a[i, j] += P[i][j].get((k, t), 0.0)
+        per_day[k] += 1
+    G = {i: sum(S[i][j] * min(a[i, j] / E[i][j], 1.0) for j in J[i]) for i in I}
+    gpa_part = sum(w[i] * G[i] for i in I)
+    overtime = sum(max(0, per_day[k] - inst["H_star"][k]) for k in per_day)
+    gpa_4 = gpa_part / sum(w.values()) * 4
+    return dict(
+        objective = gpa_4 - inst["beta"] * overtime,
+        gpa_part  = gpa_part,
+        gpa_4     = gpa_4,
+        overtime  = overtime,
+        penalty   = inst["beta"] * overtime,
+        grades_ok = all(G[i] + 1e-9 >= B[i] for i in I),
+    )
+
+@contextmanager
+def phase(timings, name):
+    """
+    Add the wall-clock time of the block to timings[name] (seconds).
+    If `timings` is a profiling.PhaseProfiler the block is profiled too.
+    """
+    hook = getattr(timings, "profile", None)
+    t0 = time.perf_counter()
+    try:
+        if hook is None:
+            yield
+        else:
+            with hook(name):
+                yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - t0
+
+class GreedyStats:
+    """
+    Counters for a greedy loop, cheap enough to stay on by default.
+
+    counts   candidates examined, rejections by reason, objective
+             evaluations, grade checks, ...
+    seconds  time spent in each check (perf_counter, summed)
+    stop     where the loop ended: position, candidates, reason
+    hist     only with histograms=True – per reason, the candidate
+             position in tenths of the list, and per check the call
+             time in log2 µs buckets
+    """
+
+    def __init__(self, histograms=False):
+        self.counts = Counter()
+        self.seconds = defaultdict(float)
+        self.hist = defaultdict(Counter) if histograms else None
+        self.stop = None
+
+    def timed(self, check, dt):
+        """Account one call of `check` that took dt seconds."""
+        self.counts[check] += 1
+        self.seconds[check] += dt
+        if self.hist is not None:
+            self.hist[f"{check}_us"][max(0, math.ceil(math.log2(dt * 1e6 + 1e-9)))] += 1
+
+    def reject(self, reason, pos, n):
+        self.counts[f"reject_{reason}"] += 1
+        if self.hist is not None:
+            self.hist[f"reject_{reason}_pos"][10 * pos // max(n, 1)] += 1
+
+    def stopped(self, pos, n, reason):
+        self.stop = dict(position=pos, candidates=n, reason=reason)
+
+    def as_dict(self):
+        rec = dict(counts=dict(self.counts),
+                   seconds={k: round(v, 6) for k, v in self.seconds.items()},
+                   stop=self.stop)
+        if self.hist is not None:
+            rec["hist"] = {k: dict(sorted(h.items())) for k, h in self.hist.items()}
+        return rec
@@ -1,58 +1,138 @@
 from heuristic import run_heuristic_objective
 from run import run_optimal_objective
 from simple_heuristic import run_simple_objective
-import glob, csv
+from lazy_greedy import run_lazy_objective
+from bounds import certified_gap, upper_bound
+from common import load_instance, parse_instance, phase
+from profiling import add_profile_args, make_timings
+from result_cache import add_cache_args, make_cache
+import argparse, glob, csv
 from pathlib import Path
 import time
 
-INSTANCES = glob.glob("instances/Timmy/*.json")
+parser = argparse.ArgumentParser(description="Compare all solvers on a set of instances")
+parser.add_argument("--instances", default="instances/Timmy/*.json",
+                    help="glob pattern of instance files")
+parser.add_argument("--db", default=None,
+                    help="also append the runs to this run_store.py database")
+parser.add_argument("--skip_optimal_below", type=float, default=None, metavar="GAP",
+                    help="skip the exact solve when the best heuristic's certified "
+                         "gap (bounds.py) is at most GAP, e.g. 0.01")
+add_profile_args(parser)
+add_cache_args(parser)
+args = parser.parse_args()
+
+INSTANCES = glob.glob(args.instances)
+prof = make_timings(args, "compare")     # one report per method, all instances
+cache = make_cache(args)
+store = None
+if args.db:
+    from run_store import RunStore
+    store = RunStore(args.db)
+    store.add_instances(INSTANCES)
+
+def objective(method, path, plain, parsed):
+    """plain(path), or through the result cache when --cache is given."""
+    if cache is None:
+        return plain(path)
+    from bench_harness import run_method
+    res = run_method(method, parsed, cache=cache, instance=Path(path).name)
+    if res["objective"] is None:
+        raise RuntimeError(f"{method} found no schedule (status {res.get('status')})")
+    return res["objective"]
 
 with open("timmy_comparison.csv", "w", newline="") as f:
     writer = csv.writer(f)
     writer.writerow([
-        "instance", "optimal", "heuristic", "gap_%", "silly",
-        "time_opt", "time_heur", "time_silly"
+        "instance", "optimal", "heuristic", "gap_%", "silly", "lazy",
+        "time_opt", "time_heur", "time_silly", "time_lazy",
+        "bound", "cert_gap_%", "time_bound"
     ])
 
     for inst in INSTANCES:
         inst_name = Path(inst).name
 
         try:
-            # --- Time optimal ---
-            t0 = time.time()
-            opt = run_optimal_objective(inst)
-            t1 = time.time()
-            time_opt = t1 - t0
+            parsed = parse_instance(load_instance(inst))   # bound and cache, untimed
 
             # --- Time heuristic ---
             t0 = time.time()
-            heu = run_heuristic_objective(inst)
+            with phase(prof, "heuristic"):
+                heu = objective("heuristic", inst, run_heuristic_objective, parsed)
             t1 = time.time()
             time_heur = t1 - t0
 
             # --- Time silly ---
             t0 = time.time()
-            sil = run_simple_objective(inst)
+            with phase(prof, "simple"):
+                sil = run_simple_objective(inst)
             t1 = time.time()
             time_silly = t1 - t0
 
+            # --- Time lazy greedy ---
+            t0 = time.time()
+            with phase(prof, "lazy"):
+                lazy = objective("lazy", inst, run_lazy_objective, parsed)
+            t1 = time.time()
+            time_lazy = t1 - t0
+
+            # --- Upper bound, certified gap of the best heuristic ---
+            best = max(heu, sil, lazy)
+            t0 = time.time()
+            with phase(prof, "bound"):
+                ub = upper_bound(parsed, best)["bound"]
+            t1 = time.time()
+            time_bound = t1 - t0
+            cert = certified_gap(ub, best)
+
+            # --- Time optimal (unless a heuristic is certified) ---
+            opt, time_opt = None, 0.0
+            if args.skip_optimal_below is None or cert > args.skip_optimal_below:
+                t0 = time.time()
+                with phase(prof, "optimal"):
+                    opt = objective("optimal", inst, run_optimal_objective, parsed)
+                t1 = time.time()
+                time_opt = t1 - t0
+
         except Exception as e:
             print(f"[ERROR] Failed on {inst_name}: {e}")
             continue
 
-        gap = (opt - heu) / abs(opt) * 100 if opt != 0 else 0
+        if opt is None:
+            gap = None
+        else:
+            gap = (opt - heu) / abs(opt) * 100 if opt != 0 else 0
 
         writer.writerow([
-            inst_name, opt, heu, gap, sil,
-            round(time_opt, 4), round(time_heur, 4), round(time_silly, 4)
+            inst_name, opt, heu, gap, sil, lazy,
+            round(time_opt, 4), round(time_heur, 4), round(time_silly, 4),
+            round(time_lazy, 4), ub, cert * 100, round(time_bound, 4)
         ])
 
+        if store is not None:
+            # the optimal run's bound / gap columns are reserved for the MIP's own
+            runs = [dict(instance=inst_name, method=m, objective=o, time=t,
+                         **({} if m == "optimal" else
+                            dict(bound=ub, gap=certified_gap(ub, o))))
+                    for m, o, t in [("optimal", opt, time_opt),
+                                    ("heuristic", heu, time_heur),
+                                    ("simple", sil, time_silly),
+                                    ("lazy", lazy, time_lazy)]
+                    if o is not None]
+            store.add_runs(runs, tag="compare", path=inst)
+
         print(
             f"✓ {inst_name:30s}  "
-            f"OPT={opt:.4f} ({time_opt:.2f}s)  "
-            f"HEUR={heu:.4f} ({time_heur:.2f}s)  "
-            f"GAP={gap:.2f}%  "
-            f"SIL={sil:.4f} ({time_silly:.2f}s)"
+            + (f"OPT={opt:.4f} ({time_opt:.2f}s)  " if opt is not None else "OPT skipped  ")
+            + f"HEUR={heu:.4f} ({time_heur:.2f}s)  "
+            + (f"GAP={gap:.2f}%  " if gap is not None else "")
+            + f"UB={ub:.4f} CERT={cert:.2%} ({time_bound:.2f}s)  "
+            f"SIL={sil:.4f} ({time_silly:.2f}s)  "
+            f"LAZY={lazy:.4f} ({time_lazy:.2f}s)"
         )
 
 print("✅ Comparison with timing complete. Output saved to comparison.csv")
+if cache is not None:
+    print(f"Result cache {cache.root}/: {cache.hits} hits, {cache.misses} misses")
+if hasattr(prof, "report"):
+    prof.report()
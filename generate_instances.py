@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+generate_instances.py
+---------------------
+Synthetic instances of controllable size for stress testing.
+
+Tasks are entered through the same helpers as the real catalog
+(build_course_catalog.add / add_exam / add_weekly_lectures /
+assemble_catalog) and productivity comes from one of the two existing
+P models:
+
+    style      base · γ_t · exp(-λ·gap)       (assemble_instance_all.py)
+    circadian  η · (1+θ) · [1 + cos(…)]       (assemble_timmy.py)
+
+Size knobs
+----------
+  --courses            number of courses
+  --tasks              graded tasks per course (before weekly lectures)
+  --days / --shifts    horizon length and shifts per day
+  --mandatory          share of tasks that are exams with fixed seat-times
+  --window MIN MAX     release→due window width in days
+
+The same --seed always reproduces the same file.
+
+    python generate_instances.py --courses 12 --tasks 20 --days 200 \\
+        --shifts 24 --mandatory 0.3 --seed 7 --out instances/synthetic
+"""
+import argparse
+import json
+import random
+from pathlib import Path
+
+from build_course_catalog import (add, add_exam, add_weekly_lectures,
+                                  assemble_catalog)
+import assemble_instance_all as style_model
+import assemble_timmy as circadian_model
+import manifest
+from common import phase
+from profiling import add_profile_args, make_timings
+
+CATEGORIES = ["STEM", "SOC", "HUM"]
+TASK_KINDS = ["Homework", "Project", "Worksheet", "Reading"]
+
+def synthetic_tasks(rng, n_courses, n_tasks, days, shifts,
+                    mandatory=0.2, window=(7, 21)):
+    """
+    Task list in build_course_catalog format plus per-course categories.
+    Mandatory seat-times never collide: each exam takes 1–3 consecutive
+    free shifts on its due day.
+    """
+    tlist, used = [], set()
+    courses = [f"SYN{c:03d}" for c in range(1, n_courses + 1)]
+    for course in courses:
+        cat = rng.choice(CATEGORIES)
+        for n in range(1, n_tasks + 1):
+            due    = rng.randint(min(window[0] + 1, days), days)
+            width  = rng.randint(*window)
+            weight = rng.randint(1, 20)
+            effort = rng.randint(1, 8)
+            if rng.random() < mandatory:
+                length = rng.randint(1, min(3, shifts))
+                starts = [s for s in range(1, shifts - length + 2)
+                          if all((due, s + o) not in used for o in range(length))]
+                if starts:
+                    start = rng.choice(starts)
+                    fixed = [(due, start + o) for o in range(length)]
+                    used.update(fixed)
+                    add_exam(course, f"Exam {n}", weight, due, effort + length,
+                             fixed=fixed, cat=cat, tlist=tlist, window=width)
+                    continue
+            kind = rng.choice(TASK_KINDS)
+            add(course, f"{kind} {n}", weight, max(1, due - width), due, effort,
+                None, cat, tlist)
+    add_weekly_lectures(tlist, weeks=max(1, days // 7))
+    return courses, tlist
+
+def generate(n_courses=4, n_tasks=10, days=115, shifts=16, mandatory=0.2,
+             window=(7, 21), style="stem", work="normal", model="style",
+             seed=0):
+    """One synthetic instance dict, reproducible from `seed`."""
+    rng = random.Random(seed)
+    courses, tlist = synthetic_tasks(rng, n_courses, n_tasks, days, shifts,
+                                     mandatory, window)
+    catalog = assemble_catalog(tlist, {c: 1.0 for c in courses},
+                               last_shift=shifts)
+    credit = {c: rng.randint(2, 4) for c in courses}
+
+    inst = style_model.assemble_instance(catalog, courses, style, work,
+                                         credit, days, shifts)
+    if model == "circadian":
+        theta = {c: round(rng.uniform(-0.5, 1.0), 2) for c in courses}
+        inst["P"] = circadian_model.expand_P(catalog["J"], theta, days, shifts)
+        inst["H*"] = circadian_model.build_H_star(days)
+    return inst
+
+def main(argv=None):
+    p = argparse.ArgumentParser(
+        description="Generate seeded synthetic instances of any size")
+    p.add_argument("--courses", type=int, default=4)
+    p.add_argument("--tasks", type=int, default=10,
+                   help="graded tasks per course")
+    p.add_argument("--days", type=int, default=115)
+    p.add_argument("--shifts", type=int, default=16)
+    p.add_argument("--mandatory", type=float, default=0.2,
+                   help="share of tasks with fixed seat-times (0–1)")
+    p.add_argument("--window", type=int, nargs=2, default=[7, 21],
+                   metavar=("MIN", "MAX"), help="task window width (days)")
+    p.add_argument("--style", choices=sorted(style_model.STYLE2CAT),
+                   default="stem")
+    p.add_argument("--work", choices=sorted(style_model.WORK_LEVELS),
+                   default="normal")
+    p.add_argument("--model", choices=["style", "circadian"], default="style",
+                   help="productivity model")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--count", type=int, default=1,
+                   help="number of instances (seeds seed … seed+count-1)")
+    p.add_argument("--out", default="instances/synthetic")
+    add_profile_args(p)
+    args = p.parse_args(argv)
+    timings = make_timings(args, "generate_instances")
+
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for seed in range(args.seed, args.seed + args.count):
+        with phase(timings, "generate"):
+            inst = generate(args.courses, args.tasks, args.days, args.shifts,
+                            args.mandatory, tuple(args.window), args.style,
+                            args.work, args.model, seed)
+        fname = (f"synthetic_c{args.courses}_t{args.tasks}_d{args.days}"
+                 f"_s{args.shifts}__{args.style}_{args.work}_seed{seed}.json")
+        with phase(timings, "write"), open(out_dir / fname, "w") as f:
+            json.dump(inst, f)
+        print(f"✓ {out_dir / fname}")
+    with phase(timings, "manifest"):
+        manifest.build(out_dir)
+    if hasattr(timings, "report"):
+        timings.report()
+
+
+if __name__ == "__main__":
+    main()
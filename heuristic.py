@@ -1,11 +1,16 @@
 #!/usr/bin/env python3
-import json
 import argparse
 import csv
+import json
 import gurobipy as gp
 from gurobipy import GRB
 from pathlib import Path
 import math
+import time
+
+from common import GreedyStats, evaluate, load_instance, parse_instance, phase
+from profiling import add_profile_args, make_timings
+from result_cache import add_cache_args, cached_solve
 
 SHIFTS_PER_HOUR = 1
 
@@ -17,30 +22,18 @@ def _to_csv(schedule, path="schedule.csv"):
             w.writerow([k, t, i, j])
     print(f"CSV written to {path!s}")
 
-def load_instance(path):
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-def to_pair(x, default):
-    return (x, default) if isinstance(x, int) else tuple(x)
-
-# We keep P global so our helpers can see it
-P = {}
-
-def check_hard_constraints(y_sel, K, T):
-    """
-    Hard rules:
-      1) At most one assignment per (k,t)
-      2) No more than 4 worked shifts in any sliding 6-shift window on the same day
-    """
+def check_overlap(y_sel):
+    """Hard rule 1: at most one assignment per (k,t)."""
     used = set()
     for (k, t, i, j), v in y_sel.items():
         if v:
             if (k, t) in used:
                 return False
             used.add((k, t))
+    return True
 
-    # Break-rule check
+def check_break_rule(y_sel, K):
+    """Hard rule 2: no more than 4 worked shifts in any sliding 6-shift window on the same day."""
     for k in K:
         shifts = sorted(t for (kk, t, _, _), v in y_sel.items() if v and kk == k)
         for t in shifts:
@@ -50,7 +43,15 @@ def check_hard_constraints(y_sel, K, T):
                     return False
     return True
 
-def check_minimum_grades(y_sel, I, J, S, E, B):
+def check_hard_constraints(y_sel, K, T):
+    """
+    Hard rules:
+      1) At most one assignment per (k,t)
+      2) No more than 4 worked shifts in any sliding 6-shift window on the same day
+    """
+    return check_overlap(y_sel) and check_break_rule(y_sel, K)
+
+def check_minimum_grades(y_sel, I, J, S, E, B, P):
     """
     Grade rule:
       G_i = sum_j S[i][j] * min(a_ij/E_ij, 1)
@@ -73,7 +74,7 @@ def check_minimum_grades(y_sel, I, J, S, E, B):
             return False
     return True
 
-def compute_objective(y_sel, I, J, S, E, w, beta, Hstar):
+def compute_objective(y_sel, I, J, S, E, w, beta, Hstar, P):
     """
     Objective = sum_i w[i] * G_i  -  beta * sum_k overtime_k,
     where overtime_k = max(0, #shifts_on_k - Hstar[k]).
@@ -101,51 +102,16 @@ def compute_objective(y_sel, I, J, S, E, w, beta, Hstar):
 
     return gpa - beta * overtime
 
-def main():
-    p = argparse.ArgumentParser(
-        description="LP‐relax, sort fractional y's, then greedy rounding"
-    )
-    p.add_argument("instance", help="Path to JSON instance file")
-    args = p.parse_args()
+def build_model(inst, time_limit=60, env=None):
+    """LP relaxation of the run.py model; returns (model, y)."""
+    K, T, I, J = inst["K"], inst["T"], inst["I"], inst["J"]
+    S, E, w, B = inst["S"], inst["E"], inst["w"], inst["B"]
+    H_star, beta, slot = inst["H_star"], inst["beta"], inst["slot"]
+    r, d, P = inst["r"], inst["d"], inst["P"]
 
-    if not Path(args.instance).exists():
-        raise SystemExit(f"{args.instance} not found")
-    data = load_instance(args.instance)
-
-    # --- unpack data ---
-    K = list(map(int, data["K"]))
-    T = list(map(int, data["T"]))
-    I = data["I"]
-    J = {i: data["J"][i] for i in I}
-    w = data["w"]
-    B = data["B"]
-    beta = data["beta"]
-    H_star = {int(k): v for k, v in data["H*"].items()}
-    slot   = data.get("slot", {})
-
-    r = {i:{j: to_pair(data["r"][i][j], 1)      for j in J[i]} for i in I}
-    d = {i:{j: to_pair(data["d"][i][j], max(T)) for j in J[i]} for i in I}
-
-    S = {i:{j: data["S"][i][j] for j in J[i]} for i in I}
-    E = {i:{j: data["E"][i][j] for j in J[i]} for i in I}
-
-    # build P globally
-    global P
-    P = {
-        i: {
-            j: {
-                tuple(map(int, k.strip("()").split(","))): v
-                for k, v in data["P"][i][j].items()
-            }
-            for j in J[i]
-        }
-        for i in I
-    }
-
-        # ----------------- build model ------------------------------------------
-    m = gp.Model("LP_Relax")
+    m = gp.Model("LP_Relax", env=env)
     m.Params.OutputFlag = 0
-    m.Params.TimeLimit = 60
+    m.Params.TimeLimit = time_limit
 
     # y_{k,t,i,j} ------------------------------------------------------------
     y = {}
@@ -214,77 +180,147 @@ def main():
     m.setObjective(((gp.quicksum(w[i] * G[i] for i in I) / sum(w.values())) * 4)
                    - beta * gp.quicksum(z[k] for k in K),
                    GRB.MAXIMIZE)
-    m.optimize()
-    if m.status not in (GRB.OPTIMAL, GRB.TIME_LIMIT):
-        print("LP relaxation failed")
-        return
+    return m, y
+
+def greedy_round(inst, y, stats=None):
+    """
+    Sort the fractional y's of a solved LP and round greedily.
+    Returns (binary_y, best_obj); counters go to `stats` (GreedyStats).
+    """
+    stats = GreedyStats() if stats is None else stats
+    clock = time.perf_counter
+    K, T, I, J = inst["K"], inst["T"], inst["I"], inst["J"]
+    S, E, w, B = inst["S"], inst["E"], inst["w"], inst["B"]
+    beta, H_star, P = inst["beta"], inst["H_star"], inst["P"]
 
     # --- extract & sort all fractional y's ---
-    y_vals = [
-        (var.X, var.VarName)
-        for var in m.getVars()
-        if var.VarName.startswith("y_") and var.X > 1e-8
-    ]
-    parsed = []
-    for val, name in y_vals:
-        _, k, t, i, j = name.split("_", 4)
-        parsed.append((val, int(k), int(t), i, j))
+    parsed = [(var.X, k, t, i, j)
+              for (k, t, i, j), var in y.items() if var.X > 1e-8]
     parsed.sort(reverse=True, key=lambda x: x[0])
 
     # --- greedy rounding over all candidates ---
     binary_y = { (k,t,i,j): 0 for (_,k,t,i,j) in parsed }
     best_obj  = -1e99
 
-    for (_val, k, t, i, j) in parsed:
+    n = len(parsed)
+    stats.stopped(n, n, "exhausted")
+    for pos, (_val, k, t, i, j) in enumerate(parsed):
         key = (k, t, i, j)
+        stats.counts["examined"] += 1
         # 1) tentatively include
         binary_y[key] = 1
 
-        # 2) hard‐constraint check
-        if not check_hard_constraints(binary_y, K, T):
+        # 2) hard‐constraint checks: no overlap, then the break rule
+        t0 = clock()
+        ok = check_overlap(binary_y)
+        stats.timed("overlap_check", clock() - t0)
+        if not ok:
+            binary_y[key] = 0
+            stats.reject("overlap", pos, n)
+            continue
+        t0 = clock()
+        ok = check_break_rule(binary_y, K)
+        stats.timed("break_check", clock() - t0)
+        if not ok:
             binary_y[key] = 0
+            stats.reject("break", pos, n)
             continue
 
         # 3) compute new objective
-        obj = compute_objective(binary_y, I, J, S, E, w, beta, H_star)
+        t0 = clock()
+        obj = compute_objective(binary_y, I, J, S, E, w, beta, H_star, P)
+        stats.timed("objective_eval", clock() - t0)
 
         # 4) if we already have a solution and it got worse
         #    *and* minimum grades are now met, undo + stop
-        if best_obj > -1e90 and obj < best_obj \
-           and check_minimum_grades(binary_y, I, J, S, E, B):
-            binary_y[key] = 0
-            break
+        if best_obj > -1e90 and obj < best_obj:
+            t0 = clock()
+            grades_ok = check_minimum_grades(binary_y, I, J, S, E, B, P)
+            stats.timed("grade_check", clock() - t0)
+            if grades_ok:
+                binary_y[key] = 0
+                stats.stopped(pos, n, "objective_worse")
+                break
 
         # 5) otherwise accept
         best_obj = obj
+        stats.counts["accepted"] += 1
 
-    # --- final output ---
-    print(f"\nFinal objective = {best_obj:.4f}")
+    return binary_y, best_obj
 
-    schedule = sorted(
-        (k, t, i, j)
-        for (k, t, i, j), val in binary_y.items()
-        if val == 1
+def solve(inst, time_limit=60, timings=None, histograms=False, env=None):
+    """
+    LP-relax, sort fractional y's, then greedy rounding.  Phase times
+    (build / solve / extract) are accumulated into `timings`, the
+    rounding counters are returned as `stats` (see common.GreedyStats).
+    `env` is an optional started gp.Env for the LP.
+    """
+    timings = {} if timings is None else timings
+    stats = GreedyStats(histograms)
+
+    with phase(timings, "build"):
+        m, y = build_model(inst, time_limit, env)
+    with phase(timings, "solve"):
+        m.optimize()
+        if m.status not in (GRB.OPTIMAL, GRB.TIME_LIMIT):
+            return dict(status=m.status, objective=None, schedule=[],
+                        timings=timings, stats=stats.as_dict())
+        binary_y, best_obj = greedy_round(inst, y, stats)
+    with phase(timings, "extract"):
+        schedule = sorted(
+            (k, t, i, j)
+            for (k, t, i, j), val in binary_y.items()
+            if val == 1
+        )
+    return dict(evaluate(inst, schedule), status=m.status, objective=best_obj,
+                lp_bound=m.ObjVal, schedule=schedule, timings=timings,
+                stats=stats.as_dict())
+
+def main(argv=None):
+    p = argparse.ArgumentParser(
+        description="LP‐relax, sort fractional y's, then greedy rounding"
     )
+    p.add_argument("instance", help="Path to JSON instance file")
+    p.add_argument("--stats", default=None,
+                   help="write the rounding counters to this JSON file")
+    p.add_argument("--histograms", action="store_true",
+                   help="also collect position / check-time histograms")
+    add_profile_args(p)
+    add_cache_args(p)
+    args = p.parse_args(argv)
+
+    if not Path(args.instance).exists():
+        raise SystemExit(f"{args.instance} not found")
+    timings = make_timings(args, Path(args.instance).stem)
+    with phase(timings, "load"):
+        data = load_instance(args.instance)
+    with phase(timings, "parse"):
+        inst = parse_instance(data)
+
+    params = {"histograms": True} if args.histograms else {}
+    res = cached_solve(args, "heuristic", "heuristic", inst, params,
+                       lambda: solve(inst, timings=timings, histograms=args.histograms),
+                       Path(args.instance).name)
+    if hasattr(timings, "report"):
+        timings.report()
+    if args.stats:
+        with open(args.stats, "w") as f:
+            json.dump(res["stats"], f, indent=2)
+    if res["objective"] is None:
+        print("LP relaxation failed")
+        return
+
+    # --- final output ---
+    print(f"\nFinal objective = {res['objective']:.4f}"
+          + ("  (cached)" if res.get("cached") else ""))
 
-    _to_csv(schedule, path="schedule.csv")
+    _to_csv(res["schedule"], path="schedule.csv")
 
 def run_heuristic_objective(json_path):
-    import sys
-    sys.argv = ["heuristic.py", json_path]
-    from io import StringIO
-    import contextlib
-
-    f = StringIO()
-    with contextlib.redirect_stdout(f):
-        main()  # runs the existing logic
-    output = f.getvalue()
-
-    # extract final objective
-    for line in output.splitlines():
-        if "Final objective" in line:
-            return float(line.strip().split()[-1])
-    raise RuntimeError("Could not parse heuristic objective")
+    res = solve(parse_instance(load_instance(json_path)))
+    if res["objective"] is None:
+        raise RuntimeError("LP relaxation failed")
+    return res["objective"]
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Lazy-greedy construction on marginal objective gain.
+
+The grade term S·min(a/E, 1) is concave in effort and the overtime
+penalty only grows as a day fills up, so the marginal gain of any
+(slot, task) candidate never increases.  Candidates therefore sit in a
+max-heap keyed by their last known gain; only the top is re-evaluated
+and a stale key is pushed back with its fresh value (lazy greedy).
+"""
+import argparse
+import csv
+import heapq
+import math
+from pathlib import Path
+
+from common import evaluate, load_instance, parse_instance, phase
+from profiling import add_profile_args, make_timings
+from result_cache import add_cache_args, cached_solve
+
+SHIFTS_PER_HOUR = 1
+
+def _to_csv(schedule, path="schedule.csv"):
+    with open(path, "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["day", "shift", "course", "task"])
+        for k, t, i, j in schedule:
+            w.writerow([k, t, i, j])
+    print(f"CSV written to {path!s}")
+
+def solve(inst, timings=None):
+    """
+    Lazy greedy on marginal gain.  Phase times (build / solve / extract)
+    are accumulated into `timings`.  Optional inst["prices"] {(k, t): λ}
+    is charged for every non-mandatory assignment in that shift, and
+    shifts in inst["blocked"] {(k, t)} get no non-mandatory assignment.
+    """
+    timings = {} if timings is None else timings
+    K, I, J = inst['K'], inst['I'], inst['J']
+    S, E, w, B = inst['S'], inst['E'], inst['w'], inst['B']
+    beta, Hstar, slot = inst['beta'], inst['H_star'], inst['slot']
+    r, d, P = inst['r'], inst['d'], inst['P']
+    prices = inst.get('prices', {})
+    blocked = inst.get('blocked', set())   # (k, t) closed to this student
+
+    W = sum(w.values())
+    max_slots = {(i, j): math.ceil(E[i][j] / SHIFTS_PER_HOUR)
+                 for i in I for j in J[i]}
+
+    # Incremental state
+    used_shifts = set()
+    shifts_by_day = {k: [] for k in K}
+    a_loc = {(i, j): 0.0 for i in I for j in J[i]}
+    n_slots = {(i, j): 0 for i in I for j in J[i]}
+    selected = []
+
+    def grade(i):
+        return sum(S[i][j] * min(a_loc[i, j] / E[i][j], 1.0) for j in J[i])
+
+    def grade_gain(key):
+        k, t, i, j = key
+        a = a_loc[i, j]
+        return S[i][j] * (min((a + P[i][j][(k, t)]) / E[i][j], 1.0)
+                          - min(a / E[i][j], 1.0))
+
+    def priced_grade_gain(key):
+        k, t, i, _ = key
+        return grade_gain(key) * w[i] / W * 4 - prices.get((k, t), 0.0)
+
+    def obj_gain(key):
+        k, t, i, _ = key
+        ot = beta if len(shifts_by_day[k]) + 1 > Hstar[k] else 0.0
+        return grade_gain(key) * w[i] / W * 4 - ot - prices.get((k, t), 0.0)
+
+    def feasible(key):
+        """Overlap, slot cap and break rule; all three only get tighter."""
+        k, t, i, j = key
+        if (k, t) in used_shifts or n_slots[i, j] >= max_slots[i, j]:
+            return False
+        day_shifts = shifts_by_day[k] + [t]
+        return not any(
+            sum(1 for s in day_shifts if start <= s < start + 6) > 4
+            for start in range(max(1, t - 5), t + 1)
+        )
+
+    def take(key):
+        k, t, i, j = key
+        used_shifts.add((k, t))
+        shifts_by_day[k].append(t)
+        a_loc[i, j] += P[i][j][(k, t)]
+        n_slots[i, j] += 1
+        selected.append(key)
+
+    def lazy_pass(cands, gain, done=lambda: False):
+        """
+        Accept candidates in order of fresh marginal gain until the best
+        gain is no longer positive or done() holds.
+        """
+        heap = [(-gain(key), n, key) for n, key in enumerate(cands)]
+        heapq.heapify(heap)
+        while heap and not done():
+            neg, n, key = heapq.heappop(heap)
+            if -neg <= 0:
+                break
+            if not feasible(key):
+                continue                     # never becomes feasible again
+            g = gain(key)
+            if heap and g < -heap[0][0]:
+                heapq.heappush(heap, (-g, n, key))   # stale → re-queue
+                continue
+            if g > 0:
+                take(key)
+
+    with phase(timings, 'build'):
+        # Mandatory seat-times are placed first, whatever the break rule says
+        for i in I:
+            for j in J[i]:
+                for day, sh in slot.get(i, {}).get(j, []):
+                    key = (day, sh, i, j)
+                    if (day, sh) in P[i][j] and (day, sh) not in used_shifts \
+                       and r[i][j] <= (day, sh) <= d[i][j]:
+                        take(key)
+
+        # Enumerate all feasible assignments
+        all_keys = [
+            (k, t, i, j)
+            for i in I
+            for j in J[i]
+            for (k, t) in P[i][j]
+            if r[i][j] <= (k, t) <= d[i][j] and (k, t) not in used_shifts
+            and (k, t) not in blocked
+        ]
+
+    with phase(timings, 'solve'):
+        # 1) secure the grade minima first, course by course on grade gain
+        #    (at prices, the rest of the way without if that falls short)
+        for i in I:
+            for gain in ([priced_grade_gain] if prices else []) + [grade_gain]:
+                lazy_pass([key for key in all_keys if key[2] == i], gain,
+                          done=lambda i=i: grade(i) + 1e-9 >= B[i])
+
+        # 2) lazy greedy on the objective
+        lazy_pass(all_keys, obj_gain)
+
+    with phase(timings, 'extract'):
+        schedule = sorted(selected)
+        res = evaluate(inst, schedule)
+    return dict(res, schedule=schedule, timings=timings)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Lazy greedy on marginal objective gain (priority queue)'
+    )
+    parser.add_argument('instance', help='Path to JSON instance file')
+    parser.add_argument('--csv_path', default=None,
+                        help='write the schedule to this CSV file')
+    add_profile_args(parser)
+    add_cache_args(parser)
+    args = parser.parse_args(argv)
+
+    if not Path(args.instance).exists():
+        raise SystemExit(f"{args.instance} not found")
+    timings = make_timings(args, Path(args.instance).stem)
+    with phase(timings, 'load'):
+        data = load_instance(args.instance)
+    with phase(timings, 'parse'):
+        inst = parse_instance(data)
+
+    res = cached_solve(args, 'lazy', 'lazy_greedy', inst, {},
+                       lambda: solve(inst, timings=timings), Path(args.instance).name)
+    if hasattr(timings, 'report'):
+        timings.report()
+
+    # Output
+    print(f"\nFinal objective (lazy greedy) = {res['objective']:.4f}"
+          + ("  (cached)" if res.get('cached') else ""))
+    if not res['grades_ok']:
+        print("Warning: minimum grades not met")
+    if args.csv_path:
+        _to_csv(res['schedule'], path=args.csv_path)
+
+def run_lazy_objective(json_path):
+    return solve(parse_instance(load_instance(json_path)))['objective']
+
+
+if __name__ == '__main__':
+    main()
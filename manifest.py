@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+manifest.py
+-----------
+Metadata index of an instance corpus, so instances can be chosen
+without opening the (up to 4 MB) JSON files.
+
+<root>/.manifest.json holds one entry per instance file under <root>
+(recursively), keyed by its path relative to <root>.  The leading dot
+keeps it out of the "<root>/*.json" globs the other tools expand:
+
+    courses, style, work, β, days, shifts, H* profile (min / mean / max
+    and run lengths), tasks per course, mandatory seat-times, candidate
+    (k, t, i, j) cells, sha256, file size and mtime
+
+Rebuilding is incremental: files with the same size and mtime (or,
+after a checkout, the same size and sha256) keep their entry.  The
+instance generators refresh the manifest of the directory they write
+to.
+
+    python manifest.py build instances
+    python manifest.py query --course MATH4008 IM2010 --style stem
+    python manifest.py query --work hard --max_vars 8000 --paths
+    python manifest.py show instance_IM2010_MATH4008_ECON1023_IM3004__stem_normal.json
+
+bench_harness.py and campaign.py take the same filters (--manifest,
+--course, --style, --work, --max_vars, --name) instead of, or on top
+of, instance paths.
+"""
+import argparse
+import fnmatch
+import hashlib
+import itertools
+import json
+import os
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+
+from common import instance_class, parse_key, to_pair
+
+MANIFEST = ".manifest.json"
+DEFAULT_ROOT = "instances"
+VERSION = 1
+
+# ------------------------------------------------------------------ #
+# Metadata                                                           #
+# ------------------------------------------------------------------ #
+def name_meta(name):
+    """What the file name tells: courses, style, work level."""
+    m = re.match(r"instance_(.+?)__", Path(name).name)
+    cls = instance_class(name)
+    style, work = cls.split("_") if cls != "unknown" else (None, None)
+    return dict(courses=sorted(m.group(1).split("_")) if m else None,
+                style=style, work=work)
+
+def instance_meta(path):
+    """Metadata of one instance file (read once)."""
+    path = Path(path)
+    st = path.stat()
+    blob = path.read_bytes()
+    data = json.loads(blob)
+    I, J, K = data["I"], data["J"], list(map(int, data["K"]))
+    H = [data["H*"][str(k)] for k in K]
+    T_max = max(map(int, data["T"]))
+    mandatory = n_vars = 0
+    keys = {}                                   # '(k,t)' → (k, t), parsed once
+    for i in I:
+        for j in J[i]:
+            lo, hi = to_pair(data["r"][i][j], 1), to_pair(data["d"][i][j], T_max)
+            mandatory += sum(lo <= tuple(kt) <= hi
+                             for kt in data.get("slot", {}).get(i, {}).get(j, []))
+            for kt in data["P"][i][j]:
+                if kt not in keys:
+                    keys[kt] = parse_key(kt)
+                n_vars += lo <= keys[kt] <= hi
+    return dict(
+        name_meta(path.name),
+        name        = path.name,
+        size        = st.st_size,
+        mtime_ns    = st.st_mtime_ns,
+        hash        = hashlib.sha256(blob).hexdigest(),
+        courses     = sorted(I),
+        beta        = data["beta"],
+        n_days      = len(K),
+        n_shifts    = len(data["T"]),
+        H_star      = dict(min=min(H), mean=round(sum(H) / len(H), 4), max=max(H),
+                           runs=[[h, len(list(g))] for h, g in itertools.groupby(H)]),
+        tasks       = {i: len(J[i]) for i in I},
+        n_tasks     = sum(len(J[i]) for i in I),
+        n_mandatory = mandatory,
+        n_vars      = n_vars,
+    )
+
+# ------------------------------------------------------------------ #
+# Build / load                                                       #
+# ------------------------------------------------------------------ #
+def instance_files(root):
+    return sorted(p for p in Path(root).rglob("*.json") if not p.name.startswith("."))
+
+def load(path=None):
+    """Manifest dict ({} entries when the file does not exist)."""
+    path = Path(path or Path(DEFAULT_ROOT) / MANIFEST)
+    if path.is_dir():
+        path = path / MANIFEST
+    if not path.exists():
+        return dict(version=VERSION, root=str(path.parent), instances={})
+    with open(path) as f:
+        man = json.load(f)
+    man["root"] = str(path.parent)
+    return man
+
+def build(root=DEFAULT_ROOT, full=False, log=print):
+    """
+    (Re)index every instance file under `root` and write
+    <root>/.manifest.json.  Unchanged files (same size and mtime) keep
+    their entry unless full=True.  Returns the manifest.
+    """
+    root = Path(root)
+    old = {} if full else load(root / MANIFEST)["instances"]
+    entries, fresh = {}, 0
+    for path in instance_files(root):
+        rel = path.relative_to(root).as_posix()
+        st = path.stat()
+        prev = old.get(rel)
+        if prev and current(prev, path, st):
+            entries[rel] = dict(prev, mtime_ns=st.st_mtime_ns)
+            continue
+        try:
+            entries[rel] = instance_meta(path)
+        except (KeyError, ValueError) as e:             # not an instance file
+            log(f"  skipped {rel}: {type(e).__name__}: {e}")
+            continue
+        fresh += 1
+    man = dict(version=VERSION, generated=datetime.now().isoformat(timespec="seconds"),
+               instances=entries)
+    tmp = root / f"{MANIFEST}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(man, f, indent=1)
+    os.replace(tmp, root / MANIFEST)
+    log(f"{root / MANIFEST}: {len(entries)} instances ({fresh} indexed, "
+        f"{len(entries) - fresh} unchanged)")
+    return dict(man, root=str(root))
+
+def current(entry, path, st):
+    """
+    Does `entry` still describe the file?  Same size and mtime, or
+    (after a checkout or copy) same size and content hash.
+    """
+    if entry["size"] != st.st_size:
+        return False
+    return (entry["mtime_ns"] == st.st_mtime_ns
+            or entry["hash"] == hashlib.sha256(Path(path).read_bytes()).hexdigest())
+
+def lookup(path):
+    """
+    Manifest entry of an instance file from the manifest of its
+    directory (or a parent), if the file has not changed since.
+    """
+    path = Path(path).resolve()
+    st = path.stat()
+    for root in path.parents:
+        if (root / MANIFEST).exists():
+            entry = _load_cached(root).get(path.relative_to(root).as_posix())
+            return entry if entry and current(entry, path, st) else None
+    return None
+
+_MANIFESTS = {}                 # root → entries (per process)
+
+def _load_cached(root):
+    if root not in _MANIFESTS:
+        _MANIFESTS[root] = load(root / MANIFEST)["instances"]
+    return _MANIFESTS[root]
+
+# ------------------------------------------------------------------ #
+# Queries                                                            #
+# ------------------------------------------------------------------ #
+def select(man, course=None, style=None, work=None, max_vars=None,
+           max_days=None, name=None):
+    """
+    Entries (with their "path") that contain every course in `course`,
+    have one of the given styles / work levels, at most max_vars
+    candidate cells and max_days days, and a name matching the glob
+    `name`.
+    """
+    root = Path(man["root"])
+    out = []
+    for rel, e in man["instances"].items():
+        if course and not set(course) <= set(e["courses"]):
+            continue
+        if style and e["style"] not in style:
+            continue
+        if work and e["work"] not in work:
+            continue
+        if max_vars is not None and e["n_vars"] > max_vars:
+            continue
+        if max_days is not None and e["n_days"] > max_days:
+            continue
+        if name and not fnmatch.fnmatch(e["name"], name):
+            continue
+        out.append(dict(e, path=str(root / rel)))
+    return out
+
+def add_select_args(p):
+    """Manifest filters for tools that take instance paths."""
+    g = p.add_argument_group("instance selection from the corpus manifest")
+    g.add_argument("--manifest", default=None,
+                   help=f"manifest file or corpus directory (default {DEFAULT_ROOT}/)")
+    g.add_argument("--course", nargs="+", default=None,
+                   help="instances containing all of these courses")
+    g.add_argument("--style", nargs="+", default=None)
+    g.add_argument("--work", nargs="+", default=None)
+    g.add_argument("--max_vars", type=int, default=None,
+                   help="at most this many candidate (k, t, i, j) cells")
+    g.add_argument("--name", default=None, help="file name glob")
+
+SELECT_KEYS = ["course", "style", "work", "max_vars", "name"]
+
+def select_paths(args):
+    """Instance paths chosen by add_select_args() options ([] if none given)."""
+    filters = {k: getattr(args, k) for k in SELECT_KEYS}
+    if args.manifest is None and all(v is None for v in filters.values()):
+        return []
+    man = load(args.manifest)
+    if not man["instances"]:
+        raise SystemExit(f"no manifest in {man['root']}/ "
+                         f"(python manifest.py build {man['root']})")
+    return [e["path"] for e in select(man, **filters)]
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Corpus manifest: build and query")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="(re)index a corpus directory")
+    b.add_argument("root", nargs="?", default=DEFAULT_ROOT)
+    b.add_argument("--full", action="store_true", help="re-read every file")
+    q = sub.add_parser("query", help="select instances")
+    add_select_args(q)
+    q.add_argument("--max_days", type=int, default=None)
+    q.add_argument("--paths", action="store_true", help="print paths only")
+    q.add_argument("--json", action="store_true", help="print full entries")
+    s = sub.add_parser("show", help="entry of one instance")
+    s.add_argument("instance")
+    s.add_argument("--manifest", default=None)
+    args = p.parse_args(argv)
+
+    if args.cmd == "build":
+        build(args.root, args.full)
+        return
+    t0 = time.perf_counter()
+    man = load(args.manifest)
+    if args.cmd == "show":
+        hits = [e for rel, e in man["instances"].items()
+                if args.instance in (rel, e["name"], Path(e["name"]).stem)]
+        if not hits:
+            raise SystemExit(f"{args.instance} not in {man['root']}/{MANIFEST}")
+        print(json.dumps(hits[0], indent=2))
+        return
+    rows = select(man, **{k: getattr(args, k) for k in SELECT_KEYS},
+                  max_days=args.max_days)
+    if args.paths:
+        print("\n".join(e["path"] for e in rows))
+    elif args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        for e in rows:
+            print(f"{e['name']:62s} {e['style'] or '–':>5s} {e['work'] or '–':>7s} "
+                  f"β={e['beta']:<7g} days={e['n_days']:<4d} tasks={e['n_tasks']:<4d} "
+                  f"vars={e['n_vars']}")
+        print(f"{len(rows)} of {len(man['instances'])} instances "
+              f"({1000 * (time.perf_counter() - t0):.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
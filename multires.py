@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+multires.py
+-----------
+Coarse-to-fine solve of the run.py model.
+
+1. Coarse: the calendar is cut into blocks of --block_days days ×
+   --block_shifts shifts.  An integer n[b,i,j] says how many shifts
+   of block b go to task (i, j); its effort is a concave piecewise
+   curve of n from the task's productivities in the block (--segments
+   runs, best first).  Capacity (also for every task window that ends
+   inside a block), mandatory seats, slot caps, grade minima and
+   overtime (per day, or per group of days for multi-day blocks) are
+   kept.
+2. Fine: every block is an independent assignment problem – put the
+   n[b,i,j] shifts on the best cells for each task (productivity
+   weighted by the task's grade value, minus overtime when the block
+   spans whole days).  Blocks are solved in a process pool.
+
+The fine schedule is evaluated exactly (common.evaluate); --compare
+also solves the full model and reports the objective loss.
+
+    python multires.py instance.json --block_days 1 --block_shifts 16
+    python multires.py instance.json --block_days 7 --block_shifts 4 \\
+        --workers 8 --compare
+"""
+import argparse
+import math
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import gurobipy as gp
+from gurobipy import GRB
+
+from common import evaluate, load_instance, parse_instance, phase
+from profiling import add_profile_args, make_timings
+
+SHIFTS_PER_HOUR = 1
+SHORTFALL = 1.0             # fine-problem cost per unit of effort below plan
+
+def block_of(k, t, block_days, block_shifts):
+    return (k - 1) // block_days, (t - 1) // block_shifts
+
+def make_blocks(inst, block_days, block_shifts):
+    """{block: [(k, t), …]} over the calendar."""
+    blocks = defaultdict(list)
+    for k in inst["K"]:
+        for t in inst["T"]:
+            blocks[block_of(k, t, block_days, block_shifts)].append((k, t))
+    return dict(blocks)
+
+def task_cells(inst, blocks):
+    """{(b, i, j): [(k, t), …]} – cells of block b inside the task window."""
+    r, d = inst["r"], inst["d"]
+    out = {}
+    for b, cells in blocks.items():
+        lo, hi = cells[0], cells[-1]
+        for i in inst["I"]:
+            for j in inst["J"][i]:
+                if r[i][j] > hi or d[i][j] < lo:
+                    continue
+                inside = [kt for kt in cells if r[i][j] <= kt <= d[i][j]]
+                if inside:
+                    out[b, i, j] = inside
+    return out
+
+# ------------------------------------------------------------------ #
+# Coarse model                                                       #
+# ------------------------------------------------------------------ #
+def coarse_model(inst, blocks, cells, block_days, block_shifts, segments=2,
+                 time_limit=60, output_flag=0, env=None):
+    """
+    Aggregated MIP; returns (model, {(b, i, j): [count vars]},
+    {(b, i, j): planned effort expression}).
+
+    A task's cells in a block are sorted by productivity and cut into
+    `segments` runs, one integer count per run valued at the run's
+    mean P – a concave effort curve, so the best run fills first.
+    """
+    I, J, K = inst["I"], inst["J"], inst["K"]
+    S, E, w, B = inst["S"], inst["E"], inst["w"], inst["B"]
+    H_star, beta, slot, P = inst["H_star"], inst["beta"], inst["slot"], inst["P"]
+    done = inst.get("done", {})
+
+    m = gp.Model("Coarse", env=env)
+    m.Params.OutputFlag = output_flag
+    m.Params.TimeLimit = time_limit
+
+    n, effort = {}, {}
+    for (b, i, j), kts in cells.items():
+        ps = sorted((P[i][j].get(kt, 0.0) for kt in kts), reverse=True)
+        cuts = [len(ps) * s // segments for s in range(segments + 1)]
+        runs = [ps[lo:hi] for lo, hi in zip(cuts, cuts[1:]) if hi > lo]
+        n[b, i, j] = [m.addVar(vtype=GRB.INTEGER, lb=0, ub=len(run)) for run in runs]
+        effort[b, i, j] = gp.quicksum(sum(run) / len(run) * var
+                                      for run, var in zip(runs, n[b, i, j]))
+    count = {key: gp.quicksum(vs) for key, vs in n.items()}
+
+    # mandatory seats: at least that many shifts in the block
+    need = defaultdict(int)
+    for i in I:
+        for j in J[i]:
+            for day, sh in slot.get(i, {}).get(j, []):
+                if inst["r"][i][j] <= (day, sh) <= inst["d"][i][j]:
+                    need[block_of(day, sh, block_days, block_shifts), i, j] += 1
+    for key, cnt in need.items():
+        if key in count:
+            m.addConstr(count[key] >= min(cnt, len(cells[key])))
+
+    # capacity: tasks confined to a set of cells fit in that set
+    by_block = defaultdict(dict)
+    for (b, i, j), kts in cells.items():
+        by_block[b][i, j] = frozenset(kts)
+    for b, sets in by_block.items():
+        for cover in set(sets.values()):
+            inside = [count[b, i, j] for (i, j), kts in sets.items() if kts <= cover]
+            if len(inside) > 1 or len(cover) < len(blocks[b]):
+                m.addConstr(gp.quicksum(inside) <= len(cover))
+
+    x = m.addVars(((i, j) for i in I for j in J[i]), lb=0, ub=1)
+    for i in I:
+        for j in J[i]:
+            keys = [key for key in cells if key[1:] == (i, j)]
+            m.addConstr(E[i][j] * x[i, j] <= done.get((i, j), 0)
+                        + gp.quicksum(effort[key] for key in keys))
+            m.addConstr(gp.quicksum(count[key] for key in keys)
+                        <= math.ceil(E[i][j] / SHIFTS_PER_HOUR))
+
+    # overtime per group of block_days days
+    hours = defaultdict(float)
+    for k in K:
+        hours[(k - 1) // block_days] += H_star[k]
+    per_group = defaultdict(list)
+    for (b, i, j), c in count.items():
+        per_group[b[0]].append(c)
+    z = {g: m.addVar(lb=0) for g in hours}
+    for g, cs in per_group.items():
+        m.addConstr(z[g] >= gp.quicksum(cs) - hours[g])
+
+    G = {}
+    for i in I:
+        G[i] = gp.quicksum(S[i][j] * x[i, j] for j in J[i])
+        m.addConstr(G[i] >= B[i])
+    m.setObjective(gp.quicksum(w[i] * G[i] for i in I) / sum(w.values()) * 4
+                   - beta * gp.quicksum(z.values()), GRB.MAXIMIZE)
+    return m, n, effort
+
+# ------------------------------------------------------------------ #
+# Fine problems (worker processes)                                   #
+# ------------------------------------------------------------------ #
+_ENV = None                  # per process: one silent started gp.Env
+
+def _env():
+    global _ENV
+    if _ENV is None:
+        _ENV = gp.Env(empty=True)
+        _ENV.setParam("OutputFlag", 0)
+        _ENV.start()
+    return _ENV
+
+def refine_block(job):
+    """
+    Assign exact cells inside one block.  `job` holds the block's tasks
+    [(i, j, count, target effort, value, {cell: P}, mandatory cells)],
+    the days it spans with their H* (only when it covers whole days),
+    β and the time limit.  Effort short of a task's coarse target costs
+    SHORTFALL per unit, so the coarse grade plan survives the
+    competition for the best cells.  Returns [(k, t, i, j), …].
+    """
+    tasks, hours, beta, time_limit = job
+    m = gp.Model("Block", env=_env())
+    m.Params.TimeLimit = time_limit
+    y, obj = {}, []
+    for i, j, count, target, value, P, fixed in tasks:
+        vs = []
+        for kt, p in P.items():
+            var = y[(*kt, i, j)] = m.addVar(vtype=GRB.BINARY,
+                                             lb=1 if kt in fixed else 0)
+            vs.append(var)
+            obj.append((value * p + 1e-6) * var)    # fill every count it can
+        m.addConstr(gp.quicksum(vs) <= count)
+        short = m.addVar(lb=0)
+        m.addConstr(gp.quicksum(p * y[(*kt, i, j)] for kt, p in P.items())
+                    + short >= target)
+        obj.append(-SHORTFALL * short)
+    per_cell = defaultdict(list)
+    for key, var in y.items():
+        per_cell[key[:2]].append(var)
+    for vs in per_cell.values():
+        if len(vs) > 1:
+            m.addConstr(gp.quicksum(vs) <= 1)
+    for k, h in (hours or {}).items():
+        z = m.addVar(lb=0)
+        m.addConstr(z >= gp.quicksum(var for key, var in y.items()
+                                     if key[0] == k) - h)
+        obj.append(-beta * z)
+    m.setObjective(gp.quicksum(obj), GRB.MAXIMIZE)
+    m.optimize()
+    if m.SolCount == 0:
+        return []
+    return [key for key, var in y.items() if var.X > 0.5]
+
+# ------------------------------------------------------------------ #
+# Driver                                                             #
+# ------------------------------------------------------------------ #
+def solve(inst, block_days=1, block_shifts=4, segments=2, time_limit=60,
+          refine_limit=10, workers=None, output_flag=0, timings=None, env=None):
+    """
+    Coarse solve, then per-block refinement in `workers` processes.
+    Returns evaluate()'s components plus schedule, coarse objective,
+    block count, status and timings.
+    """
+    timings = {} if timings is None else timings
+    T, P = inst["T"], inst["P"]
+    with phase(timings, "build"):
+        blocks = make_blocks(inst, block_days, block_shifts)
+        cells = task_cells(inst, blocks)
+        m, n, effort = coarse_model(inst, blocks, cells, block_days, block_shifts,
+                            segments, time_limit, output_flag, env)
+    with phase(timings, "solve"):
+        m.optimize()
+    if m.SolCount == 0:
+        return dict(status=m.Status, objective=None, schedule=[],
+                    timings=timings)
+
+    with phase(timings, "refine"):
+        W = sum(inst["w"].values())
+        slot = inst["slot"]
+        whole_days = block_shifts >= len(T)
+        jobs = defaultdict(list)
+        for (b, i, j), vs in n.items():
+            count = round(sum(var.X for var in vs))
+            if count == 0:
+                continue
+            fixed = {(day, sh) for day, sh in slot.get(i, {}).get(j, [])
+                     if block_of(day, sh, block_days, block_shifts) == b}
+            value = inst["w"][i] * inst["S"][i][j] / inst["E"][i][j] / W * 4
+            jobs[b].append((i, j, count, effort[b, i, j].getValue(), value,
+                            {kt: P[i][j].get(kt, 0.0) for kt in cells[b, i, j]},
+                            fixed))
+        payload = []
+        for b, tasks in jobs.items():
+            hours = ({k: inst["H_star"][k] for k in {kt[0] for kt in blocks[b]}}
+                     if whole_days else None)
+            payload.append((tasks, hours, inst["beta"], refine_limit))
+        if workers == 1:
+            parts = list(map(refine_block, payload))
+        else:
+            with ProcessPoolExecutor(workers) as pool:
+                parts = list(pool.map(refine_block, payload,
+                                      chunksize=max(1, len(payload) // 64)))
+
+    with phase(timings, "extract"):
+        schedule = sorted(key for part in parts for key in part)
+        res = evaluate(inst, schedule)
+    return dict(res, status=m.Status, coarse_objective=m.ObjVal,
+                coarse_gap=m.MIPGap, blocks=len(blocks),
+                coarse_vars=m.NumVars, schedule=schedule, timings=timings)
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Coarse-to-fine solve of the scheduling MIP")
+    p.add_argument("instance")
+    p.add_argument("--block_days", type=int, default=1,
+                   help="days per coarse block")
+    p.add_argument("--block_shifts", type=int, default=4,
+                   help="shifts per coarse block (≥ shifts per day: whole days)")
+    p.add_argument("--segments", type=int, default=2,
+                   help="productivity runs per task and block in the coarse model")
+    p.add_argument("--time_limit", type=int, default=60,
+                   help="seconds for the coarse model (and --compare)")
+    p.add_argument("--refine_limit", type=int, default=10,
+                   help="seconds per block problem")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    p.add_argument("--compare", action="store_true",
+                   help="also solve the full model and report the loss")
+    p.add_argument("--csv_path", default=None, help="write the schedule here")
+    add_profile_args(p)
+    args = p.parse_args(argv)
+
+    if not Path(args.instance).exists():
+        raise SystemExit(f"{args.instance} not found")
+    timings = make_timings(args, Path(args.instance).stem)
+    with phase(timings, "load"):
+        inst = parse_instance(load_instance(args.instance))
+
+    t0 = time.perf_counter()
+    res = solve(inst, args.block_days, args.block_shifts, args.segments,
+                args.time_limit, args.refine_limit, args.workers, timings=timings)
+    wall = time.perf_counter() - t0
+    if res["objective"] is None:
+        raise SystemExit(f"Coarse model finished with status {res['status']}")
+
+    print(f"Blocks {args.block_days} day(s) × {args.block_shifts} shift(s): "
+          f"{res['blocks']} blocks, {res['coarse_vars']} coarse variables")
+    print(f"Coarse objective {res['coarse_objective']:.4f}  "
+          f"(gap {res['coarse_gap']:.2%})")
+    print(f"Final objective  {res['objective']:.4f}  GPA {res['gpa_4']:.4f}  "
+          f"overtime {res['overtime']:g}  grades ok: {res['grades_ok']}")
+    print("Time: " + "  ".join(f"{k} {v:.2f}s" for k, v in timings.items())
+          + f"  total {wall:.2f}s")
+
+    if args.compare:
+        import run
+        full_timings = {}
+        t0 = time.perf_counter()
+        try:
+            full = run.solve(inst, args.time_limit, output_flag=0,
+                             timings=full_timings)
+        except gp.GurobiError as e:
+            full = dict(objective=None, status=f"error ({e})")
+        full_wall = time.perf_counter() - t0
+        if full["objective"] is None:
+            print(f"Full model finished with status {full['status']}")
+        else:
+            loss = full["objective"] - res["objective"]
+            print(f"Full objective   {full['objective']:.4f}  "
+                  f"(gap {full['gap']:.2%}, {full_wall:.2f}s)")
+            print(f"Loss             {loss:.4f}  "
+                  f"({loss / max(abs(full['objective']), 1e-9):.2%}), "
+                  f"speed-up ×{full_wall / max(wall, 1e-9):.1f}")
+
+    if args.csv_path:
+        with open(args.csv_path, "w") as f:
+            f.write("day,shift,course,task\n")
+            f.writelines(f"{k},{t},{i},{j}\n" for k, t, i, j in res["schedule"])
+        print(f"CSV written to {args.csv_path}")
+    if hasattr(timings, "report"):
+        timings.report()
+
+
+if __name__ == "__main__":
+    main()
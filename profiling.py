@@ -0,0 +1,172 @@
+"""
+profiling.py
+------------
+Shared --profile option for the solvers, the comparison script and the
+generators.
+
+    --profile sample   low overhead: a background thread samples the
+                       profiled thread's stack every --profile_interval
+                       seconds; reports top functions by cumulative and
+                       self samples plus the peak RSS at phase end
+    --profile detail   cProfile (top functions by cumulative time) and
+                       tracemalloc (peak Python heap, top allocation
+                       sites) for every phase
+
+Profiling is attached to the `timings` dict the scripts already pass
+around: make_timings() returns a PhaseProfiler (a dict) and
+common.phase() wraps each phase in PhaseProfiler.profile(name).  The
+same phase name entered twice accumulates into one report.  Reports go
+to <profile_dir>/<label>.<phase>.txt when report() is called.
+"""
+import io
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import resource                 # POSIX only
+except ImportError:
+    resource = None
+
+def add_profile_args(parser):
+    g = parser.add_argument_group("profiling")
+    g.add_argument("--profile", choices=["off", "sample", "detail"],
+                   default="off", help="per-phase profiling mode")
+    g.add_argument("--profile_dir", default="profiles",
+                   help="directory for the per-phase reports")
+    g.add_argument("--profile_top", type=int, default=25,
+                   help="rows per report table")
+    g.add_argument("--profile_interval", type=float, default=0.005,
+                   help="sampling interval of --profile sample (s)")
+
+def make_timings(args, label):
+    """Plain dict when profiling is off, a PhaseProfiler otherwise."""
+    if getattr(args, "profile", "off") == "off":
+        return {}
+    return PhaseProfiler(args.profile, label, args.profile_dir,
+                         args.profile_top, args.profile_interval)
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 2**20 if sys.platform == "darwin" else rss / 2**10
+
+class _Sampler(threading.Thread):
+    """Collects stack samples of one thread until stopped."""
+
+    def __init__(self, ident, interval):
+        super().__init__(daemon=True)
+        self.target, self.interval = ident, interval
+        self.stop_evt = threading.Event()
+        self.cum, self.own = Counter(), Counter()
+        self.n = 0
+
+    def run(self):
+        while not self.stop_evt.wait(self.interval):
+            frame = sys._current_frames().get(self.target)
+            if frame is None:
+                continue
+            self.n += 1
+            self.own[self._where(frame)] += 1
+            seen = set()
+            while frame is not None:
+                name = self._where(frame)
+                if name not in seen:
+                    seen.add(name)
+                    self.cum[name] += 1
+                frame = frame.f_back
+
+    @staticmethod
+    def _where(frame):
+        code = frame.f_code
+        return f"{Path(code.co_filename).name}:{code.co_firstlineno}({code.co_name})"
+
+class PhaseProfiler(dict):
+    """A timings dict that also profiles every common.phase() block."""
+
+    def __init__(self, mode, label, out_dir="profiles", top=25, interval=0.005):
+        super().__init__()
+        self.mode, self.label, self.top = mode, label, top
+        self.out_dir, self.interval = Path(out_dir), interval
+        self.stats = {}                          # phase → collected data
+
+    @contextmanager
+    def profile(self, name):
+        import cProfile, tracemalloc               # only when profiling is on
+        st = self.stats.setdefault(name, dict(calls=0))
+        st["calls"] += 1
+        if self.mode == "detail":
+            prof = st.setdefault("cprofile", cProfile.Profile())
+            started = not tracemalloc.is_tracing()
+            if started:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            prof.enable()
+            try:
+                yield
+            finally:
+                prof.disable()
+                _, peak = tracemalloc.get_traced_memory()
+                st["peak_mb"] = max(st.get("peak_mb", 0.0), peak / 2**20)
+                st["snapshot"] = tracemalloc.take_snapshot()
+                if started:
+                    tracemalloc.stop()
+        else:
+            sampler = _Sampler(threading.get_ident(), self.interval)
+            sampler.start()
+            try:
+                yield
+            finally:
+                sampler.stop_evt.set()
+                sampler.join()
+                st.setdefault("cum", Counter()).update(sampler.cum)
+                st.setdefault("own", Counter()).update(sampler.own)
+                st["samples"] = st.get("samples", 0) + sampler.n
+                st["rss_mb"] = _peak_rss_mb()
+
+    def report(self):
+        """Write one text report per phase; returns the written paths."""
+        import pstats
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        paths = []
+        for name, st in self.stats.items():
+            out = io.StringIO()
+            out.write(f"{self.label} · phase {name} · mode {self.mode}\n")
+            out.write(f"wall time : {self.get(name, 0.0):.4f} s "
+                      f"over {st['calls']} call(s)\n")
+            if self.mode == "detail":
+                out.write(f"peak heap : {st['peak_mb']:.2f} MiB (tracemalloc)\n\n")
+                out.write("Top functions by cumulative time\n")
+                pstats.Stats(st["cprofile"], stream=out) \
+                      .sort_stats("cumulative").print_stats(self.top)
+                out.write("Top allocation sites (live at phase end)\n")
+                for s in st["snapshot"].statistics("lineno")[:self.top]:
+                    out.write(f"  {s.size / 2**10:10.1f} KiB  {s.count:8d}  "
+                              f"{s.traceback}\n")
+            else:
+                n = max(st["samples"], 1)
+                rss = st["rss_mb"]
+                out.write(f"samples   : {st['samples']} "
+                          f"every {self.interval * 1000:.1f} ms\n")
+                out.write("peak RSS  : "
+                          + ("n/a" if rss is None else f"{rss:.1f} MiB") + "\n\n")
+                for title, counter in (("cumulative", st["cum"]),
+                                       ("self", st["own"])):
+                    out.write(f"Top functions by {title} samples\n")
+                    for fn, c in counter.most_common(self.top):
+                        out.write(f"  {100 * c / n:6.1f}%  {c:7d}  {fn}\n")
+                    out.write("\n")
+
+            path = self.out_dir / f"{self.label}.{name}.txt"
+            path.write_text(out.getvalue())
+            paths.append(path)
+        print(f"Profile reports written to {self.out_dir}/ "
+              f"({', '.join(self.stats)})", file=sys.stderr)
+        return paths
+
+    # a profiled dict must still look like a plain timings dict
+    def __reduce__(self):
+        return (dict, (dict(self),))
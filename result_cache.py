@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+result_cache.py
+---------------
+Persistent cache of solver results.  An entry is keyed by
+
+    sha256(instance content, method, parameters, code version)
+
+The instance part hashes the parsed instance (so `done` and `prices`
+count), the code version hashes the source of the solver module and
+every module of this repository it imports.  Editing a solver
+therefore makes its old entries unreachable; `prune` deletes them.
+
+One entry is one JSON file <dir>/<key[:2]>/<key>.json with the
+schedule, the objective components, the timings of the original
+solve and the key parts.  Files are written under a temporary name
+and renamed, so campaign workers can share a cache directory.  A hit
+touches the file, and `evict` drops the least recently used entries
+until the cache is below a size limit.
+
+The benchmark tools and the solver CLIs (run.py, heuristic.py,
+lazy_greedy.py) take --cache; their keys match, so a result solved by
+one is reused by the others.  Only the plain solve is cached (not
+run.py's re-plan, Pareto or pool modes).
+
+    python result_cache.py stats --cache .solver_cache
+    python result_cache.py prune --cache .solver_cache
+    python result_cache.py evict --cache .solver_cache --max_mb 500
+    python result_cache.py clear --cache .solver_cache --method optimal \\
+        --instance instances/x.json
+"""
+import argparse
+import ast
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import time
+from pathlib import Path
+
+from common import load_instance, parse_instance
+
+DEFAULT_DIR = ".solver_cache"
+ROOT = Path(__file__).resolve().parent
+
+# ------------------------------------------------------------------ #
+# Key parts                                                          #
+# ------------------------------------------------------------------ #
+_CODE = {}                      # module name → code version (per process)
+
+def _local_imports(path):
+    """Modules of this repository imported anywhere in `path`."""
+    names = set()
+    for node in ast.walk(ast.parse(path.read_text())):
+        if isinstance(node, ast.Import):
+            names.update(a.name.split(".")[0] for a in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module.split(".")[0])
+    return {n for n in names if (ROOT / f"{n}.py").is_file()}
+
+def code_version(module):
+    """Hash of `module`.py and the repository modules it reaches."""
+    if module not in _CODE:
+        seen, todo = set(), [module]
+        while todo:
+            name = todo.pop()
+            if name not in seen:
+                seen.add(name)
+                todo += _local_imports(ROOT / f"{name}.py") - seen
+        h = hashlib.sha256()
+        for name in sorted(seen):
+            h.update(name.encode() + b"\0" + (ROOT / f"{name}.py").read_bytes())
+        _CODE[module] = h.hexdigest()[:16]
+    return _CODE[module]
+
+def instance_hash(inst):
+    """Content hash of a parsed instance."""
+    return hashlib.sha256(pickle.dumps(inst, protocol=4)).hexdigest()
+
+def _json_default(o):
+    return sorted(o) if isinstance(o, (set, frozenset)) else str(o)
+
+# ------------------------------------------------------------------ #
+# Cache                                                              #
+# ------------------------------------------------------------------ #
+class ResultCache:
+    """Directory of JSON result files with LRU eviction by size."""
+
+    def __init__(self, root=DEFAULT_DIR, max_bytes=None):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = self.misses = 0
+
+    def key(self, inst, method, module, params):
+        """(key, parts) for one solve; `params` must be JSON-able."""
+        parts = dict(instance=instance_hash(inst), method=method,
+                     params={k: v for k, v in sorted(params.items())},
+                     code=code_version(module))
+        blob = json.dumps(parts, sort_keys=True).encode()
+        return hashlib.sha256(blob).hexdigest(), parts
+
+    def path(self, key):
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key):
+        """Cached result dict (marked cached=True) or None."""
+        path = self.path(key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)                             # LRU: last use
+        except FileNotFoundError:
+            pass                                       # evicted meanwhile
+        self.hits += 1
+        res = entry["result"]
+        res["schedule"] = [tuple(x) for x in res.get("schedule", [])]
+        if "mandatory" in res:
+            res["mandatory"] = {tuple(x) for x in res["mandatory"]}
+        return dict(res, cached=True)
+
+    def put(self, key, parts, res, instance=None):
+        """Store `res`; `instance` (a file name) is kept for `clear`."""
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = dict(parts, name=instance, created=time.time(),
+                     result={k: v for k, v in res.items() if k != "cached"})
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(entry, f, default=_json_default)
+        os.replace(tmp, path)
+        if self.max_bytes is not None:
+            self.evict(self.max_bytes)
+
+    def solve(self, method, module, inst, params, run, instance=None):
+        """run() on a miss (and store it), the cached result on a hit."""
+        key, parts = self.key(inst, method, module, params)
+        res = self.get(key)
+        if res is None:
+            res = run()
+            self.put(key, parts, res, instance)
+        return res
+
+    # -- maintenance ---------------------------------------------------
+    def files(self):
+        return sorted(self.root.glob("??/*.json"))
+
+    def entries(self):
+        """(path, entry without the result) for every readable entry."""
+        for path in self.files():
+            try:
+                with open(path) as f:
+                    entry = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                continue
+            entry.pop("result", None)
+            yield path, entry
+
+    def evict(self, max_bytes):
+        """Delete least recently used entries until ≤ max_bytes; returns the count."""
+        stats = []
+        for path in self.files():
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue                               # removed by another worker
+            stats.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in stats)
+        removed = 0
+        for _, size, path in sorted(stats):
+            if total <= max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
+
+    def remove(self, keep):
+        """Delete every entry for which keep(entry) is false; returns the count."""
+        removed = 0
+        for path, entry in self.entries():
+            if not keep(entry):
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    def prune(self):
+        """Delete entries written by an older version of their solver."""
+        from bench_harness import SOLVERS
+        return self.remove(lambda e: e["method"] not in SOLVERS
+                           or e["code"] == code_version(SOLVERS[e["method"]]))
+
+    def clear(self, method=None, instance=None):
+        """Delete the entries of one method and/or instance (all by default)."""
+        ih = instance_hash(parse_instance(load_instance(instance))) if instance else None
+        return self.remove(lambda e: (method is not None and e["method"] != method)
+                           or (ih is not None and e["instance"] != ih))
+
+    def stats(self):
+        sizes = [p.stat().st_size for p in self.files()]
+        return dict(entries=len(sizes), bytes=sum(sizes),
+                    hits=self.hits, misses=self.misses)
+
+def add_cache_args(p):
+    """--cache / --cache_mb, shared by the benchmark tools."""
+    p.add_argument("--cache", nargs="?", const=DEFAULT_DIR, default=None,
+                   metavar="DIR",
+                   help=f"reuse solver results from DIR (default {DEFAULT_DIR})")
+    p.add_argument("--cache_mb", type=float, default=None,
+                   help="evict least recently used results beyond this size")
+
+def make_cache(args):
+    """ResultCache from add_cache_args() options, or None."""
+    if not args.cache:
+        return None
+    max_bytes = None if args.cache_mb is None else int(args.cache_mb * 2**20)
+    return ResultCache(args.cache, max_bytes)
+
+def cached_solve(args, method, module, inst, params, run, instance=None):
+    """run() through the add_cache_args() cache of a solver CLI, if any."""
+    cache = make_cache(args)
+    if cache is None:
+        return run()
+    return cache.solve(method, module, inst, params, run, instance)
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Inspect and maintain the solver result cache")
+    p.add_argument("op", choices=["stats", "list", "prune", "evict", "clear"])
+    p.add_argument("--cache", default=DEFAULT_DIR)
+    p.add_argument("--max_mb", type=float, default=None, help="evict: size limit")
+    p.add_argument("--method", default=None, help="clear: only this method")
+    p.add_argument("--instance", default=None, help="clear: only this instance file")
+    args = p.parse_args(argv)
+
+    cache = ResultCache(args.cache)
+    if args.op == "stats":
+        s = cache.stats()
+        print(f"{s['entries']} entries, {s['bytes'] / 2**20:.2f} MB in {cache.root}/")
+    elif args.op == "list":
+        for path, e in cache.entries():
+            print(f"{path.stem[:12]}  {e['method']:10s} {e.get('name') or e['instance'][:12]:50s} "
+                  f"{json.dumps(e['params'])}")
+    elif args.op == "prune":
+        print(f"{cache.prune()} stale entries removed")
+    elif args.op == "evict":
+        if args.max_mb is None:
+            raise SystemExit("evict needs --max_mb")
+        print(f"{cache.evict(int(args.max_mb * 2**20))} entries evicted")
+    else:
+        print(f"{cache.clear(args.method, args.instance)} entries removed")
+
+
+if __name__ == "__main__":
+    main()
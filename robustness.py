@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+robustness.py
+-------------
+Monte Carlo robustness of fixed schedules.  The productivities P of an
+instance are point estimates (SHIFT_GAMMA and the exam decay in
+assemble_instance_all.py, the circadian curve in assemble_timmy.py);
+here every scenario scales them by a mean-one lognormal factor
+
+    P~[k,t,i,j] = P[k,t,i,j] · exp(σg·Zg + σs·Zs[t] + σd·Zd[k]
+                                   + στ·Zτ[i,j] + σc·Zc[k,t] − σ²/2)
+
+(global, shift-of-day, day, task and cell level), and each worked shift
+is missed with probability --p_miss.  Scenarios are drawn in float32 NumPy
+batches over (k, t) and task indices, so every schedule is evaluated
+on the same scenarios (common random numbers) and the ranking is not
+noise.
+
+Reported per schedule: the objective and GPA-term distribution (mean,
+std, 5/50/95 % quantiles, CVaR of the worst 5 %), the probability of
+each course missing its B minimum and the expected overtime.
+
+    python robustness.py instance.json out/*.csv --scenarios 20000
+    python robustness.py instance.json --solve lazy simple heuristic \\
+        --rank cvar05 --json robust.json
+"""
+import argparse
+import glob
+import itertools
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+from common import evaluate, load_instance, parse_instance, read_schedule
+
+SIGMAS = dict(sigma_global=0.10, sigma_shift=0.10, sigma_day=0.15,
+              sigma_task=0.10, sigma_cell=0.20)
+RANK_KEYS = ["mean", "q05", "cvar05", "p_any_miss"]
+
+# ------------------------------------------------------------------ #
+# Schedule → arrays                                                  #
+# ------------------------------------------------------------------ #
+class Instance:
+    """Index maps and parameter vectors of one parsed instance."""
+
+    def __init__(self, inst):
+        self.inst = inst
+        I, J = inst["I"], inst["J"]
+        self.tasks = [(i, j) for i in I for j in J[i]]
+        self.task_ix = {ij: n for n, ij in enumerate(self.tasks)}
+        self.day_ix = {k: n for n, k in enumerate(inst["K"])}
+        self.shift_ix = {t: n for n, t in enumerate(inst["T"])}
+        self.E = np.array([inst["E"][i][j] for i, j in self.tasks], dtype=float)
+        self.done = np.array([inst.get("done", {}).get(ij, 0.0) for ij in self.tasks])
+        # S as a task × course matrix, so G = x @ S
+        self.S = np.zeros((len(self.tasks), len(I)))
+        for n, (i, j) in enumerate(self.tasks):
+            self.S[n, I.index(i)] = inst["S"][i][j]
+        self.w = np.array([inst["w"][i] for i in I], dtype=float)
+        self.B = np.array([inst["B"][i] for i in I], dtype=float)
+        self.H = np.array([inst["H_star"][k] for k in inst["K"]], dtype=float)
+
+    def arrays(self, schedule, cols):
+        """
+        Per assignment: nominal P, task, day and (k, t) column (index
+        into `cols`, the (k, t) list shared by all schedules).
+        """
+        P = self.inst["P"]
+        n = len(schedule)
+        out = dict(p0=np.empty(n, np.float32), task=np.empty(n, int),
+                   day=np.empty(n, int), col=np.empty(n, int))
+        for m, (k, t, i, j) in enumerate(schedule):
+            if (i, j) not in self.task_ix or k not in self.day_ix:
+                raise ValueError(f"({k}, {t}, {i}, {j}) is not in the instance")
+            out["p0"][m] = P[i][j].get((k, t), 0.0)
+            out["task"][m] = self.task_ix[i, j]
+            out["day"][m] = self.day_ix[k]
+            out["col"][m] = cols[k, t]
+        # one-hot assignment → task / day, so sums are matrix products
+        out["to_task"] = np.zeros((n, len(self.tasks)), np.float32)
+        out["to_task"][np.arange(n), out["task"]] = 1.0
+        out["to_day"] = np.zeros((n, len(self.H)), np.float32)
+        out["to_day"][np.arange(n), out["day"]] = 1.0
+        return out
+
+# ------------------------------------------------------------------ #
+# Scenarios                                                          #
+# ------------------------------------------------------------------ #
+def draw(rng, size, model, cols, sig, p_miss):
+    """
+    One batch of scenarios, shared by all schedules: the log factor of
+    every (k, t) column in `cols` (global + shift-of-day + day + cell
+    level, already combined), the task-level log factor and which
+    columns are worked.
+    """
+    normal = lambda *shape: rng.standard_normal((size, *shape), dtype=np.float32)
+    k_ix = np.array([model.day_ix[k] for k, _ in cols], dtype=int)
+    t_ix = np.array([model.shift_ix[t] for _, t in cols], dtype=int)
+    col = normal(len(cols)) * np.float32(sig["sigma_cell"])
+    col += normal(len(model.day_ix))[:, k_ix] * np.float32(sig["sigma_day"])
+    col += normal(len(model.shift_ix))[:, t_ix] * np.float32(sig["sigma_shift"])
+    col += normal(1) * np.float32(sig["sigma_global"])
+    col -= np.float32(sum(s * s for s in sig.values()) / 2)
+    return dict(
+        col  = col,
+        task = normal(len(model.tasks)) * np.float32(sig["sigma_task"]),
+        keep = (rng.random((size, len(cols)), dtype=np.float32) >= p_miss
+                if p_miss > 0 else None),
+    )
+
+def simulate(model, arr, z):
+    """(objective, gpa_4, overtime, G) for one batch, all shape (batch, …)."""
+    inst = model.inst
+    log_f = z["col"][:, arr["col"]]
+    log_f += z["task"][:, arr["task"]]
+    eff = np.exp(log_f, out=log_f)
+    eff *= arr["p0"]                                     # (batch, n)
+    worked = None
+    if z["keep"] is not None:
+        worked = z["keep"][:, arr["col"]].astype(np.float32)
+        eff *= worked
+
+    a = eff @ arr["to_task"] + model.done                # effort per task
+    G = np.minimum(a / model.E, 1.0) @ model.S
+    gpa_4 = G @ model.w / model.w.sum() * 4
+
+    if worked is None:
+        per_day = arr["to_day"].sum(axis=0)[None, :]
+    else:
+        per_day = worked @ arr["to_day"]
+    overtime = np.maximum(per_day - model.H, 0).sum(axis=1)
+    return gpa_4 - inst["beta"] * overtime, gpa_4, overtime, G
+
+def robustness(inst, schedules, scenarios=10000, batch=1000, seed=0,
+               p_miss=0.05, **sigmas):
+    """
+    Evaluate {name: schedule} on the same `scenarios` draws.
+    Returns ({name: summary dict}, seconds spent simulating).
+    """
+    sig = dict(SIGMAS, **sigmas)
+    model = Instance(inst)
+    col_list = sorted({(k, t) for sched in schedules.values() for k, t, _, _ in sched})
+    cols = {kt: n for n, kt in enumerate(col_list)}
+    arrays = {}
+    for name, sched in schedules.items():
+        try:
+            arrays[name] = model.arrays(sched, cols)
+        except ValueError as e:
+            raise ValueError(f"schedule {name}: {e}") from None
+
+    rng = np.random.default_rng(seed)
+    acc = {name: dict(obj=[], gpa=[], ot=[], miss=0, any_miss=0)
+           for name in schedules}
+    t0 = time.perf_counter()
+    for start in range(0, scenarios, batch):
+        z = draw(rng, min(batch, scenarios - start), model, col_list, sig, p_miss)
+        for name, arr in arrays.items():
+            obj, gpa, ot, G = simulate(model, arr, z)
+            miss = G + 1e-9 < model.B
+            a = acc[name]
+            a["obj"].append(obj)
+            a["gpa"].append(gpa)
+            a["ot"].append(ot)
+            a["miss"] = a["miss"] + miss.sum(axis=0)
+            a["any_miss"] += int(miss.any(axis=1).sum())
+    seconds = time.perf_counter() - t0
+
+    out = {}
+    for name, a in acc.items():
+        obj, gpa, ot = (np.concatenate(a[x]) for x in ("obj", "gpa", "ot"))
+        worst = np.sort(obj)[:max(1, len(obj) // 20)]
+        q05, q50, q95 = np.quantile(obj, [0.05, 0.5, 0.95])
+        out[name] = dict(
+            nominal    = evaluate(inst, schedules[name])["objective"],
+            mean       = float(obj.mean()),
+            std        = float(obj.std()),
+            q05        = float(q05),
+            q50        = float(q50),
+            q95        = float(q95),
+            cvar05     = float(worst.mean()),
+            gpa_mean   = float(gpa.mean()),
+            gpa_q05    = float(np.quantile(gpa, 0.05)),
+            overtime   = float(ot.mean()),
+            p_miss     = {i: float(m) / scenarios
+                          for i, m in zip(inst["I"], np.atleast_1d(a["miss"]))},
+            p_any_miss = a["any_miss"] / scenarios,
+        )
+    return out, seconds
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Monte Carlo robustness of schedules under perturbed P")
+    p.add_argument("instance")
+    p.add_argument("schedules", nargs="*", help="schedule CSVs or glob patterns")
+    p.add_argument("--solve", nargs="+", default=[],
+                   choices=["optimal", "heuristic", "simple", "lazy"],
+                   help="also solve the instance with these methods")
+    p.add_argument("--time_limit", type=int, default=60)
+    p.add_argument("--scenarios", type=int, default=10000)
+    p.add_argument("--batch", type=int, default=1000)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--p_miss", type=float, default=0.05,
+                   help="probability that a planned shift is not worked")
+    for name, default in SIGMAS.items():
+        p.add_argument(f"--{name}", type=float, default=default)
+    p.add_argument("--rank", choices=RANK_KEYS, default="mean")
+    p.add_argument("--json", default=None, help="write the summaries here")
+    args = p.parse_args(argv)
+
+    inst = parse_instance(load_instance(args.instance))
+    schedules = {}
+    for path in sorted(itertools.chain.from_iterable(
+            glob.glob(pat) or [pat] for pat in args.schedules)):
+        name = Path(path).stem
+        schedules[path if name in schedules else name] = read_schedule(path)
+    if args.solve:
+        from bench_harness import run_method
+        for method in args.solve:
+            try:
+                res = run_method(method, inst, args.seed, args.time_limit)
+            except Exception as e:
+                print(f"✗ {method}: {type(e).__name__}: {e}")
+                continue
+            if res.get("schedule"):
+                schedules[f"solve:{method}"] = [tuple(x) for x in res["schedule"]]
+    if not schedules:
+        raise SystemExit("no schedules given (CSV files or --solve)")
+
+    sigmas = {name: getattr(args, name) for name in SIGMAS}
+    try:
+        res, seconds = robustness(inst, schedules, args.scenarios, args.batch,
+                                  args.seed, args.p_miss, **sigmas)
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+    order = sorted(res, key=lambda n: res[n][args.rank],
+                   reverse=args.rank != "p_any_miss")
+    width = max(8, *map(len, order))
+    print(f"{args.scenarios} scenarios × {len(res)} schedules in {seconds:.3f} s\n")
+    print(f"{'schedule':{width}s} {'nominal':>8s} {'mean':>8s} {'std':>7s} "
+          f"{'q05':>8s} {'cvar05':>8s} {'E[ot]':>6s} {'P(miss)':>8s}")
+    for name in order:
+        r = res[name]
+        print(f"{name:{width}s} {r['nominal']:8.4f} {r['mean']:8.4f} {r['std']:7.4f} "
+              f"{r['q05']:8.4f} {r['cvar05']:8.4f} {r['overtime']:6.2f} "
+              f"{r['p_any_miss']:8.3f}")
+    print("\nP(course below B):")
+    for name in order:
+        print(f"  {name:{width}s} " + "  ".join(
+            f"{i} {pm:.3f}" for i, pm in res[name]["p_miss"].items()))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(dict(instance=args.instance, scenarios=args.scenarios,
+                           seed=args.seed, p_miss=args.p_miss, **sigmas,
+                           rank=args.rank, order=order, results=res), f, indent=2)
+        print(f"\nSummaries written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
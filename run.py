@@ -2,26 +2,22 @@
 # run.py  – solve one JSON instance and pretty-print the timetable
 # ---------------------------------------------------------------------
 import time
-import json, argparse, csv, textwrap
+import argparse, csv, textwrap
 import gurobipy as gp
 from gurobipy import GRB
 from collections import defaultdict
 from pathlib import Path
 import math
 
+from common import evaluate, load_instance, parse_instance, phase, read_schedule
+from profiling import add_profile_args, make_timings
+from result_cache import add_cache_args, cached_solve
+
 SHIFTS_PER_HOUR = 1
 
 # ------------------------------------------------------------------ #
 # Helpers                                                            #
 # ------------------------------------------------------------------ #
-def load_instance(path):
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-def to_pair(x, default_shift):
-    """Return (day, shift) for either bare int or [d,s] list."""
-    return (x, default_shift) if isinstance(x, int) else tuple(x)
-
 # ── timetable rendering ──────────────────────────────────────────── #
 def _grid(schedule, shifts, mand):
     """
@@ -53,60 +49,22 @@ def _to_csv(schedule, path="schedule.csv"):
     print(f"CSV written to {path!s}")
 
 # ------------------------------------------------------------------ #
-# Main                                                               #
+# Model                                                              #
 # ------------------------------------------------------------------ #
-def main():
-    import time                                   # local import keeps diff tiny
-    t_total_start = time.perf_counter()           # ── overall timer ─────────
-
-    p = argparse.ArgumentParser(
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        description=textwrap.dedent("""
-        Solve a single scheduling instance.
-
-        --pretty list   (default)  plain list of (day,shift,course,task)
-        --pretty grid               ASCII calendar (mandatory seats in lower-case)
-        --pretty csv                write schedule.csv
-        """)
-    )
-    p.add_argument("instance", help="Path to JSON instance file")
-    p.add_argument("--time_limit", type=int, default=300)
-    p.add_argument("--pretty", choices=["grid", "csv", "list"],
-                   default="list")
-    p.add_argument("--csv_path", default="schedule.csv")
-    args = p.parse_args()
-
-    if not Path(args.instance).exists():
-        raise SystemExit(f"{args.instance} not found")
-
-    data = load_instance(args.instance)
-
-    # ----------------- unpack sets ------------------------------------------
-    K = list(map(int, data["K"]));           DAYS = max(K)
-    T = list(map(int, data["T"]));           SHIFTS = max(T)
-    I = data["I"];                           J = {i: data["J"][i] for i in I}
-
-    # ----------------- parameters -------------------------------------------
-    S = data["S"];   E = data["E"];   w = data["w"];   B = data["B"]
-    H_star = {int(k): v for k, v in data["H*"].items()}
-    beta   = data["beta"]
-    slot   = data.get("slot", {})
-
-    r = {i: {j: to_pair(data["r"][i][j], 1)        for j in J[i]} for i in I}
-    d = {i: {j: to_pair(data["d"][i][j], SHIFTS)   for j in J[i]} for i in I}
-
-    # sparse productivity ----------------------------------------------------
-    P = {}
-    for i in I:
-        P[i] = {}
-        for j in J[i]:
-            P[i][j] = {tuple(map(int, k.strip("()").split(","))): v
-                       for k, v in data["P"][i][j].items()}
-
-    # ----------------- build model ------------------------------------------
-    m = gp.Model("StudentScheduler")
-    m.Params.TimeLimit  = args.time_limit
-    m.Params.OutputFlag = 1
+def build_model(inst, time_limit=300, output_flag=1, env=None):
+    """Compact MIP; returns (model, dict of variable groups)."""
+    K, T, I, J = inst["K"], inst["T"], inst["I"], inst["J"]
+    S, E, w, B = inst["S"], inst["E"], inst["w"], inst["B"]
+    H_star, beta, slot = inst["H_star"], inst["beta"], inst["slot"]
+    r, d, P = inst["r"], inst["d"], inst["P"]
+    done = inst.get("done", {})                  # effort already completed
+    used = inst.get("used", {})                  # slots already spent (re-planning)
+    prices = inst.get("prices", {})              # (k, t) → price per seat
+    blocked = inst.get("blocked", set())         # (k, t) closed to this student
+
+    m = gp.Model("StudentScheduler", env=env)
+    m.Params.OutputFlag = output_flag
+    m.Params.TimeLimit  = time_limit
 
     # y_{k,t,i,j} ------------------------------------------------------------
     y = {}
@@ -132,10 +90,15 @@ def main():
                     m.addConstr(y[day, sh, i, j] == 1)
                     mandatory.add((day, sh, i, j))   # remember for grid
 
+    # blocked shifts (cohort repair): no study outside mandatory seats
+    for (k, t, i, j), var in y.items():
+        if (k, t) in blocked and (k, t, i, j) not in mandatory:
+            var.UB = 0
+
     # constraints ------------------------------------------------------------
     for i in I:
         for j in J[i]:
-            m.addConstr(a[i, j] == gp.quicksum(
+            m.addConstr(a[i, j] == done.get((i, j), 0) + gp.quicksum(
                 P[i][j].get((k, t), 0) * y.get((k, t, i, j), 0)
                 for k in K for t in T))
             m.addConstr(E[i][j] * x[i, j] <= a[i, j])
@@ -149,7 +112,8 @@ def main():
     # upper bound on slots per task
     for i in I:
         for j in J[i]:
-            max_slots = math.ceil(E[i][j] / SHIFTS_PER_HOUR)
+            max_slots = max(0, math.ceil(E[i][j] / SHIFTS_PER_HOUR)
+                            - used.get((i, j), 0))
             m.addConstr(
                 gp.quicksum(y.get((k, t, i, j), 0) for k in K for t in T)
                 <= max_slots
@@ -170,25 +134,496 @@ def main():
 
     # objective --------------------------------------------------------------
     m.setObjective(((gp.quicksum(w[i] * G[i] for i in I) / sum(w.values())) * 4)
-                   - beta * gp.quicksum(z[k] for k in K),
+                   - beta * gp.quicksum(z[k] for k in K)
+                   - gp.quicksum(prices[k, t] * var
+                                 for (k, t, i, j), var in y.items()
+                                 if (k, t) in prices
+                                 and (k, t, i, j) not in mandatory),
                    GRB.MAXIMIZE)
 
-    # ----------------- solve (timed) ----------------------------------------
-    t_solve_start = time.perf_counter()
-    m.optimize()
-    solve_sec = time.perf_counter() - t_solve_start
+    return m, dict(y=y, a=a, x=x, z=z, G=G, mandatory=mandatory)
 
-    if m.Status not in (GRB.OPTIMAL, GRB.TIME_LIMIT):
-        print(f"Model finished with status {m.Status}")
-        return
+def extract(inst, m, v):
+    """Read schedule and objective components off a solved model."""
+    I, K, w, beta = inst["I"], inst["K"], inst["w"], inst["beta"]
+    if m.Status not in (GRB.OPTIMAL, GRB.TIME_LIMIT) or m.SolCount == 0:
+        return dict(status=m.Status, objective=None, schedule=[],
+                    mandatory=v["mandatory"])
 
-    # ----------------- results ----------------------------------------------
     schedule = sorted((k, t, i, j)
-                      for (k, t, i, j), var in y.items() if var.X > 0.5)
+                      for (k, t, i, j), var in v["y"].items() if var.X > 0.5)
+    gpa_part = sum(w[i] * v["G"][i].X for i in I)
+    ot_hours = sum(v["z"][k].X for k in K)
+    return dict(
+        status    = m.Status,
+        objective = m.ObjVal,
+        bound     = m.ObjBound,
+        gap       = m.MIPGap,
+        gpa_part  = gpa_part,
+        gpa_4     = gpa_part / sum(w.values()) * 4,
+        overtime  = ot_hours,
+        penalty   = beta * ot_hours,
+        schedule  = schedule,
+        mandatory = v["mandatory"],
+    )
 
-    gpa_part   = sum(w[i] * G[i].X for i in I)
-    ot_hours   = sum(z[k].X for k in K)
-    penalty    = beta * ot_hours
+def solve(inst, time_limit=300, output_flag=1, timings=None, env=None,
+          callback=None):
+    """
+    Build, solve and extract one parsed instance.  Phase wall-clock
+    times (build / solve / extract) are accumulated into `timings`
+    and returned with the result.  `env` is an optional started
+    gp.Env, `callback` a Gurobi callback passed to optimize().
+    """
+    timings = {} if timings is None else timings
+    with phase(timings, "build"):
+        m, v = build_model(inst, time_limit, output_flag, env)
+    with phase(timings, "solve"):
+        m.optimize(callback)
+    with phase(timings, "extract"):
+        res = extract(inst, m, v)
+    res["timings"] = timings
+    return res
+
+# ------------------------------------------------------------------ #
+# Re-planning                                                        #
+# ------------------------------------------------------------------ #
+def read_done(path):
+    """CSV course,task,effort → {(course, task): effort}."""
+    done = defaultdict(float)
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            done[row["course"], row["task"]] += float(row["effort"])
+    return dict(done)
+
+def planned_effort(inst, schedule, today):
+    """Effort of the schedule before `today`, assuming it was followed."""
+    done = defaultdict(float)
+    for k, t, i, j in schedule:
+        if k < today:
+            done[i, j] += inst["P"][i][j].get((k, t), 0.0)
+    return dict(done)
+
+def planned_slots(schedule, today):
+    """Slots per task the schedule spends before `today`."""
+    used = defaultdict(int)
+    for k, t, i, j in schedule:
+        if k < today:
+            used[i, j] += 1
+    return dict(used)
+
+def restrict_horizon(inst, today, done, used=None):
+    """
+    Copy of `inst` limited to days ≥ today with `done` effort carried
+    in and `used` slots taken off each task's slot cap.
+    """
+    first = (today, min(inst["T"]))
+    sub = dict(inst)
+    sub["K"] = [k for k in inst["K"] if k >= today]
+    sub["H_star"] = {k: h for k, h in inst["H_star"].items() if k >= today}
+    sub["r"] = {i: {j: max(r, first) for j, r in rj.items()}
+                for i, rj in inst["r"].items()}
+    sub["P"] = {i: {j: {kt: v for kt, v in pj.items() if kt[0] >= today}
+                    for j, pj in pi.items()}
+                for i, pi in inst["P"].items()}
+    sub["done"] = done
+    sub["used"] = used or {}
+    return sub
+
+REPLAN_TIME_LIMIT = 10      # seconds; re-planning runs nightly
+
+def replan(inst, prev, today, done=None, near_days=3, stability=0.05,
+           time_limit=REPLAN_TIME_LIMIT, output_flag=0, timings=None, env=None):
+    """
+    Re-optimise days ≥ today around a previous schedule.
+
+    Days before `today` are fixed to `prev`; `done` ({(i,j): effort},
+    default: the past part of `prev` as planned) enters every task's a,
+    and the slots `prev` spends before `today` count against each
+    task's slot cap.
+    The remaining part of `prev` is the MIP start, and each change on
+    days today … today+near_days-1 costs `stability` utility.
+    """
+    timings = {} if timings is None else timings
+    if done is None:
+        done = planned_effort(inst, prev, today)
+    near = range(today, today + near_days)
+    with phase(timings, "build"):
+        sub = restrict_horizon(inst, today, done, planned_slots(prev, today))
+        m, v = build_model(sub, time_limit, output_flag, env)
+        y = v["y"]
+        kept = {key for key in prev if key[0] >= today and key in y}
+        for key in kept:
+            y[key].Start = 1                      # partial start, Gurobi completes
+        changes = (gp.quicksum(1 - y[key] for key in kept if key[0] in near)
+                   + gp.quicksum(var for key, var in y.items()
+                                 if key[0] in near and key not in kept))
+        m.update()                                # apply build_model's objective
+        m.setObjective(m.getObjective() - stability * changes, GRB.MAXIMIZE)
+    with phase(timings, "solve"):
+        m.optimize()
+    with phase(timings, "extract"):
+        res = extract(sub, m, v)
+        if res["objective"] is not None:
+            n_changes = changes.getValue()
+            res["objective"] += stability * n_changes      # plan utility only
+            res["changes"] = round(n_changes)
+            res["schedule"] = sorted([key for key in prev if key[0] < today]
+                                     + res["schedule"])
+    res["timings"] = timings
+    return res
+
+# ------------------------------------------------------------------ #
+# GPA / overtime trade-off                                           #
+# ------------------------------------------------------------------ #
+PARETO_TINY = 1e-4          # overtime weight that only breaks ties
+PARETO_BIG = 100.0          # overtime weight of the least-overtime end
+
+def pareto(inst, method="beta", max_points=12, tol=0.01, time_limit=60,
+           output_flag=0, timings=None, env=None, log=print):
+    """
+    GPA-versus-overtime frontier on one built model.
+
+    method "beta": dichotomic sweep over β.  Between two frontier
+    points a, b the weight β = Δgpa/Δovertime is solved; a point above
+    the chord is a new supported point, otherwise the edge is final.
+    method "eps": ε-constraint, max GPA s.t. Σz ≤ ε, with ε at the
+    midpoint of the interval whose chord is longest; an interval is
+    refined only while its new point bends away from the chord by
+    more than tol · (GPA range).
+
+    Only the objective (and the ε row) change between solves; every
+    solve starts from the schedule of the neighbouring point.  Stops
+    after max_points solves.  Returns the points sorted by overtime.
+    """
+    timings = {} if timings is None else timings
+    with phase(timings, "build"):
+        m, v = build_model(inst, time_limit, output_flag, env)
+        y = v["y"]
+        W = sum(inst["w"].values())
+        gpa = gp.quicksum(inst["w"][i] * v["G"][i] for i in inst["I"]) * (4 / W)
+        ot = gp.quicksum(v["z"].values())
+        cap = m.addConstr(ot <= GRB.INFINITY) if method == "eps" else None
+
+    points, solves = [], [0]
+
+    def solve_point(weight, eps=None, start=None):
+        solves[0] += 1
+        if cap is not None:
+            cap.RHS = GRB.INFINITY if eps is None else eps
+        m.setObjective(gpa - weight * ot, GRB.MAXIMIZE)
+        if start is not None:
+            start = set(start)
+            for key, var in y.items():
+                var.Start = 1 if key in start else 0
+        with phase(timings, "solve"):
+            m.optimize()
+        if m.SolCount == 0:
+            log(f"  β={weight:<9.5g} ε={eps}: status {m.Status}, no solution")
+            return None
+        with phase(timings, "extract"):
+            schedule = sorted(key for key, var in y.items() if var.X > 0.5)
+            ev = evaluate(inst, schedule)
+        p = dict(beta=weight, eps=eps, gpa_4=ev["gpa_4"],
+                 overtime=ev["overtime"], objective=ev["objective"],
+                 grades_ok=ev["grades_ok"], status=m.Status, gap=m.MIPGap,
+                 seconds=m.Runtime, schedule=schedule)
+        log(f"  β={weight:<9.5g} ε={'–' if eps is None else eps:<6} "
+            f"GPA {p['gpa_4']:.4f}  overtime {p['overtime']:g}  "
+            f"({p['seconds']:.2f} s)")
+        for q in points:
+            if q["overtime"] == p["overtime"] and abs(q["gpa_4"] - p["gpa_4"]) < 1e-9:
+                return q                       # already on the frontier
+        points.append(p)
+        return p
+
+    lo = solve_point(PARETO_BIG)               # least overtime, best GPA
+    hi = solve_point(PARETO_TINY, start=lo and lo["schedule"])  # best GPA
+    if lo is None or hi is None:
+        return sorted(points, key=lambda p: p["overtime"])
+    slack = tol * max(hi["gpa_4"] - lo["gpa_4"], 1e-9)
+
+    # intervals between neighbouring frontier points, longest chord first
+    todo = [(lo, hi)] if hi["overtime"] > lo["overtime"] else []
+    while todo and solves[0] < max_points:
+        todo.sort(key=lambda ab: (ab[1]["overtime"] - ab[0]["overtime"])
+                                 * (ab[1]["gpa_4"] - ab[0]["gpa_4"]))
+        a, b = todo.pop()
+        d_ot = b["overtime"] - a["overtime"]
+        if method == "beta":
+            slope = (b["gpa_4"] - a["gpa_4"]) / d_ot
+            p = solve_point(slope, start=a["schedule"])
+            if p is None:
+                continue
+            if (p["gpa_4"] - slope * p["overtime"]) > \
+                    (a["gpa_4"] - slope * a["overtime"]) + 1e-7:
+                todo += [(a, p), (p, b)]
+        else:
+            if d_ot <= 1:
+                continue
+            eps = math.floor((a["overtime"] + b["overtime"]) / 2)
+            p = solve_point(PARETO_TINY, eps, start=a["schedule"])
+            if p is None or p is a:
+                todo.append((dict(a, overtime=eps), b))   # nothing in (a, ε]
+                continue
+            chord = a["gpa_4"] + (b["gpa_4"] - a["gpa_4"]) \
+                * (p["overtime"] - a["overtime"]) / d_ot
+            if p["gpa_4"] - chord > slack:
+                todo += [(a, p), (p, b)]
+    return sorted(points, key=lambda p: p["overtime"])
+
+# ------------------------------------------------------------------ #
+# Diverse k-best pool                                                #
+# ------------------------------------------------------------------ #
+def schedule_matrix(schedules, keys=None):
+    """
+    Boolean matrix, one row per schedule, one column per (k, t, i, j)
+    of `keys` (default: every key used by some schedule).
+    """
+    import numpy as np
+    keys = sorted({key for s in schedules for key in s}) if keys is None else keys
+    col = {key: n for n, key in enumerate(keys)}
+    X = np.zeros((len(schedules), len(keys)), dtype=bool)
+    for row, s in enumerate(schedules):
+        X[row, [col[key] for key in s if key in col]] = True
+    return X, keys
+
+def hamming(X, Y):
+    """Pairwise Hamming distances between the rows of two bool matrices."""
+    import numpy as np
+    Xi, Yi = X.astype(np.int32), Y.astype(np.int32)
+    return Xi.sum(1)[:, None] + Yi.sum(1)[None, :] - 2 * (Xi @ Yi.T)
+
+def pool_floor(best, gap):
+    """Lowest score within relative gap `gap` of `best` (as Gurobi's PoolGap)."""
+    return best - gap * abs(best)
+
+def pick_diverse(X, scores, k, min_distance, gap=None):
+    """
+    Greedy: best score first, then the next best row at Hamming
+    distance ≥ min_distance from everything picked.  Duplicate rows,
+    and with `gap` the rows scoring below pool_floor(best, gap), are
+    dropped first.  Returns row indices.
+    """
+    import numpy as np
+    _, first = np.unique(X, axis=0, return_index=True)
+    if gap is not None:
+        floor = pool_floor(max(scores), gap)
+        first = [r for r in first if scores[r] >= floor - 1e-9]
+    order = sorted(first, key=lambda r: -scores[r])
+    picked = []
+    for r in order:
+        if len(picked) == k:
+            break
+        if not picked or hamming(X[[r]], X[picked]).min() >= min_distance:
+            picked.append(r)
+    return picked
+
+def diverse_pool(inst, k=5, min_distance=10, pool_gap=0.05, pool_size=None,
+                 time_limit=60, output_flag=0, timings=None, env=None):
+    """
+    Up to k schedules within pool_gap of the best, pairwise at least
+    min_distance assignments apart.
+
+    One search with Gurobi's solution pool (PoolSearchMode 2) collects
+    pool_size candidates; the diverse subset is picked from them.  If
+    fewer than k qualify, each picked schedule gets a distance row
+    Σ_{y∈s}(1−y) + Σ_{y∉s} y ≥ min_distance and the same model is
+    re-optimised as a plain MIP with a cutoff at pool_gap below the
+    best (one more solve per missing schedule at most).
+    Returns (list of result dicts, pairwise distance matrix).
+    """
+    timings = {} if timings is None else timings
+    with phase(timings, "build"):
+        m, v = build_model(inst, time_limit, output_flag, env)
+        keys = list(v["y"])
+        ys = [v["y"][key] for key in keys]
+        m.Params.PoolSearchMode = 2
+        m.Params.PoolSolutions = pool_size or 10 * k
+        m.Params.PoolGap = pool_gap
+
+    found, scores, picked, cut = [], [], [], set() # cut: rows with a distance row
+    while True:
+        with phase(timings, "solve"):
+            m.optimize()
+        if m.SolCount == 0:
+            break
+        with phase(timings, "extract"):
+            for n in range(m.SolCount):
+                m.Params.SolutionNumber = n
+                found.append(tuple(key for key, x in zip(keys, m.getAttr("Xn", ys))
+                                   if x > 0.5))
+                scores.append(evaluate(inst, found[-1])["objective"])
+            X, _ = schedule_matrix(found, keys)
+            picked = pick_diverse(X, scores, k, min_distance, pool_gap)
+        if len(picked) >= k:
+            break
+        # every later solution is ≥ min_distance from all picked ones,
+        # so each round adds at least one schedule
+        with phase(timings, "build"):
+            for r in picked:
+                if r in cut:
+                    continue
+                cut.add(r)
+                chosen = set(found[r])
+                m.addConstr(gp.quicksum(1 - v["y"][key] for key in chosen)
+                            + gp.quicksum(var for key, var in v["y"].items()
+                                          if key not in chosen)
+                            >= min_distance)
+            m.Params.PoolSearchMode = 0        # plain solves from here on
+            m.Params.PoolSolutions = 1
+            m.Params.Cutoff = pool_floor(max(scores), pool_gap)
+
+    results = [dict(evaluate(inst, found[r]), schedule=list(found[r]),
+                    mandatory=v["mandatory"]) for r in picked]
+    D = hamming(X[picked], X[picked]) if picked else []
+    return results, D
+
+# ------------------------------------------------------------------ #
+# Main                                                               #
+# ------------------------------------------------------------------ #
+def main(argv=None):
+    import time                                   # local import keeps diff tiny
+    t_total_start = time.perf_counter()           # ── overall timer ─────────
+
+    p = argparse.ArgumentParser(
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        description=textwrap.dedent("""
+        Solve a single scheduling instance.
+
+        --pretty list   (default)  plain list of (day,shift,course,task)
+        --pretty grid               ASCII calendar (mandatory seats in lower-case)
+        --pretty csv                write schedule.csv
+
+        Re-plan mode (--replan PREV.csv --today D) keeps days < D of the
+        previous schedule, counts their effort as done (or reads it from
+        --done course,task,effort) and re-optimises days ≥ D only,
+        warm-started from PREV and penalising changes to the next
+        --near_days days.  --time_limit defaults to 10 s here (nightly runs).
+
+        Pareto mode (--pareto beta|eps) traces the GPA-versus-overtime
+        frontier on one model, warm-starting each point from its
+        neighbour; --time_limit then applies per point.
+
+        Pool mode (--pool K) returns up to K near-optimal schedules
+        (within --pool_gap of the best) that differ pairwise in at
+        least --min_distance assignments, from Gurobi's solution pool;
+        --pool_dir writes them as pool_1.csv … pool_K.csv.
+        """)
+    )
+    p.add_argument("instance", help="Path to JSON instance file")
+    p.add_argument("--time_limit", type=int, default=None,
+                   help=f"seconds (default 300, {REPLAN_TIME_LIMIT} with --replan)")
+    p.add_argument("--pretty", choices=["grid", "csv", "list"],
+                   default="list")
+    p.add_argument("--csv_path", default="schedule.csv")
+    p.add_argument("--replan", metavar="PREV_CSV", default=None,
+                   help="previous schedule to re-plan from")
+    p.add_argument("--today", type=int, default=None,
+                   help="first day to re-plan (days before are fixed)")
+    p.add_argument("--done", metavar="CSV", default=None,
+                   help="completed effort per task (course,task,effort)")
+    p.add_argument("--near_days", type=int, default=3,
+                   help="days after --today on which changes are penalised")
+    p.add_argument("--stability", type=float, default=0.05,
+                   help="utility lost per changed near-term assignment")
+    p.add_argument("--pareto", choices=["beta", "eps"], default=None,
+                   help="trace the GPA / overtime frontier (β sweep or ε-constraint)")
+    p.add_argument("--points", type=int, default=12,
+                   help="solves allowed for the frontier")
+    p.add_argument("--pareto_tol", type=float, default=0.01,
+                   help="ε mode: refine while the curve bends by more than "
+                        "this share of the GPA range")
+    p.add_argument("--pareto_csv", default=None,
+                   help="write the frontier points here")
+    p.add_argument("--pool", type=int, default=None, metavar="K",
+                   help="return up to K diverse near-optimal schedules")
+    p.add_argument("--min_distance", type=int, default=10,
+                   help="pool: minimum Hamming distance between schedules")
+    p.add_argument("--pool_gap", type=float, default=0.05,
+                   help="pool: relative gap to the best schedule allowed")
+    p.add_argument("--pool_size", type=int, default=None,
+                   help="pool: candidates kept by the search (default 10·K)")
+    p.add_argument("--pool_dir", default=None,
+                   help="pool: write pool_<n>.csv here")
+    add_profile_args(p)
+    add_cache_args(p)
+    args = p.parse_args(argv)
+
+    if not Path(args.instance).exists():
+        raise SystemExit(f"{args.instance} not found")
+    if args.replan and args.today is None:
+        raise SystemExit("--replan needs --today")
+    if args.time_limit is None:
+        args.time_limit = REPLAN_TIME_LIMIT if args.replan else 300
+
+    timings = make_timings(args, Path(args.instance).stem)
+    with phase(timings, "load"):
+        data = load_instance(args.instance)
+    with phase(timings, "parse"):
+        inst = parse_instance(data)
+    I, T, H_star, beta = inst["I"], inst["T"], inst["H_star"], inst["beta"]
+
+    # ----------------- build + solve (timed) --------------------------------
+    if args.pareto:
+        points = pareto(inst, args.pareto, args.points, args.pareto_tol,
+                        args.time_limit, timings=timings)
+        print(f"\nFrontier of {Path(args.instance).name}: {len(points)} points, "
+              f"{timings.get('solve', 0.0):.2f} s solving "
+              f"(utility at the instance's β = {beta:g})")
+        print(f"{'overtime':>8s} {'GPA(4)':>7s} {'utility':>8s} {'β / ε':>11s} {'gap':>7s}")
+        for q in points:
+            how = f"β={q['beta']:.4g}" if q["eps"] is None else f"ε={q['eps']:g}"
+            print(f"{q['overtime']:8g} {q['gpa_4']:7.4f} {q['objective']:8.4f} "
+                  f"{how:>11s} {q['gap']:7.2%}")
+        if args.pareto_csv:
+            with open(args.pareto_csv, "w", newline="") as f:
+                w = csv.writer(f)
+                w.writerow(["overtime", "gpa_4", "objective", "beta", "eps",
+                            "gap", "seconds", "n_assign"])
+                for q in points:
+                    w.writerow([q["overtime"], q["gpa_4"], q["objective"],
+                                q["beta"], q["eps"], q["gap"], q["seconds"],
+                                len(q["schedule"])])
+            print(f"Frontier written to {args.pareto_csv}")
+        if hasattr(timings, "report"):
+            timings.report()
+        return
+    if args.pool:
+        pool, D = diverse_pool(inst, args.pool, args.min_distance, args.pool_gap,
+                               args.pool_size, args.time_limit, timings=timings)
+        print(f"\n{len(pool)} schedules of {Path(args.instance).name} "
+              f"(distance ≥ {args.min_distance}, gap ≤ {args.pool_gap:.1%}), "
+              f"{timings.get('solve', 0.0):.2f} s solving")
+        print(f"{'#':>3s} {'utility':>8s} {'GPA(4)':>7s} {'overtime':>8s} "
+              f"{'to #1':>6s} {'nearest':>7s}")
+        for n, r in enumerate(pool):
+            near = min((D[n][o] for o in range(len(pool)) if o != n), default=0)
+            print(f"{n + 1:3d} {r['objective']:8.4f} {r['gpa_4']:7.4f} "
+                  f"{r['overtime']:8g} {D[n][0]:6d} {near:7d}")
+        if args.pool_dir:
+            Path(args.pool_dir).mkdir(parents=True, exist_ok=True)
+            for n, r in enumerate(pool):
+                _to_csv(r["schedule"], Path(args.pool_dir) / f"pool_{n + 1}.csv")
+        if hasattr(timings, "report"):
+            timings.report()
+        return
+    if args.replan:
+        prev = read_schedule(args.replan)
+        done = read_done(args.done) if args.done else None
+        res = replan(inst, prev, args.today, done, args.near_days,
+                     args.stability, args.time_limit, timings=timings)
+    else:
+        res = cached_solve(args, "optimal", "run", inst, dict(time_limit=args.time_limit),
+                           lambda: solve(inst, args.time_limit, timings=timings),
+                           Path(args.instance).name)
+
+    if res["objective"] is None:
+        print(f"Model finished with status {res['status']}")
+        return
+
+    # ----------------- results ----------------------------------------------
+    schedule, mandatory = res["schedule"], res["mandatory"]
 
     print(textwrap.dedent(f"""
         ══════════════════════════════════════════════════════════
@@ -197,12 +632,12 @@ def main():
         β (overtime wt): {beta:.3f}
         Daily H* (base): {min(H_star.values())} … {max(H_star.values())} hours
         ----------------------------------------------------------
-        Credit-weighted GPA   : {gpa_part:7.4f}
-        Overtime hours : {ot_hours:7.2f}
-        Penalty β·∑z   : {penalty:7.4f}
+        Credit-weighted GPA   : {res["gpa_part"]:7.4f}
+        Overtime hours : {res["overtime"]:7.2f}
+        Penalty β·∑z   : {res["penalty"]:7.4f}
         ----------------------------------------------------------
-        Total utility  : {m.ObjVal:7.4f}
-        Solve time (s) : {solve_sec:7.2f}
+        Total utility  : {res["objective"]:7.4f}
+        Solve time (s) : {timings.get("solve", 0.0):7.2f}{"  (cached)" if res.get("cached") else ""}
         Total time (s) : {time.perf_counter() - t_total_start:7.2f}
         ══════════════════════════════════════════════════════════
     """).strip())
@@ -218,26 +653,20 @@ def main():
             # print(f"{flag} ({k:3d}, {t:2d})  {i:<8}  {j}")
 
     # final GPA in 4-point scale
-    total_cred = sum(w.values())
-    gpa_4 = (sum(w[i] * G[i].X for i in I) / total_cred) * 4
-    print(f"Weighted GPA (4-pt) : {gpa_4:5.2f}")
+    print(f"Weighted GPA (4-pt) : {res['gpa_4']:5.2f}")
+    if args.replan:
+        print(f"Changes on days {args.today}–{args.today + args.near_days - 1}: "
+              f"{res['changes']}")
+
+    if hasattr(timings, "report"):
+        timings.report()
 
 
 def run_optimal_objective(json_path):
-    import sys
-    sys.argv = ["run.py", json_path, "--pretty", "list"]
-    from io import StringIO
-    import contextlib
-
-    f = StringIO()
-    with contextlib.redirect_stdout(f):
-        main()
-    output = f.getvalue()
-
-    for line in output.splitlines():
-        if "Total utility" in line:
-            return float(line.strip().split()[-1])
-    raise RuntimeError("Could not parse optimal objective")
+    res = solve(parse_instance(load_instance(json_path)), output_flag=0)
+    if res["objective"] is None:
+        raise RuntimeError(f"Model finished with status {res['status']}")
+    return res["objective"]
 # ------------------------------------------------------------------ #
 if __name__ == "__main__":
     main()
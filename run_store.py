@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+run_store.py
+------------
+SQLite store of benchmark runs, in place of hand-written comparison
+CSVs and categories re-derived from file names.
+
+    instances         name, content hash, courses, style, work level, β,
+                      days, shifts, tasks, candidate y's
+    instance_courses  (course, instance) pairs, for "contains course X"
+    runs              method, seed, params (JSON), status, objective,
+                      bound, gap, GPA, overtime, wall time, machine, tag
+    phases            (run, phase, seconds) from bench_harness timings
+    telemetry         optional (run, t, incumbent, bound) progress series
+
+Everything the analysis filters or groups by is indexed.  The database
+runs in WAL mode with a busy timeout and every append is one short
+IMMEDIATE transaction, so several benchmark processes can write to the
+same file while reports read from it.
+
+    python run_store.py import campaign.jsonl bench.json --db runs.sqlite
+    python run_store.py summary --db runs.sqlite --by style work method
+    python run_store.py runs --db runs.sqlite --course MATH4008 --work hard
+    python run_store.py sql --db runs.sqlite "SELECT method, COUNT(*) FROM runs GROUP BY 1"
+
+bench_harness.py, campaign.py and compare_and_time.py append to it
+with --db; bench_report.py reads it like any other result file.
+"""
+import argparse
+import json
+import platform
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+
+import manifest
+
+DEFAULT_DB = "runs.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS instances (
+    id        INTEGER PRIMARY KEY,
+    name      TEXT NOT NULL UNIQUE,
+    path      TEXT,
+    hash      TEXT,                  -- sha256 of the JSON file
+    courses   TEXT,                  -- sorted, comma-separated
+    style     TEXT,
+    work      TEXT,
+    beta      REAL,
+    n_days    INTEGER,
+    n_shifts  INTEGER,
+    n_tasks   INTEGER,
+    n_vars    INTEGER                -- candidate (k, t, i, j) cells
+);
+CREATE INDEX IF NOT EXISTS instances_class   ON instances(style, work);
+CREATE INDEX IF NOT EXISTS instances_courses ON instances(courses);
+
+CREATE TABLE IF NOT EXISTS instance_courses (
+    course      TEXT NOT NULL,
+    instance_id INTEGER NOT NULL REFERENCES instances(id) ON DELETE CASCADE,
+    PRIMARY KEY (course, instance_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS runs (
+    id          INTEGER PRIMARY KEY,
+    instance_id INTEGER NOT NULL REFERENCES instances(id),
+    method      TEXT NOT NULL,
+    seed        INTEGER,
+    params      TEXT,                -- JSON
+    status      TEXT NOT NULL DEFAULT 'ok',
+    objective   REAL,
+    bound       REAL,
+    gap         REAL,
+    gpa_4       REAL,
+    overtime    REAL,
+    n_assign    INTEGER,
+    seconds     REAL,                -- wall time of the whole run
+    cached      INTEGER NOT NULL DEFAULT 0,
+    error       TEXT,
+    tag         TEXT,                -- campaign / bench label
+    machine     TEXT,
+    python      TEXT,
+    created     TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_instance ON runs(instance_id, method);
+CREATE INDEX IF NOT EXISTS runs_method   ON runs(method, status);
+CREATE INDEX IF NOT EXISTS runs_tag      ON runs(tag);
+
+CREATE TABLE IF NOT EXISTS phases (
+    run_id  INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    phase   TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    PRIMARY KEY (run_id, phase)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS telemetry (
+    run_id    INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    t         REAL NOT NULL,
+    incumbent REAL,
+    bound     REAL
+);
+CREATE INDEX IF NOT EXISTS telemetry_run ON telemetry(run_id, t);
+"""
+
+INSTANCE_COLUMNS = ["path", "hash", "style", "work", "beta", "n_days", "n_shifts",
+                    "n_tasks", "n_vars"]
+RUN_COLUMNS = ["method", "seed", "params", "status", "objective", "bound", "gap",
+               "gpa_4", "overtime", "n_assign", "seconds", "cached", "error",
+               "tag", "machine", "python"]
+# compare_and_time.py columns: method → (objective, time)
+COMPARISON_COLUMNS = {"optimal": ("optimal", "time_opt"),
+                      "heuristic": ("heuristic", "time_heur"),
+                      "simple": ("silly", "time_silly"),
+                      "lazy": ("lazy", "time_lazy")}
+GROUP_KEYS = {"style": "i.style", "work": "i.work", "courses": "i.courses",
+              "instance": "i.name", "method": "r.method", "tag": "r.tag",
+              "machine": "r.machine", "status": "r.status"}
+
+# ------------------------------------------------------------------ #
+# Store                                                              #
+# ------------------------------------------------------------------ #
+class RunStore:
+    """One SQLite file; safe to share between processes."""
+
+    def __init__(self, path=DEFAULT_DB, timeout=60.0, instances_dir=None):
+        self.path = Path(path)
+        self.instances_dir = Path(instances_dir) if instances_dir else None
+        self.db = sqlite3.connect(self.path, timeout=timeout, isolation_level=None)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("PRAGMA foreign_keys=ON")
+        self.db.executescript(SCHEMA)
+        self._ids = {}
+
+    def close(self):
+        self.db.close()
+
+    def _begin(self):
+        self.db.execute("BEGIN IMMEDIATE")          # take the write lock now
+
+    def _find(self, name, path=None):
+        for cand in filter(None, [path and Path(path),
+                                  self.instances_dir and self.instances_dir / name]):
+            if cand.is_file():
+                return cand
+        return None
+
+    def _instance_id(self, name, path=None):
+        """Row id of instance `name`, inserted on first sight (in a transaction)."""
+        if name in self._ids:
+            return self._ids[name]
+        row = self.db.execute("SELECT id FROM instances WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            found = self._find(name, path)
+            if found:
+                meta = dict(manifest.lookup(found) or manifest.instance_meta(found),
+                            path=str(found))
+            else:
+                meta = manifest.name_meta(name)
+            cols = {c: meta.get(c) for c in INSTANCE_COLUMNS}
+            courses = meta.get("courses") or []
+            cols.update(name=name, courses=",".join(courses))
+            cur = self.db.execute(
+                f"INSERT INTO instances ({', '.join(cols)}) "
+                f"VALUES ({', '.join('?' * len(cols))})", list(cols.values()))
+            self.db.executemany(
+                "INSERT OR IGNORE INTO instance_courses VALUES (?, ?)",
+                [(c, cur.lastrowid) for c in courses])
+            row = (cur.lastrowid,)
+        self._ids[name] = row[0]
+        return row[0]
+
+    def add_instances(self, paths):
+        """
+        Register instance files with their metadata, from the corpus
+        manifest when it is current (see manifest.py), else from the file.
+        """
+        self._begin()
+        try:
+            for path in paths:
+                self._instance_id(Path(path).name, path)
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            self._ids.clear()                       # ids inserted above are gone
+            raise
+
+    def add_runs(self, records, tag=None, path=None):
+        """
+        Append run records (bench_harness.time_one / campaign.py
+        format, optionally with params and telemetry [(t, incumbent,
+        bound), …]) in one transaction.  Returns the new run ids.
+        """
+        machine, python = platform.node(), platform.python_version()
+        now = datetime.now().isoformat(timespec="seconds")
+        ids = []
+        self._begin()
+        try:
+            for rec in records:
+                inst = self._instance_id(Path(rec["instance"]).name,
+                                         rec.get("path") or path)
+                timings = rec.get("timings") or {}
+                row = dict(
+                    method    = rec["method"],
+                    seed      = rec.get("seed"),
+                    params    = json.dumps(rec.get("params") or {}, sort_keys=True),
+                    status    = rec.get("status", "ok"),
+                    objective = rec.get("objective"),
+                    bound     = rec.get("bound"),
+                    gap       = rec.get("gap"),
+                    gpa_4     = rec.get("gpa_4"),
+                    overtime  = rec.get("overtime"),
+                    n_assign  = rec.get("n_assign"),
+                    seconds   = timings.get("total", rec.get("wall", rec.get("time"))),
+                    cached    = int(bool(rec.get("cached"))),
+                    error     = rec.get("error"),
+                    tag       = rec.get("tag", tag),
+                    machine   = rec.get("machine", machine),
+                    python    = rec.get("python", python),
+                )
+                cur = self.db.execute(
+                    f"INSERT INTO runs (instance_id, {', '.join(RUN_COLUMNS)}, created) "
+                    f"VALUES (?, {', '.join('?' * len(RUN_COLUMNS))}, ?)",
+                    [inst, *(row[c] for c in RUN_COLUMNS), rec.get("created", now)])
+                ids.append(cur.lastrowid)
+                self.db.executemany("INSERT INTO phases VALUES (?, ?, ?)",
+                                    [(cur.lastrowid, ph, s) for ph, s in timings.items()
+                                     if ph != "total"])
+                if rec.get("telemetry"):
+                    self.db.executemany("INSERT INTO telemetry VALUES (?, ?, ?, ?)",
+                                        [(cur.lastrowid, *p) for p in rec["telemetry"]])
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            self._ids.clear()                       # ids inserted above are gone
+            raise
+        return ids
+
+    def add_run(self, rec, tag=None, path=None):
+        return self.add_runs([rec], tag, path)[0]
+
+    # -- queries -------------------------------------------------------
+    @staticmethod
+    def where(method=None, style=None, work=None, course=None, courses=None,
+              tag=None, status=None, instance=None):
+        """SQL condition and arguments for the usual filters (lists allowed)."""
+        conds, args = [], []
+        for col, val in [("r.method", method), ("i.style", style), ("i.work", work),
+                         ("r.tag", tag), ("r.status", status), ("i.name", instance)]:
+            if val is None:
+                continue
+            vals = [val] if isinstance(val, str) else list(val)
+            conds.append(f"{col} IN ({', '.join('?' * len(vals))})")
+            args += vals
+        for c in [course] if isinstance(course, str) else (course or []):
+            conds.append("r.instance_id IN (SELECT instance_id FROM "
+                         "instance_courses WHERE course = ?)")
+            args.append(c)
+        if courses:
+            conds.append("i.courses = ?")
+            args.append(",".join(sorted(courses)))
+        return " AND ".join(conds) or "1", args
+
+    def runs(self, **filters):
+        """Run rows joined with their instance metadata."""
+        cond, args = self.where(**filters)
+        return [dict(r) for r in self.db.execute(
+            "SELECT r.*, i.name AS instance, i.style, i.work, i.courses "
+            "FROM runs r JOIN instances i ON i.id = r.instance_id "
+            f"WHERE {cond} ORDER BY r.id", args)]
+
+    def summary(self, by=("style", "work", "method"), **filters):
+        """Runs, successes, mean / best objective and time per group."""
+        cols = [GROUP_KEYS[b] for b in by]
+        cond, args = self.where(**filters)
+        sql = (f"SELECT {', '.join(f'{c} AS {b}' for b, c in zip(by, cols))}, "
+               "COUNT(*) AS runs, SUM(r.status = 'ok') AS ok, "
+               "AVG(r.objective) AS mean_obj, MAX(r.objective) AS best_obj, "
+               "AVG(r.seconds) AS mean_s, MAX(r.seconds) AS max_s "
+               "FROM runs r JOIN instances i ON i.id = r.instance_id "
+               f"WHERE {cond} GROUP BY {', '.join(cols)} ORDER BY {', '.join(cols)}")
+        return [dict(r) for r in self.db.execute(sql, args)]
+
+# ------------------------------------------------------------------ #
+# Import of existing result files                                    #
+# ------------------------------------------------------------------ #
+def read_results(path):
+    """Run records from campaign .jsonl, bench_harness .json or a comparison CSV."""
+    import csv
+    path = Path(path)
+    if path.suffix == ".jsonl":
+        with open(path) as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue                          # torn last line
+    elif path.suffix == ".json":
+        with open(path) as f:
+            data = json.load(f)
+        meta = data.get("meta", {})
+        for rec in data.get("runs", []):
+            yield dict(rec, machine=meta.get("machine"), python=meta.get("python"))
+    else:
+        with open(path, newline="") as f:
+            rows = list(csv.DictReader(f))
+        num = lambda v: float(v) if v not in (None, "") else None
+        if rows and {"method", "objective"} <= set(rows[0]):
+            for row in rows:                          # long format
+                yield dict(row, objective=num(row["objective"]),
+                           time=num(row.get("time")))
+            return
+        for row in rows:                              # compare_and_time.py
+            cert = num(row.get("cert_gap_%"))
+            for method, (col, tcol) in COMPARISON_COLUMNS.items():
+                if num(row.get(col)) is None:         # skipped (certified heuristic)
+                    continue
+                rec = dict(instance=row["instance"], method=method,
+                           objective=num(row[col]), time=num(row.get(tcol)), status="ok")
+                if method == "heuristic" and cert is not None:
+                    rec.update(bound=num(row["bound"]), gap=cert / 100)
+                yield rec
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="SQLite store of benchmark runs")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    for name in ("import", "instances", "runs", "summary", "sql"):
+        sp = sub.add_parser(name)
+        sp.add_argument("--db", default=DEFAULT_DB)
+        if name in ("import", "instances"):
+            sp.add_argument("files", nargs="+")
+            sp.add_argument("--tag", default=None)
+            sp.add_argument("--instances_dir", default="instances",
+                            help="where instance files are looked up for metadata")
+        elif name == "sql":
+            sp.add_argument("query")
+        else:
+            for key in ("method", "style", "work", "course", "tag", "status"):
+                sp.add_argument(f"--{key}", nargs="+", default=None)
+            if name == "summary":
+                sp.add_argument("--by", nargs="+", choices=sorted(GROUP_KEYS),
+                                default=["style", "work", "method"])
+    args = p.parse_args(argv)
+
+    store = RunStore(args.db, instances_dir=getattr(args, "instances_dir", None))
+    t0 = time.perf_counter()
+    if args.cmd == "import":
+        n = 0
+        for path in args.files:
+            n += len(store.add_runs(list(read_results(path)), args.tag or Path(path).stem))
+        print(f"{n} runs imported into {args.db}")
+    elif args.cmd == "instances":
+        store.add_instances(args.files)
+        print(f"{len(args.files)} instances registered in {args.db}")
+    elif args.cmd == "sql":
+        cur = store.db.execute(args.query)
+        cols = [c[0] for c in cur.description or []]
+        print("\t".join(cols))
+        for row in cur:
+            print("\t".join("" if v is None else str(v) for v in row))
+    else:
+        filters = {k: getattr(args, k) for k in ("method", "style", "work", "course",
+                                                 "tag", "status")}
+        if args.cmd == "runs":
+            for r in store.runs(**filters):
+                obj = "–" if r["objective"] is None else f"{r['objective']:.4f}"
+                sec = "–" if r["seconds"] is None else f"{r['seconds']:.3f}"
+                print(f"{r['id']:6d} {r['instance']:55s} {r['method']:10s} "
+                      f"{r['status']:8s} {obj:>8s} {sec:>9s}")
+        else:
+            rows = store.summary(args.by, **filters)
+            print("  ".join(f"{b:>10s}" for b in args.by)
+                  + f" {'runs':>6s} {'ok':>6s} {'mean obj':>9s} {'best':>8s} "
+                    f"{'mean s':>8s} {'max s':>8s}")
+            fmt = lambda v, spec: "–" if v is None else format(v, spec)
+            for r in rows:
+                print("  ".join(f"{str(r[b]):>10s}" for b in args.by)
+                      + f" {r['runs']:6d} {r['ok']:6d} {fmt(r['mean_obj'], '9.4f'):>9s} "
+                        f"{fmt(r['best_obj'], '8.4f'):>8s} {fmt(r['mean_s'], '8.3f'):>8s} "
+                        f"{fmt(r['max_s'], '8.3f'):>8s}")
+    print(f"({1000 * (time.perf_counter() - t0):.1f} ms)")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
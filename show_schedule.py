@@ -1,59 +1,35 @@
-import pandas as pd
+#!/usr/bin/env python3
+"""
+show_schedule.py
+----------------
+Render schedule.csv files (day,shift,course,task – as written by run.py,
+heuristic.py, column_generation.py, …) as day × shift timetables.
+
+The schedule is turned into one day × shift array of course indices and
+drawn with a single imshow call; cells are labelled with the task
+category letter (L lecture, H homework, E exam/quiz) when the span is
+short enough to read them.
+
+    python show_schedule.py schedule.csv --show
+    python show_schedule.py "campaign_out/*.csv" --out_dir plots \\
+        --format svg --workers 8
+
+Without --show the headless Agg backend is used and every file is
+written to --out_dir/<csv stem>.<format>, in parallel over --workers
+processes.
+"""
+import argparse
+import glob
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
-from matplotlib.colors import TABLEAU_COLORS
-import textwrap, io
-
-# ── sample CSV text ───────────────────────────────────────────────
-csv_text = textwrap.dedent("""\
-day,shift,course,task
-22,3,MATH4008,Quiz 2
-22,4,IM2010,Homework 1
-22,10,MGT1002,Quiz
-22,14,IM3004,Case Study Presentation
-23,3,IM3004,Case Study Presentation
-23,4,MATH4008,Quiz 2
-23,11,IM3004,Case Study Presentation
-24,2,CSIE1212,Homework 1
-24,3,IM2010,Homework 1
-24,4,MATH4008,Quiz 2
-24,14,IM2010,Homework 1
-25,2,CSIE1212,Homework 1
-25,4,ECON1023,Quiz 2
-25,7,MGT1002,Exam 1
-25,16,IM2010,Homework 1
-26,3,CSIE1212,Homework 0
-26,4,ECON1023,Quiz 1
-26,5,MATH4008,Worksheet 2
-26,8,IM3004,Case Study Presentation
-28,1,CSIE1212,Homework 1
-28,4,MGT1002,Exam 1
-""")
-
-csv_text_2 = textwrap.dedent("""\
-day,shift,course,task
-22,10,MGT1002,Quiz
-23,1,IM3004,Case Study Presentation
-23,2,MATH4008,Quiz 2
-23,5,IM2010,Homework 1
-23,7,CSIE1212,Mini HW C
-24,1,IM3004,Case Study Presentation
-24,2,MATH4008,Quiz 2
-24,5,MGT1002,Exam 1
-25,1,IM3004,Case Study Presentation
-25,2,MATH4008,Worksheet 2
-25,5,IM2010,Homework 1
-25,7,CSIE1212,Mini HW C
-26,3,CSIE1212,Homework 1
-26,4,ECON1023,Quiz 1
-27,4,ECON1023,Quiz 3
-27,6,CSIE1212,Homework 1
-28,4,ECON1023,Quiz 3
-28,6,CSIE1212,Homework 1
-""")
-
-df = pd.read_csv(io.StringIO(csv_text_2))
+import pandas as pd
+
+SHIFTS = 16                # shifts per day unless the schedule uses more
+LETTER_MAX_DAYS = 40       # 'auto' draws letters up to this many days
 
 # ── task category to single letter ─────────────────────────────────
 def categorize_letter(task: str) -> str:
@@ -64,74 +40,158 @@ def categorize_letter(task: str) -> str:
         return 'H'
     return 'L'
 
-df['cat_letter'] = df['task'].apply(categorize_letter)
-
-# ── dynamic day span; fixed shift span 1–16 ───────────────────────
-day_min, day_max = df['day'].min(), df['day'].max()
-days_range       = range(day_min, day_max + 1)
-shifts_range     = range(1, 17)           # **always 16 shifts**
-
-# ── colour map for courses ────────────────────────────────────────
-unique_courses = sorted(df['course'].unique())
-palette = list(TABLEAU_COLORS.values())
-while len(palette) < len(unique_courses):
-    palette += palette
-course_colors = {c: palette[i] for i, c in enumerate(unique_courses)}
-
-# ── plot ──────────────────────────────────────────────────────────
-fig, ax = plt.subplots(figsize=(10, 6))
-
-for day in days_range:
-    for shift in shifts_range:
-        rows = df[(df['day'] == day) & (df['shift'] == shift)]
-        if not rows.empty:
-            row    = rows.iloc[0]
-            color  = course_colors[row['course']]
-            letter = row['cat_letter']
+def load_schedule(path):
+    df = pd.read_csv(path)
+    missing = {'day', 'shift', 'course', 'task'} - set(df.columns)
+    if missing:
+        raise ValueError(f"{path}: missing column(s) {sorted(missing)}")
+    return df
+
+def schedule_grid(df, shifts=SHIFTS):
+    """
+    (grid, courses, day_min): grid[d, s] is the index into `courses` of
+    the course worked on day day_min+d, shift s+1, or -1 if free.
+    """
+    courses = sorted(df['course'].unique())
+    day_min = int(df['day'].min())
+    n_days = int(df['day'].max()) - day_min + 1
+    n_shifts = max(shifts, int(df['shift'].max()))
+
+    grid = np.full((n_days, n_shifts), -1, dtype=int)
+    codes = pd.Categorical(df['course'], categories=courses).codes
+    grid[df['day'].to_numpy() - day_min, df['shift'].to_numpy() - 1] = codes
+    return grid, courses, day_min
+
+def render(df, out=None, shifts=SHIFTS, title=None, letters='auto', dpi=150):
+    """Draw one schedule; save to `out` or return the figure."""
+    import matplotlib.pyplot as plt
+    import matplotlib.patches as mpatches
+    from matplotlib.colors import ListedColormap, TABLEAU_COLORS
+
+    if df.empty:
+        raise ValueError("empty schedule")
+    grid, courses, day_min = schedule_grid(df, shifts)
+    n_days, n_shifts = grid.shape
+    day_max = day_min + n_days - 1
+
+    # ── colour map: index 0 = free, 1.. = courses ─────────────────────
+    palette = list(TABLEAU_COLORS.values())
+    palette = (palette * (len(courses) // len(palette) + 1))[:len(courses)]
+    cmap = ListedColormap(['white'] + palette)
+
+    height = max(4, min(0.2 * n_days + 1.5, 24))
+    fig, ax = plt.subplots(figsize=(10, height))
+    fig.subplots_adjust(left=0.08, right=0.68, top=1 - 0.6 / height,
+                        bottom=0.6 / height)
+    ax.imshow(grid + 1, cmap=cmap, vmin=0, vmax=len(courses),
+              interpolation='nearest', aspect='auto',
+              extent=(0.5, n_shifts + 0.5, day_max + 0.5, day_min - 0.5))
+
+    # ── cell borders: two line collections, not one patch per cell ────
+    ax.vlines(np.arange(1.5, n_shifts), day_min - 0.5, day_max + 0.5,
+              color='grey', linewidth=0.3)
+    ax.hlines(np.arange(day_min + 0.5, day_max), 0.5, n_shifts + 0.5,
+              color='grey', linewidth=0.3)
+
+    if letters == 'on' or (letters == 'auto' and n_days <= LETTER_MAX_DAYS):
+        for row in df.drop_duplicates(['day', 'shift']).itertuples():
+            ax.text(row.shift, row.day, categorize_letter(row.task),
+                    ha='center', va='center', fontsize=8, fontweight='bold')
+
+    # ── axes & titles ─────────────────────────────────────────────────
+    ax.set_xticks(range(1, n_shifts + 1))
+    ax.set_xlabel(f'Shift (1–{n_shifts})')
+    step = max(1, n_days // 40)
+    ax.set_yticks(range(day_min, day_max + 1, step))
+    ax.set_ylabel('Day')
+    ax.set_title(title or f'Course Schedule (Days {day_min}–{day_max})')
+
+    # ── legends ───────────────────────────────────────────────────────
+    course_patches = [mpatches.Patch(color=palette[n], label=c)
+                      for n, c in enumerate(courses)]
+    cat_patches = [
+        mpatches.Patch(facecolor='white', edgecolor='black', label='L Lecture'),
+        mpatches.Patch(facecolor='white', edgecolor='black', label='H Homework'),
+        mpatches.Patch(facecolor='white', edgecolor='black', label='E Exam/Quiz (incl. preperation)')
+    ]
+    leg1 = ax.legend(handles=course_patches, title='Course',
+                     loc='upper left', bbox_to_anchor=(1.02, 1))
+    ax.legend(handles=cat_patches, title='Letter Key',
+              loc='lower left', bbox_to_anchor=(1.02, 0), framealpha=0)
+    ax.add_artist(leg1)
+
+    if out is None:
+        return fig
+    fig.savefig(out, dpi=dpi)
+    plt.close(fig)
+    return out
+
+def _render_file(job):
+    """Worker: one CSV → one image file.  Returns (csv, out, error)."""
+    import matplotlib
+    matplotlib.use('Agg')               # also under spawn start methods
+    path, out, shifts, letters, dpi = job
+    try:
+        render(load_schedule(path), out, shifts, Path(path).stem, letters, dpi)
+        return path, out, None
+    except Exception as e:
+        return path, out, f"{type(e).__name__}: {e}"
+
+def render_many(paths, out_dir, fmt='png', workers=1, shifts=SHIFTS,
+                letters='auto', dpi=150):
+    """Render every CSV to out_dir/<stem>.<fmt>; yields (csv, out, error)."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    jobs = [(p, str(out_dir / f"{Path(p).stem}.{fmt}"), shifts, letters, dpi)
+            for p in paths]
+    if workers <= 1:
+        yield from map(_render_file, jobs)
+        return
+    with ProcessPoolExecutor(workers) as pool:
+        yield from pool.map(_render_file, jobs, chunksize=4)
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Render schedule CSVs as timetables")
+    p.add_argument('schedules', nargs='*', default=['schedule.csv'],
+                   help='schedule CSV files or glob patterns')
+    p.add_argument('--show', action='store_true',
+                   help='open an interactive window (first file only)')
+    p.add_argument('--out_dir', default='plots')
+    p.add_argument('--format', choices=['png', 'svg', 'pdf'], default='png')
+    p.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    p.add_argument('--shifts', type=int, default=SHIFTS,
+                   help='minimum number of shift columns')
+    p.add_argument('--letters', choices=['auto', 'on', 'off'], default='auto',
+                   help=f"category letters (auto: up to {LETTER_MAX_DAYS} days)")
+    p.add_argument('--dpi', type=int, default=150)
+    args = p.parse_args(argv)
+
+    paths = sorted(itertools.chain.from_iterable(
+        glob.glob(pat) or [pat] for pat in args.schedules))
+    missing = [x for x in paths if not Path(x).exists()]
+    if missing:
+        raise SystemExit(f"{missing[0]} not found")
+
+    if args.show:
+        import matplotlib.pyplot as plt
+        render(load_schedule(paths[0]), None, args.shifts, Path(paths[0]).stem,
+               args.letters)
+        plt.show()
+        return
+
+    import matplotlib
+    matplotlib.use('Agg')
+    failed = 0
+    for path, out, err in render_many(paths, args.out_dir, args.format,
+                                      args.workers, args.shifts,
+                                      args.letters, args.dpi):
+        if err:
+            failed += 1
+            print(f"✗ {path}: {err}")
         else:
-            color, letter = 'white', ''
-        rect = mpatches.Rectangle((shift - 1, day - day_min), 1, 1,
-                                  facecolor=color, edgecolor='grey',
-                                  linewidth=0.5)
-        ax.add_patch(rect)
-        if letter:
-            ax.text(shift - 0.5, day - day_min + 0.5, letter,
-                    ha='center', va='center',
-                    fontsize=10, fontweight='bold')
-
-# ── axes & titles ─────────────────────────────────────────────────
-ax.set_xlim(0, 16)
-ax.set_ylim(0, day_max - day_min + 1)
-
-ax.set_xticks(np.arange(0.5, 16.5))
-ax.set_xticklabels(range(1, 17))
-ax.set_xlabel('Shift (1–16)')
-
-ax.set_yticks(np.arange(0.5, day_max - day_min + 1.5))
-ax.set_yticklabels(range(day_min, day_max + 1))
-ax.set_ylabel('Day')
-
-ax.set_title(f'Course Schedule (Days {day_min}–{day_max})\n')
-ax.invert_yaxis()
-ax.set_aspect('equal')
-ax.grid(True, which='both', color='lightgrey',
-        linewidth=0.3, linestyle='--')
-
-# ── legends ───────────────────────────────────────────────────────
-course_patches = [mpatches.Patch(color=course_colors[c], label=c)
-                  for c in unique_courses]
-cat_patches = [
-    mpatches.Patch(facecolor='white', edgecolor='black', label='L Lecture'),
-    mpatches.Patch(facecolor='white', edgecolor='black', label='H Homework'),
-    mpatches.Patch(facecolor='white', edgecolor='black', label='E Exam/Quiz (incl. preperation)')
-]
-
-leg1 = ax.legend(handles=course_patches, title='Course',
-                 loc='upper left', bbox_to_anchor=(1.02, 1))
-leg2 = ax.legend(handles=cat_patches, title='Letter Key',
-                 loc='upper left', bbox_to_anchor=(1.02, 0.36),
-                 framealpha=0)
-ax.add_artist(leg1)
-
-plt.tight_layout()
-plt.show()
\ No newline at end of file
+            print(f"✓ {out}")
+    print(f"{len(paths) - failed}/{len(paths)} schedules rendered to {args.out_dir}/")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+solver_service.py
+-----------------
+Long-running solver daemon.  Imports gurobipy once, keeps a pool of
+started gp.Env objects (one per worker) and an LRU cache of parsed
+instances, and serves solve requests over a Unix socket (--socket) or
+localhost TCP (--port).
+
+Protocol: JSON lines.  The client sends one request line
+
+    {"method": "optimal", "instance": "instances/x.json", "time_limit": 30}
+    {"method": "lazy", "spec": {...raw instance JSON...}}
+    {"op": "stats"}
+
+and reads events until "result" or "error":
+
+    {"event": "accepted", "waiting": 2}
+    {"event": "started"}
+    {"event": "phase", "phase": "build", "seconds": 0.41}
+    {"event": "progress", "incumbent": 3.1, "bound": 3.6, "gap": 0.14, "time": 2.0}
+    {"event": "result", "objective": 3.51, "schedule": [...], ...}
+
+`instance` is a path or a file name / stem under --instances_dir.
+With --cache DIR, results are reused across requests and restarts
+(see result_cache.py).
+
+    python solver_service.py serve --socket /tmp/solver.sock --workers 4
+    python solver_service.py submit instances/x.json --method optimal \\
+        --socket /tmp/solver.sock
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import signal
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from bench_harness import SOLVERS, run_method
+from common import load_instance, parse_instance
+from result_cache import add_cache_args, make_cache
+
+GUROBI_METHODS = {"optimal", "heuristic", "multires"}
+
+class InstanceCache:
+    """LRU cache of parsed instances keyed by (path, mtime) or spec hash."""
+
+    def __init__(self, instances_dir=".", size=64):
+        self.dir, self.size = Path(instances_dir), size
+        self.items = OrderedDict()
+        self.hits = self.misses = 0
+        self.lock = threading.Lock()
+
+    def resolve(self, name):
+        for cand in (Path(name), self.dir / name, self.dir / f"{name}.json"):
+            if cand.is_file():
+                return cand.resolve()
+        raise FileNotFoundError(f"instance {name!r} not found")
+
+    def get(self, name=None, spec=None):
+        if spec is not None:
+            blob = json.dumps(spec, sort_keys=True).encode()
+            key, load = ("spec", hashlib.sha1(blob).hexdigest()), lambda: spec
+        else:
+            path = self.resolve(name)
+            key, load = (str(path), path.stat().st_mtime_ns), lambda: load_instance(path)
+        with self.lock:
+            if key in self.items:
+                self.hits += 1
+                self.items.move_to_end(key)
+                return self.items[key]
+        inst = parse_instance(load())
+        with self.lock:
+            self.misses += 1
+            self.items[key] = inst
+            while len(self.items) > self.size:
+                self.items.popitem(last=False)
+        return inst
+
+class _PhaseEvents(dict):
+    """Timings dict that reports every finished common.phase() block."""
+
+    def __init__(self, emit):
+        super().__init__()
+        self.emit = emit
+
+    def __setitem__(self, name, seconds):
+        super().__setitem__(name, seconds)
+        self.emit(dict(event="phase", phase=name, seconds=round(seconds, 4)))
+
+def _json_default(o):
+    return sorted(o) if isinstance(o, (set, frozenset)) else str(o)
+
+class SolverService:
+    def __init__(self, instances_dir=".", workers=2, cache_size=64,
+                 progress_interval=1.0, results=None):
+        self.workers = workers
+        self.cache = InstanceCache(instances_dir, cache_size)
+        self.results = results                    # result_cache.ResultCache
+        self.progress_interval = progress_interval
+        self.slots = asyncio.Semaphore(workers)
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix="solve")
+        self.envs = asyncio.Queue()
+        self.waiting = self.running = self.served = 0
+        self.started = time.time()
+
+    def start_envs(self):
+        """One started, silent gp.Env per worker (license checked once)."""
+        import gurobipy as gp
+        for _ in range(self.workers):
+            env = gp.Env(empty=True)
+            env.setParam("OutputFlag", 0)
+            env.start()
+            self.envs.put_nowait(env)
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        while not self.envs.empty():
+            self.envs.get_nowait().dispose()
+
+    def stats(self):
+        return dict(event="stats", workers=self.workers, running=self.running,
+                    waiting=self.waiting, served=self.served,
+                    cache_size=len(self.cache.items), cache_hits=self.cache.hits,
+                    cache_misses=self.cache.misses,
+                    result_hits=self.results.hits if self.results else None,
+                    uptime=round(time.time() - self.started, 1))
+
+    def _mip_callback(self, emit):
+        from gurobipy import GRB
+        last = [0.0]
+
+        def cb(model, where):
+            if where != GRB.Callback.MIP:
+                return
+            now = model.cbGet(GRB.Callback.RUNTIME)
+            if now - last[0] < self.progress_interval:
+                return
+            last[0] = now
+            best = model.cbGet(GRB.Callback.MIP_OBJBST)
+            bound = model.cbGet(GRB.Callback.MIP_OBJBND)
+            has_inc = best < GRB.INFINITY
+            emit(dict(event="progress", time=round(now, 2),
+                      incumbent=best if has_inc else None, bound=bound,
+                      gap=abs(bound - best) / max(abs(best), 1e-9) if has_inc else None))
+        return cb
+
+    def _run(self, req, inst, env, emit):
+        """Worker thread: a stored result if there is one, else _solve()."""
+        method, seed = req["method"], req.get("seed")
+        if self.results is None or (method == "simple" and seed is None):
+            return self._solve(req, inst, env, emit)
+        # same parameters as bench_harness.run_method, so entries are shared
+        params = {}
+        if method in GUROBI_METHODS and req.get("time_limit") is not None:
+            params["time_limit"] = req["time_limit"]
+        if method == "simple":
+            params["seed"] = seed
+        return self.results.solve(method, SOLVERS[method], inst, params,
+                                  lambda: self._solve(req, inst, env, emit),
+                                  req.get("instance"))
+
+    def _solve(self, req, inst, env, emit):
+        """Worker thread: one solve; returns the result dict."""
+        method = req["method"]
+        timings = _PhaseEvents(emit)
+        if method == "optimal":
+            import run
+            return run.solve(inst, req.get("time_limit", 300), output_flag=0,
+                             timings=timings, env=env,
+                             callback=self._mip_callback(emit))
+        if method == "heuristic":
+            import heuristic
+            return heuristic.solve(inst, req.get("time_limit", 60),
+                                   timings=timings, env=env)
+        if method == "multires":
+            import multires                   # pooled env for the coarse model
+            return multires.solve(inst, time_limit=req.get("time_limit", 60),
+                                  timings=timings, env=env)
+        return run_method(method, inst, req.get("seed"), timings=timings)
+
+    async def solve(self, req, send):
+        """Handle one solve request; events go to the `send` coroutine."""
+        method = req.get("method")
+        if method not in SOLVERS:
+            await send(dict(event="error", error=f"unknown method {method!r}"))
+            return
+        loop = asyncio.get_running_loop()
+        events = asyncio.Queue()
+
+        def emit(ev):                         # callable from worker threads
+            loop.call_soon_threadsafe(events.put_nowait, ev)
+
+        self.waiting += 1
+        await send(dict(event="accepted", waiting=self.waiting))
+        async with self.slots:
+            self.waiting -= 1
+            self.running += 1
+            env = await self.envs.get() if method in GUROBI_METHODS else None
+            try:
+                inst = await loop.run_in_executor(
+                    self.pool, self.cache.get, req.get("instance"), req.get("spec"))
+                await send(dict(event="started"))
+                fut = loop.run_in_executor(self.pool, self._run, req, inst, env, emit)
+                while not fut.done() or not events.empty():
+                    getter = asyncio.ensure_future(events.get())
+                    done, _ = await asyncio.wait({fut, getter},
+                                                 return_when=asyncio.FIRST_COMPLETED)
+                    if getter in done:
+                        await send(getter.result())
+                    else:
+                        getter.cancel()
+                res = fut.result()
+                await send(dict(event="result", method=method, **res))
+                self.served += 1
+            except Exception as e:
+                await send(dict(event="error", error=f"{type(e).__name__}: {e}"))
+            finally:
+                if env is not None:
+                    self.envs.put_nowait(env)
+                self.running -= 1
+
+    async def handle(self, reader, writer):
+        async def send(ev):
+            writer.write((json.dumps(ev, default=_json_default) + "\n").encode())
+            await writer.drain()
+        try:
+            line = await reader.readline()
+            try:
+                req = json.loads(line)
+            except json.JSONDecodeError:
+                await send(dict(event="error", error="request is not a JSON line"))
+                return
+            op = req.get("op", "solve")
+            if op == "ping":
+                await send(dict(event="pong"))
+            elif op == "stats":
+                await send(self.stats())
+            elif op == "solve":
+                await self.solve(req, send)
+            else:
+                await send(dict(event="error", error=f"unknown op {op!r}"))
+        except (ConnectionResetError, BrokenPipeError):
+            pass                                  # client went away
+        finally:
+            writer.close()
+
+async def serve(args):
+    service = SolverService(args.instances_dir, args.workers, args.cache_size,
+                            args.progress_interval, make_cache(args))
+    service.start_envs()
+    if args.port:
+        server = await asyncio.start_server(service.handle, "127.0.0.1", args.port)
+        where = f"127.0.0.1:{args.port}"
+    else:
+        if os.path.exists(args.socket):
+            os.unlink(args.socket)
+        server = await asyncio.start_unix_server(service.handle, args.socket)
+        where = args.socket
+    print(f"Solver service listening on {where} ({args.workers} workers)")
+    stop = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        asyncio.get_running_loop().add_signal_handler(sig, stop.set)
+    try:
+        async with server:
+            await stop.wait()
+    finally:
+        service.close()
+        if not args.port and os.path.exists(args.socket):
+            os.unlink(args.socket)
+
+async def request(payload, socket=None, port=None):
+    """Send one request; yields the streamed events (client side)."""
+    if port:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    else:
+        reader, writer = await asyncio.open_unix_connection(socket)
+    writer.write((json.dumps(payload) + "\n").encode())
+    await writer.drain()
+    try:
+        while line := await reader.readline():
+            ev = json.loads(line)
+            yield ev
+            if ev["event"] in ("result", "error", "stats", "pong"):
+                break
+    finally:
+        writer.close()
+
+async def submit(args):
+    if args.op != "solve":
+        payload = dict(op=args.op)
+    else:
+        payload = dict(method=args.method, instance=args.instance)
+        if args.time_limit is not None:
+            payload["time_limit"] = args.time_limit
+        if args.seed is not None:
+            payload["seed"] = args.seed
+    async for ev in request(payload, args.socket, args.port):
+        if ev["event"] == "result":
+            ev.pop("schedule", None)
+            ev.pop("mandatory", None)
+        print(json.dumps(ev, default=_json_default))
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Solver daemon with warm Gurobi environments")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    for name in ("serve", "submit"):
+        sp = sub.add_parser(name)
+        sp.add_argument("--socket", default="/tmp/or_solver.sock")
+        sp.add_argument("--port", type=int, default=None,
+                        help="listen on / connect to localhost TCP instead")
+        if name == "serve":
+            sp.add_argument("--workers", type=int, default=2,
+                            help="concurrent solves (and gp.Env objects)")
+            sp.add_argument("--instances_dir", default="instances")
+            sp.add_argument("--cache_size", type=int, default=64,
+                            help="parsed instances kept in memory")
+            sp.add_argument("--progress_interval", type=float, default=1.0,
+                            help="seconds between MIP progress events")
+            add_cache_args(sp)
+        else:
+            sp.add_argument("instance", nargs="?", default=None)
+            sp.add_argument("--method", choices=sorted(SOLVERS), default="optimal")
+            sp.add_argument("--time_limit", type=int, default=None)
+            sp.add_argument("--seed", type=int, default=None)
+            sp.add_argument("--op", choices=["solve", "stats", "ping"],
+                            default="solve")
+    args = p.parse_args(argv)
+
+    try:
+        asyncio.run(serve(args) if args.cmd == "serve" else submit(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
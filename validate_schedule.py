@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+validate_schedule.py
+--------------------
+Check schedule CSVs against one instance and recompute their
+objective, independently of the solver that wrote them.  The instance
+is loaded once; all schedules are stacked into flat arrays (schedule
+id, task, day, shift per assignment) and every check is a NumPy
+operation over the whole batch.
+
+Checks (counted per schedule):
+
+    unknown     course/task or (day, shift) not in the instance
+    window      assignment outside r[i][j] ≤ (k, t) ≤ d[i][j]
+    mandatory   seat-time from `slot` not in the schedule
+    overlap     more than one assignment in a (k, t)
+    slot_cap    more than ceil(E[i][j]) shifts on a task
+    break       more than 4 worked shifts in 6 consecutive shifts of a day
+    grades      course grade G_i below its minimum B_i
+
+run.py's MIP has no break rule; validate its schedules with
+--skip break.  With --reported (CSV schedule,objective or JSON
+{schedule: objective}; cohort.py's summary.json works too) every
+recomputed objective is compared to the one the solver reported.
+
+    python validate_schedule.py instance.json schedule.csv
+    python validate_schedule.py instance.json "out/*.csv" \\
+        --reported objectives.csv --json validation.json
+
+Exits with status 1 if any schedule is invalid or mismatches.
+"""
+import argparse
+import glob
+import itertools
+import json
+import math
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from common import load_instance, parse_instance
+from robustness import Instance
+
+CHECKS = ["unknown", "window", "mandatory", "overlap", "slot_cap", "break", "grades"]
+BREAK_WINDOW, BREAK_MAX = 6, 4
+
+class Checker(Instance):
+    """Instance arrays plus the (task, cell) tables the checks need."""
+
+    def __init__(self, inst):
+        super().__init__(inst)
+        nT = len(self.shift_ix)
+        self.n_cells = len(self.day_ix) * nT
+        self.names = pd.MultiIndex.from_tuples(self.tasks)
+        self.day_lut = self._lut(self.day_ix)
+        self.shift_lut = self._lut(self.shift_ix)
+
+        def cell(k, t):
+            return self.day_ix[k] * nT + self.shift_ix[t]
+
+        def clamp(kt):
+            k, t = kt
+            k = min(max(k, min(self.day_ix)), max(self.day_ix))
+            return k, min(max(t, min(self.shift_ix)), max(self.shift_ix))
+
+        # windows as cell indices (r, d clamped onto the calendar)
+        r, d, P = inst["r"], inst["d"], inst["P"]
+        self.lo = np.array([cell(*clamp(r[i][j])) for i, j in self.tasks])
+        self.hi = np.array([cell(*clamp(d[i][j])) for i, j in self.tasks])
+        self.cap = np.array([math.ceil(e) for e in self.E])
+
+        # dense productivity: task × cell
+        self.P = np.zeros((len(self.tasks), self.n_cells))
+        for n, (i, j) in enumerate(self.tasks):
+            for (k, t), v in P[i][j].items():
+                if k in self.day_ix and t in self.shift_ix:
+                    self.P[n, cell(k, t)] = v
+
+        # mandatory seat-times as task·n_cells + cell keys, and the
+        # position of each key in that list (−1: not mandatory)
+        self.mandatory = np.array(sorted(
+            self.task_ix[i, j] * self.n_cells + cell(k, t)
+            for i, j in self.tasks
+            for k, t in inst["slot"].get(i, {}).get(j, [])
+            if k in self.day_ix and t in self.shift_ix
+            and r[i][j] <= (k, t) <= d[i][j]), dtype=np.int64)
+        self.mandatory_ix = np.full(len(self.tasks) * self.n_cells, -1)
+        self.mandatory_ix[self.mandatory] = np.arange(len(self.mandatory))
+
+    @staticmethod
+    def _lut(index):
+        lut = np.full(max(index) + 2, -1)
+        lut[list(index)] = list(index.values())
+        return lut
+
+    def encode(self, frames):
+        """Stack [(name, DataFrame)] into flat assignment arrays."""
+        sid = np.concatenate([np.full(len(df), n) for n, (_, df) in enumerate(frames)])
+        df = pd.concat([df for _, df in frames], ignore_index=True)
+        task = self.names.get_indexer(pd.MultiIndex.from_arrays(
+            [df["course"].astype(str), df["task"].astype(str)]))
+        day = df["day"].to_numpy(int)
+        shift = df["shift"].to_numpy(int)
+
+        def look(lut, v):
+            ok = (v >= 0) & (v < len(lut))
+            return np.where(ok, lut[np.clip(v, 0, len(lut) - 1)], -1)
+
+        k_ix, t_ix = look(self.day_lut, day), look(self.shift_lut, shift)
+        known = (task >= 0) & (k_ix >= 0) & (t_ix >= 0)
+        cell = np.where(known, k_ix * len(self.shift_ix) + t_ix, -1)
+        return dict(sid=sid, task=task, day=k_ix, cell=cell, known=known,
+                    raw=df)
+
+def validate(chk, frames, skip=()):
+    """
+    One result dict per (name, DataFrame) in `frames`: violation counts
+    per check, objective components and the first offending row.
+    """
+    n_sched = len(frames)
+    if n_sched == 0:
+        return []
+    a = chk.encode(frames)
+    sid, task, cell, known = a["sid"], a["task"], a["cell"], a["known"]
+    n_tasks, n_days, nT = len(chk.tasks), len(chk.day_ix), len(chk.shift_ix)
+    per = lambda mask: np.bincount(a["sid"][mask], minlength=n_sched)
+    bad_rows = {}
+
+    bad_rows["unknown"] = ~known
+    sid, task, cell, day = sid[known], task[known], cell[known], a["day"][known]
+    rows = np.flatnonzero(known)
+
+    # window
+    out = (cell < chk.lo[task]) | (cell > chk.hi[task])
+    bad_rows["window"] = _rows(rows, out, len(known))
+
+    # overlap: repeated (schedule, cell)
+    key = sid.astype(np.int64) * chk.n_cells + cell
+    order = np.argsort(key, kind="stable")
+    dup = np.zeros(len(key), bool)
+    dup[order[1:]] = key[order[1:]] == key[order[:-1]]
+    bad_rows["overlap"] = _rows(rows, dup, len(known))
+
+    # slot cap: shifts per (schedule, task)
+    st = sid.astype(np.int64) * n_tasks + task
+    n_st = np.bincount(st, minlength=n_sched * n_tasks)
+    bad_rows["slot_cap"] = _rows(rows, n_st[st] > chk.cap[task], len(known))
+
+    counts = {name: per(mask) for name, mask in bad_rows.items()}
+
+    # mandatory: every (task, cell) key of `slot` present
+    m = chk.mandatory_ix[task * chk.n_cells + cell]
+    missing = np.ones((n_sched, len(chk.mandatory)), bool)
+    missing[sid[m >= 0], m[m >= 0]] = False
+    counts["mandatory"] = missing.sum(axis=1)
+
+    # break rule: sliding window over each day's occupied shifts
+    occ = np.zeros((n_sched, n_days, nT), np.int16)
+    np.add.at(occ, (sid, day, cell % nT), 1)
+    occ = np.minimum(occ, 1)
+    cs = np.concatenate([np.zeros((n_sched, n_days, 1), np.int16),
+                         occ.cumsum(axis=2, dtype=np.int16)], axis=2)
+    width = min(BREAK_WINDOW, nT)
+    windows = cs[:, :, width:] - cs[:, :, :-width]
+    over_day = (windows > BREAK_MAX).any(axis=2)            # (sched, day)
+    counts["break"] = over_day.sum(axis=1)
+
+    # objective components
+    p = chk.P[task, cell]
+    eff = np.bincount(sid * n_tasks + task, weights=p,
+                      minlength=n_sched * n_tasks).reshape(n_sched, n_tasks)
+    G = np.minimum((eff + chk.done) / chk.E, 1.0) @ chk.S
+    gpa_part = G @ chk.w
+    gpa_4 = gpa_part / chk.w.sum() * 4
+    per_day = np.bincount(sid * n_days + day,
+                          minlength=n_sched * n_days).reshape(n_sched, n_days)
+    overtime = np.maximum(per_day - chk.H, 0).sum(axis=1)
+    beta = chk.inst["beta"]
+    below = G + 1e-9 < chk.B
+    counts["grades"] = below.sum(axis=1)
+
+    # first offending row of every schedule, per row-level check
+    first_row = {}
+    for c, mask in bad_rows.items():
+        idx = np.flatnonzero(mask)
+        s = a["sid"][idx]                       # sorted: frames are stacked
+        at = np.flatnonzero(np.diff(s, prepend=-1))
+        first_row[c] = dict(zip(s[at].tolist(), idx[at].tolist()))
+
+    results = []
+    I = chk.inst["I"]
+    for n, (name, df) in enumerate(frames):
+        violations = {c: int(counts[c][n]) for c in CHECKS if c not in skip}
+        first = {}
+        for c in bad_rows:
+            if violations.get(c):
+                row = a["raw"].iloc[first_row[c][n]]
+                first[c] = f"{row['day']},{row['shift']},{row['course']},{row['task']}"
+        if violations.get("mandatory"):
+            key = int(chk.mandatory[np.flatnonzero(missing[n])[0]])
+            i, j = chk.tasks[key // chk.n_cells]
+            k = list(chk.day_ix)[key % chk.n_cells // nT]
+            t = list(chk.shift_ix)[key % nT]
+            first["mandatory"] = f"{k},{t},{i},{j}"
+        if violations.get("break"):
+            first["break"] = f"day {list(chk.day_ix)[np.flatnonzero(over_day[n])[0]]}"
+        if violations.get("grades"):
+            first["grades"] = ", ".join(f"{I[c]} {G[n, c]:.3f} < {chk.B[c]:g}"
+                                        for c in np.flatnonzero(below[n]))
+        results.append(dict(
+            schedule   = name,
+            n_assign   = len(df),
+            valid      = not any(violations.values()),
+            violations = violations,
+            first      = first,
+            objective  = float(gpa_4[n] - beta * overtime[n]),
+            gpa_part   = float(gpa_part[n]),
+            gpa_4      = float(gpa_4[n]),
+            overtime   = float(overtime[n]),
+            penalty    = float(beta * overtime[n]),
+        ))
+    return results
+
+def _rows(rows, mask, n):
+    """Lift a mask over the known rows back onto all rows."""
+    full = np.zeros(n, bool)
+    full[rows[mask]] = True
+    return full
+
+def load_reported(path):
+    """{schedule stem: reported objective}."""
+    path = Path(path)
+    if path.suffix == ".csv":
+        df = pd.read_csv(path)
+        return {Path(str(s)).stem: float(o)
+                for s, o in zip(df["schedule"], df["objective"])}
+    with open(path) as f:
+        data = json.load(f)
+    if "students" in data:                              # cohort.py summary
+        return {Path(st["instance"]).stem: st["objective"]
+                for st in data["students"]}
+    return {Path(str(s)).stem: float(o) for s, o in data.items()}
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Validate schedule CSVs and recompute their objective")
+    p.add_argument("instance")
+    p.add_argument("schedules", nargs="+", help="schedule CSVs or glob patterns")
+    p.add_argument("--skip", nargs="+", choices=CHECKS, default=[],
+                   help="checks to leave out (e.g. break for run.py schedules)")
+    p.add_argument("--reported", default=None,
+                   help="objectives the solvers reported (CSV or JSON)")
+    p.add_argument("--tol", type=float, default=1e-6,
+                   help="allowed |recomputed − reported| objective difference")
+    p.add_argument("--json", default=None, help="write the results here")
+    p.add_argument("--quiet", action="store_true", help="only list failures")
+    args = p.parse_args(argv)
+
+    paths = sorted(itertools.chain.from_iterable(
+        glob.glob(pat) or [pat] for pat in args.schedules))
+    missing = [x for x in paths if not Path(x).exists()]
+    if missing:
+        raise SystemExit(f"{missing[0]} not found")
+
+    t0 = time.perf_counter()
+    chk = Checker(parse_instance(load_instance(args.instance)))
+    t1 = time.perf_counter()
+    frames = []
+    for path in paths:
+        df = pd.read_csv(path)
+        gone = {"day", "shift", "course", "task"} - set(df.columns)
+        if gone:
+            raise SystemExit(f"{path}: missing column(s) {sorted(gone)}")
+        frames.append((Path(path).stem, df))
+    results = validate(chk, frames, set(args.skip))
+    t2 = time.perf_counter()
+
+    reported = load_reported(args.reported) if args.reported else {}
+    bad = 0
+    for res in results:
+        rep = reported.get(res["schedule"])
+        res["reported"] = rep
+        res["mismatch"] = rep is not None and abs(rep - res["objective"]) > args.tol
+        failed = not res["valid"] or res["mismatch"]
+        bad += failed
+        if args.quiet and not failed:
+            continue
+        mark = "✓" if not failed else "✗"
+        line = f"{mark} {res['schedule']}: objective {res['objective']:.4f}"
+        if rep is not None:
+            line += f" (reported {rep:.4f}{', MISMATCH' if res['mismatch'] else ''})"
+        print(line)
+        for c, n in res["violations"].items():
+            if n:
+                print(f"    {c:9s} {n:4d}   first: {res['first'].get(c, '')}")
+
+    print(f"\n{len(results) - bad}/{len(results)} schedules valid; "
+          f"instance {1000 * (t1 - t0):.0f} ms, "
+          f"{len(results)} schedules in {1000 * (t2 - t1):.0f} ms")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(dict(instance=args.instance, skip=args.skip,
+                           results=results), f, indent=2)
+    if bad:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()